@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+句子與音頻的時間對齊
+讀稿機逐句合成時已知每句 PCM 的長度，直接累加即可得到每句的起訖取樣位置，
+不需要事後再以強制對齊（forced alignment）分析音頻。
+對齊結果可輸出為 JSON（取樣位置與秒數）、SRT 與 WebVTT 字幕，
+也可依播放位置查詢目前的句子（圖形界面的逐句標示）。
+"""
+
+import json
+import bisect
+
+
+def _format_timestamp(seconds, separator):
+    milliseconds = int(round(seconds * 1000))
+    hours, milliseconds = divmod(milliseconds, 3600 * 1000)
+    minutes, milliseconds = divmod(milliseconds, 60 * 1000)
+    secs, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{milliseconds:03d}"
+
+
+class SentenceTimeline:
+    def __init__(self, sample_rate, crossfade_samples=0):
+        """建立時間軸（crossfade_samples: 相鄰句子以交叉淡化重疊的取樣數）"""
+        self.sample_rate = sample_rate
+        self.crossfade_samples = crossfade_samples
+        self.segments = []
+        self._starts = []
+        self._end = 0
+
+    def __len__(self):
+        return len(self.segments)
+
+    @property
+    def total_samples(self):
+        return self._end
+
+    def add(self, text, num_samples):
+        """附加一句，回傳該句的 (起始取樣, 結束取樣)"""
+        # 交叉淡化時下一句與已輸出音頻的尾端重疊（crossfade_concat 保留的尾端
+        # 可能跨越多個短句，因此以累計長度而不是上一句的長度計算）
+        overlap = min(self.crossfade_samples, self._end, num_samples) if self.segments else 0
+        start = self._end - overlap
+        end = start + num_samples
+        self.segments.append({"index": len(self.segments), "text": text, "start": start, "end": end})
+        self._starts.append(start)
+        self._end = end
+        return start, end
+
+    def extend(self, alignment):
+        """接在目前結尾之後附加另一段音頻的對齊結果（to_dict 格式），兩者不重疊"""
+        offset = self._end
+        for segment in alignment["segments"]:
+            start = offset + segment["start_sample"]
+            self.segments.append({"index": len(self.segments), "text": segment["text"],
+                                  "start": start, "end": offset + segment["end_sample"]})
+            self._starts.append(start)
+        self._end = offset + alignment["total_samples"]
+
+    def at(self, sample):
+        """取得播放到指定取樣位置時的句子序號，尚未開始時回傳 None"""
+        count = len(self._starts)
+        index = bisect.bisect_right(self._starts, sample, 0, count) - 1
+        return index if index >= 0 else None
+
+    def to_dict(self):
+        """對齊結果（取樣位置與秒數）"""
+        rate = self.sample_rate
+        return {
+            "sample_rate": rate,
+            "total_samples": self._end,
+            "segments": [
+                {
+                    "index": segment["index"],
+                    "text": segment["text"],
+                    "start_sample": segment["start"],
+                    "end_sample": segment["end"],
+                    "start": round(segment["start"] / rate, 3),
+                    "end": round(segment["end"] / rate, 3)
+                }
+                for segment in self.segments
+            ]
+        }
+
+    def to_srt(self):
+        rate = self.sample_rate
+        blocks = [
+            f"{number}\n{_format_timestamp(segment['start'] / rate, ',')} --> "
+            f"{_format_timestamp(segment['end'] / rate, ',')}\n{segment['text']}\n"
+            for number, segment in enumerate(self.segments, 1)
+        ]
+        return "\n".join(blocks)
+
+    def to_vtt(self):
+        rate = self.sample_rate
+        blocks = [
+            f"{_format_timestamp(segment['start'] / rate, '.')} --> "
+            f"{_format_timestamp(segment['end'] / rate, '.')}\n{segment['text']}\n"
+            for segment in self.segments
+        ]
+        return "WEBVTT\n\n" + "\n".join(blocks)
+
+    def save(self, base_path):
+        """寫入 base_path.align.json / .srt / .vtt，回傳寫入的檔案路徑"""
+        paths = [f"{base_path}.align.json", f"{base_path}.srt", f"{base_path}.vtt"]
+        with open(paths[0], "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        with open(paths[1], "w", encoding="utf-8") as f:
+            f.write(self.to_srt())
+        with open(paths[2], "w", encoding="utf-8") as f:
+            f.write(self.to_vtt())
+        return paths
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+串流音頻編碼
+直接接收合成的 float32 PCM 並邊合成邊寫入輸出檔，不需要中間 WAV 檔：
+- lameenc（若已安裝）：行程內 MP3 編碼
+- ffmpeg：單一常駐編碼行程，PCM 經由 stdin 傳入
+- 以上皆不可用時：寫入 16-bit WAV（先寫入暫定的 RIFF 標頭，關閉時再補上長度）
+長篇錄製可依時長或檔案大小切分為多個分段檔，記憶體用量與文件長度無關。
+"""
+
+import struct
+import subprocess
+
+try:
+    import lameenc
+    LAMEENC_AVAILABLE = True
+except ImportError:
+    LAMEENC_AVAILABLE = False
+
+
+def _to_int16(pcm):
+    """float32 PCM 轉為 16-bit 整數"""
+    import numpy as np
+
+    return (np.clip(pcm, -1.0, 1.0) * 32767).astype("<i2")
+
+
+DEFAULT_BITRATE = 192
+
+WAV_HEADER_BYTES = 44
+# RIFF 的長度欄位為 32 位元，單一 WAV 檔不能超過 4GB
+WAV_MAX_DATA_BYTES = 0xFFFFFFFF - WAV_HEADER_BYTES
+
+
+def _wav_header(sample_rate, data_bytes):
+    """16-bit 單聲道 PCM 的 RIFF/WAVE 標頭"""
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", WAV_HEADER_BYTES - 8 + data_bytes, b"WAVE",
+        b"fmt ", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16,
+        b"data", data_bytes
+    )
+
+
+class WavStreamWriter:
+    def __init__(self, path, sample_rate):
+        """逐段寫入 16-bit 單聲道 WAV（長度欄位在關閉時補上）"""
+        self.path = path
+        self.sample_rate = sample_rate
+        self.data_bytes = 0
+        self._file = open(path, "wb")
+        self._file.write(_wav_header(sample_rate, 0))
+
+    def write(self, pcm):
+        """寫入一段 PCM"""
+        self.write_frames(_to_int16(pcm).tobytes())
+
+    def write_frames(self, data):
+        """寫入已是 16-bit 單聲道的音頻資料（例如從其他 WAV 檔複製）"""
+        if self.data_bytes + len(data) > WAV_MAX_DATA_BYTES:
+            raise Exception("WAV 檔超過 4GB 上限，請以分段輸出")
+        self._file.write(data)
+        self.data_bytes += len(data)
+
+    def close(self):
+        """回到檔頭寫入實際長度，回傳檔案路徑"""
+        self._file.seek(0)
+        self._file.write(_wav_header(self.sample_rate, self.data_bytes))
+        self._file.close()
+        return self.path
+
+
+class LameMp3Writer:
+    def __init__(self, path, sample_rate, bitrate=DEFAULT_BITRATE):
+        """以 lameenc 在行程內編碼 MP3"""
+        self.path = path
+        self.sample_rate = sample_rate
+        self._encoder = lameenc.Encoder()
+        self._encoder.set_bit_rate(bitrate)
+        self._encoder.set_in_sample_rate(sample_rate)
+        self._encoder.set_channels(1)
+        self._encoder.set_quality(2)
+        self._file = open(path, "wb")
+
+    def write(self, pcm):
+        """編碼並寫入一段 PCM"""
+        self._file.write(self._encoder.encode(_to_int16(pcm).tobytes()))
+
+    def close(self):
+        """寫入編碼器緩衝的剩餘資料，回傳檔案路徑"""
+        self._file.write(self._encoder.flush())
+        self._file.close()
+        return self.path
+
+
+class FfmpegMp3Writer:
+    def __init__(self, path, sample_rate, bitrate=DEFAULT_BITRATE):
+        """啟動單一 ffmpeg 編碼行程，PCM 經 stdin 串流傳入"""
+        self.path = path
+        self.sample_rate = sample_rate
+        self._process = subprocess.Popen([
+            'ffmpeg', '-loglevel', 'error',
+            '-f', 'f32le', '-ar', str(sample_rate), '-ac', '1', '-i', 'pipe:0',
+            '-acodec', 'mp3', '-ab', f'{bitrate}k', path, '-y'
+        ], stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+    def write(self, pcm):
+        """寫入一段 PCM"""
+        import numpy as np
+
+        self._process.stdin.write(np.asarray(pcm, dtype="<f4").tobytes())
+
+    def close(self):
+        """關閉輸入並等待編碼完成，回傳檔案路徑"""
+        self._process.stdin.close()
+        error = self._process.stderr.read().decode("utf-8", errors="replace")
+        if self._process.wait() != 0:
+            raise Exception(f"ffmpeg 編碼失敗: {error.strip()}")
+        return self.path
+
+
+class PartedAudioWriter:
+    def __init__(self, base_path, sample_rate, open_writer, bytes_per_second,
+                 max_seconds=None, max_bytes=None):
+        """依時長或估計大小切分為 base_path_part001、base_path_part002… 分段檔
+
+        只在寫入的片段之間切分（每段通常是一整句），不會切斷句子。
+        """
+        self.base_path = base_path
+        self.sample_rate = sample_rate
+        self.paths = []
+        self._open_writer = open_writer
+        self._bytes_per_second = bytes_per_second
+        self._max_seconds = max_seconds
+        self._max_bytes = max_bytes
+        self._writer = None
+        self._part_seconds = 0.0
+
+    def _part_full(self, seconds):
+        if self._writer is None:
+            return True
+        if not self._part_seconds:
+            # 單一片段超過上限時仍完整寫入同一分段
+            return False
+        total = self._part_seconds + seconds
+        if self._max_seconds and total > self._max_seconds:
+            return True
+        return bool(self._max_bytes and total * self._bytes_per_second > self._max_bytes)
+
+    def write(self, pcm):
+        """寫入一段 PCM，目前分段已滿時先開啟下一個分段"""
+        seconds = len(pcm) / self.sample_rate
+        if self._part_full(seconds):
+            if self._writer is not None:
+                self._writer.close()
+            self._writer = self._open_writer(f"{self.base_path}_part{len(self.paths) + 1:03d}")
+            self.paths.append(self._writer.path)
+            self._part_seconds = 0.0
+        self._writer.write(pcm)
+        self._part_seconds += seconds
+
+    def close(self):
+        """完成最後一個分段，回傳所有分段的路徑列表"""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        return self.paths
+
+
+def open_audio_writer(base_path, sample_rate, output_format="mp3", ffmpeg_available=True,
+                      max_part_seconds=None, max_part_bytes=None):
+    """依可用的編碼器開啟串流寫入器（base_path 不含副檔名）
+
+    要求 MP3 但沒有任何 MP3 編碼器時退回 WAV。指定 max_part_seconds / max_part_bytes 時
+    回傳分段寫入器，close() 回傳分段路徑列表（WAV 分段大小不超過 4GB 上限）。
+    """
+    if output_format == "mp3" and (LAMEENC_AVAILABLE or ffmpeg_available):
+        writer_class = LameMp3Writer if LAMEENC_AVAILABLE else FfmpegMp3Writer
+        extension = "mp3"
+        bytes_per_second = DEFAULT_BITRATE * 1000 / 8
+    else:
+        writer_class = WavStreamWriter
+        extension = "wav"
+        bytes_per_second = sample_rate * 2
+        if max_part_bytes:
+            max_part_bytes = min(max_part_bytes, WAV_MAX_DATA_BYTES)
+
+    def open_writer(path):
+        return writer_class(f"{path}.{extension}", sample_rate)
+
+    if max_part_seconds or max_part_bytes:
+        return PartedAudioWriter(base_path, sample_rate, open_writer, bytes_per_second,
+                                 max_part_seconds, max_part_bytes)
+    return open_writer(base_path)
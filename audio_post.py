@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+合成音頻後處理
+以 NumPy 向量運算處理逐句合成的 PCM 片段，可串流處理，不需要整份音頻在記憶體中：
+- trim_silence：依短時 RMS 門檻去除句首/句尾的靜音，只保留固定長度的前後留白
+- normalize_loudness：依有聲部分的 RMS 調整每句響度（原地運算，並限制峰值）
+- polish_segment：以上兩者的組合，錄製時在編碼前逐句套用
+- crossfade_concat：相鄰片段以線性交叉淡化拼接，避免接縫處的爆音
+"""
+
+DEFAULT_CROSSFADE_MS = 10
+
+# 靜音判定：10ms 音框的 RMS 低於 -45 dBFS
+SILENCE_THRESHOLD_DB = -45.0
+FRAME_MS = 10
+# 去除靜音後保留的句首/句尾留白，使句子間的停頓一致
+LEAD_MS = 40
+TAIL_MS = 200
+
+# 響度目標（有聲音框的 RMS）、最大增益與峰值上限
+TARGET_RMS_DB = -20.0
+MAX_GAIN_DB = 12.0
+PEAK_LIMIT = 0.97
+
+
+def _db_to_amplitude(db):
+    return 10.0 ** (db / 20.0)
+
+
+def _frame_rms(pcm, frame_length):
+    """逐音框 RMS（不足一框的尾端補零），回傳長度為音框數的陣列"""
+    import numpy as np
+
+    frames = -(-len(pcm) // frame_length)
+    padded = np.zeros(frames * frame_length, dtype=np.float32)
+    padded[:len(pcm)] = pcm
+    frames_view = padded.reshape(frames, frame_length)
+    return np.sqrt(np.einsum("ij,ij->i", frames_view, frames_view) / frame_length)
+
+
+def trim_silence(pcm, sample_rate, threshold_db=SILENCE_THRESHOLD_DB,
+                 lead_ms=LEAD_MS, tail_ms=TAIL_MS, frame_ms=FRAME_MS):
+    """去除句首/句尾低於門檻的靜音，保留 lead_ms / tail_ms 留白（回傳切片，不複製）
+
+    整段都低於門檻時回傳空陣列。
+    """
+    import numpy as np
+
+    pcm = np.asarray(pcm, dtype=np.float32).reshape(-1)
+    frame_length = max(1, int(sample_rate * frame_ms / 1000))
+    if not len(pcm):
+        return pcm
+
+    voiced = np.flatnonzero(_frame_rms(pcm, frame_length) >= _db_to_amplitude(threshold_db))
+    if not len(voiced):
+        return pcm[:0]
+
+    start = max(0, voiced[0] * frame_length - int(sample_rate * lead_ms / 1000))
+    end = min(len(pcm), (voiced[-1] + 1) * frame_length + int(sample_rate * tail_ms / 1000))
+    return pcm[start:end]
+
+
+def normalize_loudness(pcm, sample_rate, target_db=TARGET_RMS_DB, max_gain_db=MAX_GAIN_DB,
+                       peak_limit=PEAK_LIMIT, threshold_db=SILENCE_THRESHOLD_DB, frame_ms=FRAME_MS):
+    """依有聲音框的 RMS 將片段調整到目標響度（原地相乘，回傳同一陣列）
+
+    增益不超過 max_gain_db，且調整後峰值不超過 peak_limit，避免削波。
+    """
+    import numpy as np
+
+    if not len(pcm):
+        return pcm
+    frame_length = max(1, int(sample_rate * frame_ms / 1000))
+    rms = _frame_rms(pcm, frame_length)
+    voiced = rms[rms >= _db_to_amplitude(threshold_db)]
+    if not len(voiced):
+        return pcm
+
+    loudness = np.sqrt(np.mean(voiced * voiced))
+    gain = min(_db_to_amplitude(target_db) / loudness, _db_to_amplitude(max_gain_db))
+    peak = float(np.max(np.abs(pcm)))
+    if peak > 0:
+        gain = min(gain, peak_limit / peak)
+    np.multiply(pcm, np.float32(gain), out=pcm)
+    return pcm
+
+
+def polish_segment(pcm, sample_rate):
+    """單句後處理：去除前後靜音並調整響度（唯讀陣列會先複製）"""
+    pcm = trim_silence(pcm, sample_rate)
+    if not pcm.flags.writeable:
+        pcm = pcm.copy()
+    return normalize_loudness(pcm, sample_rate)
+
+
+def _fade_curves(length):
+    """線性淡入/淡出曲線（兩者相加恆為1，句子接縫處多為靜音，不會因重疊而削波）"""
+    import numpy as np
+
+    fade_in = (np.arange(length, dtype=np.float32) + 0.5) / length
+    return fade_in, 1.0 - fade_in
+
+
+def crossfade_concat(chunks, sample_rate, crossfade_ms=DEFAULT_CROSSFADE_MS):
+    """逐段產出交叉淡化拼接後的 PCM（每段保留尾端，等下一段到來時重疊混合）"""
+    import numpy as np
+
+    overlap = int(sample_rate * crossfade_ms / 1000)
+    tail = None
+
+    for pcm in chunks:
+        pcm = np.asarray(pcm, dtype=np.float32).reshape(-1)
+        if overlap <= 0:
+            yield pcm
+            continue
+
+        if tail is not None:
+            length = min(overlap, len(tail), len(pcm))
+            if length:
+                fade_in, fade_out = _fade_curves(length)
+                mixed = tail[len(tail) - length:] * fade_out + pcm[:length] * fade_in
+                pcm = np.concatenate([tail[:len(tail) - length], mixed, pcm[length:]])
+            else:
+                pcm = np.concatenate([tail, pcm])
+
+        # 保留尾端等待與下一段重疊
+        keep = min(overlap, len(pcm))
+        tail = pcm[len(pcm) - keep:]
+        if len(pcm) > keep:
+            yield pcm[:len(pcm) - keep]
+
+    if tail is not None and len(tail):
+        yield tail
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+音頻輸出端
+所有讀稿程式共用的播放介面，直接接收 NumPy float32 PCM，不需要暫存檔：
+- CallbackAudioSink：sounddevice 回呼式串流 + 環形緩衝區，片段間無縫播放
+- PygameAudioSink：未安裝 sounddevice 時以 pygame 聲道排隊播放
+- NullAudioSink：無音效裝置的伺服器使用（錄製檔案請用 audio_encoder.open_audio_writer）
+所有輸出端都會統計欠載（underrun）次數，即緩衝區在播放中被取空的次數，
+並支援暫停/繼續與立即停止（停止後的寫入直接丟棄）。
+"""
+
+import os
+import time
+import threading
+import importlib.util
+
+# 可用環境變數指定輸出端: auto | sounddevice | pygame | null
+AUDIO_SINK_ENV = "TTS_AUDIO_SINK"
+
+
+class RingBuffer:
+    def __init__(self, capacity):
+        """執行緒安全的 float32 環形緩衝區"""
+        import numpy as np
+
+        self.capacity = capacity
+        self._buffer = np.zeros(capacity, dtype=np.float32)
+        self._read_pos = 0
+        self._size = 0
+        self._cancelled = False
+        self._condition = threading.Condition()
+
+    @property
+    def available(self):
+        """緩衝區中待播放的樣本數"""
+        with self._condition:
+            return self._size
+
+    def write(self, samples):
+        """寫入樣本，緩衝區已滿時阻塞等待（對上游形成背壓）"""
+        offset = 0
+        while offset < len(samples):
+            with self._condition:
+                while self._size == self.capacity and not self._cancelled:
+                    self._condition.wait()
+                if self._cancelled:
+                    return
+
+                count = min(len(samples) - offset, self.capacity - self._size)
+                write_pos = (self._read_pos + self._size) % self.capacity
+                first = min(count, self.capacity - write_pos)
+                self._buffer[write_pos:write_pos + first] = samples[offset:offset + first]
+                self._buffer[:count - first] = samples[offset + first:offset + count]
+
+                self._size += count
+                offset += count
+                self._condition.notify_all()
+
+    def read_into(self, out):
+        """讀出樣本填入 out，不足部分補零，回傳實際讀出的樣本數"""
+        with self._condition:
+            count = min(len(out), self._size)
+            first = min(count, self.capacity - self._read_pos)
+            out[:first] = self._buffer[self._read_pos:self._read_pos + first]
+            out[first:count] = self._buffer[:count - first]
+            out[count:] = 0
+
+            self._read_pos = (self._read_pos + count) % self.capacity
+            self._size -= count
+            self._condition.notify_all()
+            return count
+
+    def wait_empty(self, timeout=None):
+        """等待緩衝區被取空"""
+        with self._condition:
+            return self._condition.wait_for(lambda: self._size == 0, timeout)
+
+    def clear(self, cancel=False):
+        """清空緩衝區；cancel 時喚醒並結束阻塞中的寫入，之後的寫入都丟棄"""
+        with self._condition:
+            self._read_pos = 0
+            self._size = 0
+            self._cancelled = self._cancelled or cancel
+            self._condition.notify_all()
+
+
+class AudioSink:
+    """音頻輸出端基底類別"""
+
+    def __init__(self, sample_rate):
+        self.sample_rate = sample_rate
+        self.samples_written = 0
+        self.samples_played = 0
+        self.underruns = 0
+        self.paused = False
+        self.stopped = False
+
+    def write(self, pcm):
+        """送出一段 float32 PCM"""
+        raise NotImplementedError
+
+    def drain(self):
+        """等待已送出的音頻播放完畢"""
+
+    def pause(self):
+        """暫停播放（緩衝內容保留，寫入在緩衝區滿時阻塞）"""
+        self.paused = True
+
+    def resume(self):
+        """繼續播放"""
+        self.paused = False
+
+    def stop(self):
+        """立即停止播放並丟棄緩衝內容"""
+        self.stopped = True
+
+    def close(self):
+        """關閉輸出端"""
+        self.drain()
+
+    def get_stats(self):
+        """輸出統計"""
+        return {
+            "samples_written": self.samples_written,
+            "samples_played": self.samples_played,
+            "underruns": self.underruns
+        }
+
+
+class CallbackAudioSink(AudioSink):
+    def __init__(self, sample_rate, buffer_seconds=10.0, blocksize=1024):
+        """以 sounddevice 回呼式串流播放環形緩衝區內容"""
+        super().__init__(sample_rate)
+        self._ring = RingBuffer(int(sample_rate * buffer_seconds))
+        self._active = False
+
+        import sounddevice
+        self._stream = sounddevice.OutputStream(
+            samplerate=sample_rate,
+            channels=1,
+            dtype="float32",
+            blocksize=blocksize,
+            callback=self._callback
+        )
+        self._stream.start()
+
+    def _callback(self, outdata, frames, time_info, status):
+        if self.paused:
+            outdata.fill(0)
+            return
+        count = self._ring.read_into(outdata[:, 0])
+        self.samples_played += count
+        # 播放中（尚未 drain）緩衝區被取空即為欠載
+        if count < frames and self._active:
+            self.underruns += 1
+            self._active = False
+
+    def write(self, pcm):
+        import numpy as np
+
+        if self.stopped:
+            return
+        samples = np.asarray(pcm, dtype=np.float32).reshape(-1)
+        self.samples_written += len(samples)
+        self._ring.write(samples)
+        self._active = True
+
+    def drain(self):
+        self._active = False
+        self._ring.wait_empty()
+        # 等待裝置端緩衝播放完畢
+        time.sleep(self._stream.latency)
+
+    def stop(self):
+        super().stop()
+        self._active = False
+        self.paused = False
+        self._ring.clear(cancel=True)
+
+    def close(self):
+        self.drain()
+        self._stream.stop()
+        self._stream.close()
+
+
+class PygameAudioSink(AudioSink):
+    def __init__(self, sample_rate):
+        """以 pygame 聲道排隊播放（片段間無縫，但需輪詢佇列）"""
+        super().__init__(sample_rate)
+        import pygame
+
+        self._pygame = pygame
+        mixer_format = pygame.mixer.get_init()
+        if mixer_format != (sample_rate, -16, 1):
+            if mixer_format:
+                pygame.mixer.quit()
+            pygame.mixer.init(frequency=sample_rate, size=-16, channels=1)
+
+        self._channel = None
+        self._pending = []
+
+    def write(self, pcm):
+        import numpy as np
+
+        if self.stopped:
+            return
+        samples = (np.clip(np.asarray(pcm, dtype=np.float32), -1.0, 1.0) * 32767).astype(np.int16)
+        sound = self._pygame.mixer.Sound(buffer=samples.tobytes())
+        self.samples_written += len(samples)
+
+        if self._channel is None or not self._channel.get_busy():
+            if self._channel is not None:
+                self.underruns += 1
+            self._channel = sound.play()
+        else:
+            # 等待前一個排隊片段開始播放後再排入下一段
+            channel = self._channel
+            while channel.get_queue() is not None and not self.stopped:
+                self._pygame.time.wait(10)
+            # 等待期間被 stop()（GUI 的停止鈕）時不再排入
+            if self.stopped or self._channel is not channel:
+                return
+            channel.queue(sound)
+
+        # 保留引用，避免播放中的片段被回收
+        self._pending = self._pending[-1:] + [(sound, len(samples))]
+        self.samples_played = self.samples_written - sum(length for _, length in self._pending)
+
+    def drain(self):
+        while self._channel is not None and (self._channel.get_busy() or self.paused):
+            self._pygame.time.wait(10)
+        self._channel = None
+        self._pending = []
+        self.samples_played = self.samples_written
+
+    def pause(self):
+        super().pause()
+        self._pygame.mixer.pause()
+
+    def resume(self):
+        super().resume()
+        self._pygame.mixer.unpause()
+
+    def stop(self):
+        super().stop()
+        self.paused = False
+        if self._channel is not None:
+            self._channel.stop()
+        self._channel = None
+        self._pending = []
+
+
+class NullAudioSink(AudioSink):
+    def __init__(self, sample_rate, realtime=False):
+        """丟棄音頻（無音效裝置的伺服器）；realtime 時按實際時長等待"""
+        super().__init__(sample_rate)
+        self.realtime = realtime
+
+    def write(self, pcm):
+        count = len(pcm)
+        self.samples_written += count
+        if self.realtime:
+            time.sleep(count / self.sample_rate)
+        self.samples_played += count
+
+
+def create_audio_sink(sample_rate, kind=None):
+    """建立音頻輸出端（kind: auto | sounddevice | pygame | null）"""
+    kind = kind or os.environ.get(AUDIO_SINK_ENV, "auto")
+
+    if kind in ("auto", "sounddevice") and importlib.util.find_spec("sounddevice") is not None:
+        try:
+            return CallbackAudioSink(sample_rate)
+        except Exception as e:
+            if kind == "sounddevice":
+                raise
+            print(f"⚠️  sounddevice 輸出失敗，改用 pygame: {e}")
+
+    if kind in ("auto", "pygame"):
+        try:
+            return PygameAudioSink(sample_rate)
+        except Exception as e:
+            if kind == "pygame":
+                raise
+            print(f"⚠️  沒有可用的音效裝置，音頻將被丟棄: {e}")
+
+    return NullAudioSink(sample_rate)
+
+
+def play_pcm(pcm, sample_rate, kind=None):
+    """播放一段 PCM 並等待播放完畢，回傳輸出統計"""
+    sink = create_audio_sink(sample_rate, kind)
+    try:
+        sink.write(pcm)
+    finally:
+        sink.close()
+    return sink.get_stats()
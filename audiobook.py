@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+有聲書匯出
+依章節標題（第N章、Chapter N、Markdown 標題等）切分稿件，
+以多個工作行程平行合成各章，輸出：
+- 每章一個音軌（01 - 標題.mp3 …）
+- 串接全部章節的完整檔案（有 ffmpeg 時寫入 ID3 章節標記）
+- audiobook.json / audiobook.m3u / audiobook.cue 章節索引與時間戳記
+- 各章與完整檔案的句子時間軸（.align.json / .srt / .vtt）
+audiobook.json 同時記錄每章文字與設定的雜湊，修改稿件後只重新合成變動的章節。
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import subprocess
+import multiprocessing
+
+import tts_batch
+from tts_batch import default_worker_settings
+from text_source import read_text
+from alignment import SentenceTimeline
+
+ALIGNMENT_SUFFIXES = (".align.json", ".srt", ".vtt")
+
+INDEX_NAME = "audiobook.json"
+COMBINED_NAME = "audiobook"
+
+# 獨立成行的章節標題（以句末標點結尾的行視為內文，例如「第一部分的內容…。」）
+CHAPTER_PATTERN = re.compile(
+    r"^\s*(?!.*[。！？；!?;]\s*$)(?:"
+    r"第[0-9０-９一二三四五六七八九十百千零〇兩两]+[章回節节卷部篇].{0,40}"
+    r"|(?:Chapter|CHAPTER|Part|PART)\s+[0-9IVXLCivxlc]+\b.{0,60}"
+    r"|#{1,3}\s+.{1,60}"
+    r"|(?:序章|序言|楔子|前言|引子|尾聲|尾声|後記|后记|番外).{0,30}"
+    r")\s*$"
+)
+MAX_TITLE_CHARS = 40
+
+
+def split_chapters(text):
+    """依章節標題切分，回傳 [{"title": 標題, "text": 內文}, ...]
+
+    第一個標題之前的內容作為「開頭」章節；沒有任何標題時整份稿件為一章。
+    """
+    chapters = []
+    title = "開頭"
+    lines = []
+
+    def flush():
+        body = "\n".join(lines).strip()
+        if body:
+            chapters.append({"title": title, "text": body})
+
+    for line in text.splitlines():
+        if CHAPTER_PATTERN.match(line):
+            flush()
+            title = line.strip().lstrip("#").strip()[:MAX_TITLE_CHARS]
+            lines = []
+        else:
+            lines.append(line)
+    flush()
+    return chapters
+
+
+def _safe_filename(title):
+    """去除檔名中不允許的字元"""
+    return re.sub(r'[\\/:*?"<>|\s]+', " ", title).strip() or "chapter"
+
+
+def _chapter_signature(chapter, settings, output_format):
+    """章節文字與合成設定的雜湊，任一變動即需重新合成"""
+    data = json.dumps({
+        "text": chapter["text"],
+        "speaker": settings.get("speaker"),
+        "speaker_wav": settings.get("speaker_wav"),
+        "language": settings.get("language"),
+        "precision": settings.get("precision"),
+        "post_process": settings.get("post_process", True),
+        "format": output_format
+    }, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def _load_index(output_dir):
+    try:
+        with open(os.path.join(output_dir, INDEX_NAME), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"chapters": []}
+
+
+def _render_chapter(task):
+    """工作行程：合成單一章節，回傳 (序號, 檔案路徑, 音頻秒數, 錯誤, 耗時)"""
+    index, text, output_path = task
+    reader = tts_batch._WORKER_READER
+    start_time = time.time()
+    if reader is None:
+        # 工作行程載入模型失敗（原因記錄在 _WORKER_ERROR）
+        return index, None, 0.0, tts_batch._WORKER_ERROR or "模型未載入", 0.0
+    try:
+        saved_path = reader.synthesize_to_file(text, output_path)
+        if reader.use_cache:
+            reader.synthesis_cache.flush_stats()
+        # 以實際寫入的長度計算（去除靜音與交叉淡化後比合成的原始長度短）
+        duration = reader.timeline.total_samples / reader.sample_rate
+        return index, saved_path, duration, None, time.time() - start_time
+    except Exception as e:
+        return index, None, 0.0, str(e), time.time() - start_time
+
+
+def _combine_tracks(paths, combined_base, chapters, ffmpeg_available):
+    """串接各章音軌為完整檔案，回傳檔案路徑
+
+    WAV 逐塊複製音頻資料；MP3 有 ffmpeg 時以 concat 串接並寫入章節標記，
+    否則直接串接 MP3 音框（標記只記錄在索引檔）。
+    """
+    extension = os.path.splitext(paths[0])[1].lower()
+    combined_path = f"{combined_base}{extension}"
+
+    if extension == ".wav":
+        import wave
+        from audio_encoder import WavStreamWriter
+
+        with wave.open(paths[0], "rb") as first:
+            sample_rate = first.getframerate()
+        writer = WavStreamWriter(combined_path, sample_rate)
+        try:
+            for path in paths:
+                with wave.open(path, "rb") as track:
+                    while True:
+                        frames = track.readframes(sample_rate * 10)
+                        if not frames:
+                            break
+                        writer.write_frames(frames)
+        finally:
+            writer.close()
+        return combined_path
+
+    if ffmpeg_available:
+        list_path = f"{combined_base}.concat.txt"
+        metadata_path = f"{combined_base}.ffmetadata"
+        with open(list_path, "w", encoding="utf-8") as f:
+            for path in paths:
+                escaped = os.path.abspath(path).replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+        with open(metadata_path, "w", encoding="utf-8") as f:
+            f.write(";FFMETADATA1\n")
+            for chapter in chapters:
+                title = re.sub(r"([=;#\\\n])", r"\\\1", chapter["title"])
+                start_ms = int(chapter["start"] * 1000)
+                end_ms = int((chapter["start"] + chapter["duration"]) * 1000)
+                f.write(f"[CHAPTER]\nTIMEBASE=1/1000\nSTART={start_ms}\nEND={end_ms}\ntitle={title}\n")
+        try:
+            result = subprocess.run([
+                'ffmpeg', '-loglevel', 'error', '-f', 'concat', '-safe', '0', '-i', list_path,
+                '-i', metadata_path, '-map_metadata', '1', '-map', '0:a', '-c', 'copy',
+                combined_path, '-y'
+            ], capture_output=True, text=True)
+        finally:
+            for path in (list_path, metadata_path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        if result.returncode == 0:
+            return combined_path
+        print(f"⚠️  ffmpeg 串接失敗，改為直接串接音框: {result.stderr.strip()}")
+
+    with open(combined_path, "wb") as out:
+        for path in paths:
+            with open(path, "rb") as track:
+                for block in iter(lambda: track.read(1024 * 1024), b""):
+                    out.write(block)
+    return combined_path
+
+
+def _combine_alignment(output_dir, chapters, combined_base):
+    """串接各章的句子時間軸為完整檔案的時間軸，缺少任何一章時略過"""
+    timeline = None
+    for chapter in chapters:
+        path = os.path.join(output_dir, os.path.splitext(chapter["file"])[0] + ".align.json")
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                alignment = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if timeline is None:
+            timeline = SentenceTimeline(alignment["sample_rate"])
+        # 章節之間直接串接；章節內的交叉淡化重疊已反映在各句的取樣位置
+        timeline.extend(alignment)
+    if timeline is not None:
+        timeline.save(combined_base)
+    return timeline
+
+
+def _format_cue_time(seconds):
+    """CUE 時間格式 mm:ss:ff（每秒75格）"""
+    frames = int(round(seconds * 75))
+    minutes, frames = divmod(frames, 60 * 75)
+    secs, frames = divmod(frames, 75)
+    return f"{minutes:02d}:{secs:02d}:{frames:02d}"
+
+
+def write_playlists(output_dir, index):
+    """依索引寫入 M3U 播放清單與 CUE 章節表"""
+    with open(os.path.join(output_dir, "audiobook.m3u"), "w", encoding="utf-8") as f:
+        f.write("#EXTM3U\n")
+        f.write(f"#PLAYLIST:{index['title']}\n")
+        for chapter in index["chapters"]:
+            f.write(f"#EXTINF:{int(round(chapter['duration']))},{chapter['title']}\n")
+            f.write(f"{chapter['file']}\n")
+
+    if not index.get("combined"):
+        return
+    file_type = "WAVE" if index["combined"].lower().endswith(".wav") else "MP3"
+    with open(os.path.join(output_dir, "audiobook.cue"), "w", encoding="utf-8") as f:
+        f.write(f'TITLE "{index["title"]}"\n')
+        f.write(f'FILE "{index["combined"]}" {file_type}\n')
+        for number, chapter in enumerate(index["chapters"], 1):
+            f.write(f"  TRACK {number:02d} AUDIO\n")
+            f.write(f'    TITLE "{chapter["title"]}"\n')
+            f.write(f"    INDEX 01 {_format_cue_time(chapter['start'])}\n")
+
+
+def export_audiobook(source_path, output_dir, settings, workers=None, torch_threads=None,
+                     output_format="mp3", ffmpeg_available=True):
+    """匯出有聲書，回傳失敗的章節數"""
+    content, encoding = read_text(source_path)
+    chapters = split_chapters(content)
+    write_alignment = settings.get("write_alignment", True)
+    if not chapters:
+        raise Exception("稿件內容為空")
+
+    os.makedirs(output_dir, exist_ok=True)
+    old_chapters = _load_index(output_dir)["chapters"]
+    previous = {entry["signature"]: entry for entry in old_chapters if entry.get("signature")}
+
+    tasks = []
+    entries = []
+    for number, chapter in enumerate(chapters, 1):
+        signature = _chapter_signature(chapter, settings, output_format)
+        base_name = f"{number:02d} - {_safe_filename(chapter['title'])}"
+        entry = {"title": chapter["title"], "signature": signature, "chars": len(chapter["text"])}
+
+        old = previous.get(signature)
+        # 要求時間軸時，之前未輸出時間軸的章節也需重新合成
+        if old and os.path.splitext(old["file"])[0] == base_name \
+                and os.path.exists(os.path.join(output_dir, old["file"])) \
+                and (not write_alignment or os.path.exists(os.path.join(output_dir, base_name + ".align.json"))):
+            entry.update(file=old["file"], duration=old["duration"])
+        else:
+            tasks.append((number - 1, chapter["text"], os.path.join(output_dir, f"{base_name}.{output_format}")))
+        entries.append(entry)
+
+    print(f"📖 有聲書: {len(chapters)} 章（編碼 {encoding}），{len(tasks)} 章待合成，"
+          f"{len(chapters) - len(tasks)} 章已是最新")
+
+    failures = 0
+    if tasks:
+        workers, torch_threads = default_worker_settings(workers, torch_threads)
+        workers = min(workers, len(tasks))
+        print(f"⚙️  工作行程: {workers} 個，每個行程 torch 執行緒: {torch_threads}")
+        # 長章節先開始，縮短最後一個章節完成的時間
+        tasks.sort(key=lambda task: -len(task[1]))
+
+        start_time = time.time()
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(workers, initializer=tts_batch._init_worker,
+                          initargs=(torch_threads, settings)) as pool:
+            for done, (index, saved_path, duration, error, elapsed) in enumerate(
+                    pool.imap_unordered(_render_chapter, tasks), 1):
+                title = entries[index]["title"]
+                if error:
+                    failures += 1
+                    print(f"❌ [{done}/{len(tasks)}] {title}: {error}")
+                    continue
+                entries[index].update(file=os.path.basename(saved_path), duration=round(duration, 3))
+                print(f"✅ [{done}/{len(tasks)}] {title} ({duration:.0f} 秒音頻，耗時 {elapsed:.1f} 秒)")
+        print(f"🏁 章節合成完成，耗時 {time.time() - start_time:.1f} 秒")
+
+    # 索引只記錄已完成的章節；有章節失敗時不串接完整檔案，下次執行只補合成失敗的章節
+    completed = [entry for entry in entries if entry.get("file")]
+    start = 0.0
+    for entry in completed:
+        entry["start"] = round(start, 3)
+        start += entry["duration"]
+
+    index = {
+        "title": os.path.splitext(os.path.basename(source_path))[0],
+        "source": os.path.abspath(source_path),
+        "duration": round(start, 3),
+        "combined": None,
+        "chapters": completed
+    }
+    if not failures:
+        combined_path = _combine_tracks(
+            [os.path.join(output_dir, entry["file"]) for entry in completed],
+            os.path.join(output_dir, COMBINED_NAME), completed, ffmpeg_available
+        )
+        index["combined"] = os.path.basename(combined_path)
+        print(f"📀 完整檔案: {combined_path}")
+        if write_alignment:
+            _combine_alignment(output_dir, completed, os.path.join(output_dir, COMBINED_NAME))
+
+    # 刪除章節改名、重新編號或刪除後留下的舊音軌與時間軸
+    current_files = {entry["file"] for entry in completed}
+    for entry in old_chapters:
+        if entry.get("file") and entry["file"] not in current_files:
+            base = os.path.join(output_dir, os.path.splitext(entry["file"])[0])
+            for path in [os.path.join(output_dir, entry["file"])] + [base + suffix for suffix in ALIGNMENT_SUFFIXES]:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    temp_path = os.path.join(output_dir, f"{INDEX_NAME}.tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, os.path.join(output_dir, INDEX_NAME))
+    write_playlists(output_dir, index)
+
+    print(f"📁 輸出資料夾: {output_dir}")
+    return failures
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+XTTS v2 批次推理排程
+將待合成的句子依長度分組成批次送入模型，再依原順序拆回各句音頻。
+第一個請求進入後最多等待 max_wait 秒湊批次，因此延遲有上限。
+
+XTTS 的 GPT 自回歸取樣只支援單一序列（前綴嵌入存放在模型共用狀態中），
+所以 GPT 階段逐句執行；HiFi-GAN 聲碼器是純卷積網路，批次內的潛在向量
+補零對齊後一次解碼，再依各句長度裁切。
+"""
+
+import time
+import queue
+import threading
+from concurrent.futures import Future
+
+
+class BatchScheduler:
+    def __init__(self, synthesize_batch, max_batch_size=4, max_wait=0.05):
+        """初始化批次排程
+
+        synthesize_batch(texts) 需回傳與 texts 等長、順序相同的 PCM 列表。
+        """
+        self.synthesize_batch = synthesize_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.batches_run = 0
+        self.sentences_run = 0
+
+        self._requests = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="xtts-batch", daemon=True)
+        self._thread.start()
+
+    def submit(self, text):
+        """提交單句，回傳 Future（結果為 float32 PCM）"""
+        if self._closed:
+            raise RuntimeError("批次排程已關閉")
+        future = Future()
+        self._requests.put((text, future))
+        return future
+
+    def map(self, texts):
+        """依序產出每句的合成結果"""
+        futures = [self.submit(text) for text in texts]
+        for future in futures:
+            yield future.result()
+
+    def close(self):
+        """停止排程執行緒（已提交的請求會先完成）"""
+        self._closed = True
+        self._requests.put(None)
+        self._thread.join()
+
+    def _collect_batch(self, first):
+        """以第一個請求起算，在期限內收集至多 max_batch_size 個請求"""
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self._requests.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._requests.get()
+            if first is None:
+                return
+
+            batch = self._collect_batch(first)
+            # 長度相近的句子放在一起，補零浪費較少
+            batch.sort(key=lambda item: len(item[0]))
+            texts = [text for text, _ in batch]
+
+            try:
+                results = self.synthesize_batch(texts)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            self.batches_run += 1
+            self.sentences_run += len(batch)
+            for (_, future), pcm in zip(batch, results):
+                future.set_result(pcm)
+
+
+def xtts_synthesize_batch(xtts, texts, language, gpt_cond_latent, speaker_embedding):
+    """XTTS v2 批次合成：GPT 逐句產生潛在向量，聲碼器批次解碼"""
+    import numpy as np
+    import torch
+
+    config = xtts.config
+    device = gpt_cond_latent.device
+    latents = []
+
+    with torch.no_grad():
+        for text in texts:
+            text = text.strip().lower()
+            text_tokens = torch.IntTensor(xtts.tokenizer.encode(text, lang=language)).unsqueeze(0).to(device)
+
+            gpt_codes = xtts.gpt.generate(
+                cond_latents=gpt_cond_latent,
+                text_inputs=text_tokens,
+                input_tokens=None,
+                do_sample=True,
+                top_p=config.top_p,
+                top_k=config.top_k,
+                temperature=config.temperature,
+                num_return_sequences=xtts.gpt_batch_size,
+                num_beams=config.num_beams,
+                length_penalty=config.length_penalty,
+                repetition_penalty=config.repetition_penalty,
+                output_attentions=False
+            )
+            expected_output_len = torch.tensor(
+                [gpt_codes.shape[-1] * xtts.gpt.code_stride_len], device=device
+            )
+            text_len = torch.tensor([text_tokens.shape[-1]], device=device)
+            gpt_latents = xtts.gpt(
+                text_tokens,
+                text_len,
+                gpt_codes,
+                expected_output_len,
+                cond_latents=gpt_cond_latent,
+                return_attentions=False,
+                return_latent=True
+            )
+            latents.append(gpt_latents[0])
+
+        # 補零對齊後一次解碼
+        lengths = [latent.shape[0] for latent in latents]
+        padded = torch.zeros(len(latents), max(lengths), latents[0].shape[-1], device=device)
+        for index, latent in enumerate(latents):
+            padded[index, :latent.shape[0]] = latent
+
+        wavs = xtts.hifigan_decoder(padded, g=speaker_embedding).cpu()
+
+    samples_per_latent = wavs.shape[-1] // max(lengths)
+    return [
+        np.asarray(wavs[index].reshape(-1)[:length * samples_per_latent], dtype=np.float32)
+        for index, length in enumerate(lengths)
+    ]
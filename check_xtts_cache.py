@@ -39,6 +39,15 @@ def check_xtts_cache():
             print("📋 主要模型文件:")
             for name, size in sorted(important_files, key=lambda x: x[1], reverse=True):
                 print(f"  • {name}: {size:.1f} MB")
+        
+        # 檢查 mmap 權重轉換狀態
+        from xtts_weights import get_weights_info
+        weights_info = get_weights_info(model_path)
+        if weights_info['converted']:
+            print(f"✅ mmap 權重 ({weights_info['format']}): 已轉換")
+        else:
+            print(f"❌ mmap 權重 ({weights_info['format']}): 未轉換")
+            print("💡 執行 python xtts_weights.py 轉換，或首次載入時自動轉換")
     else:
         print("❌ 磁盤緩存: 未下載")
         print("💡 首次使用XTTS v2時會自動下載約1.8GB模型")
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TTS 引擎可用性登錄
+以 importlib.util.find_spec 檢查套件是否已安裝（不實際匯入 torch/TTS 等大型框架），
+各項檢查與 ffmpeg 偵測在背景執行緒平行進行，結果緩存在小型狀態檔中，
+之後啟動直接讀取；真正匯入只在選用該引擎時才發生。
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+import subprocess
+import importlib.util
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# 各引擎需要的套件（只檢查是否安裝，不匯入）
+ENGINE_REQUIREMENTS = {
+    'pyttsx3': ['pyttsx3'],
+    'win32': ['win32com'],
+    'xtts': ['TTS', 'torch']
+}
+
+PROBE_CACHE_PATH = Path.home() / ".cache" / "tts_reader" / "engine_probe.json"
+# 狀態檔有效期限（秒），過期或換了 Python 環境即重新檢查
+PROBE_CACHE_TTL = 24 * 60 * 60
+
+
+def _module_installed(name):
+    """檢查套件是否已安裝"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def _probe_engine(requirements):
+    return all(_module_installed(name) for name in requirements)
+
+
+def _probe_ffmpeg():
+    """檢查 ffmpeg 是否可用，回傳版本字串或 None"""
+    try:
+        result = subprocess.run(['ffmpeg', '-version'], capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if result.returncode != 0:
+        return None
+    first_line = result.stdout.splitlines()[0] if result.stdout else "ffmpeg"
+    return first_line.strip()
+
+
+class EngineRegistry(Mapping):
+    def __init__(self, cache_path=PROBE_CACHE_PATH, ttl=PROBE_CACHE_TTL):
+        """引擎可用性（以 ENGINES['xtts'] 方式查詢，第一次查詢時才檢查）"""
+        self.cache_path = Path(cache_path)
+        self.ttl = ttl
+        self._state = None
+        self._lock = threading.Lock()
+        self._background = None
+
+    def _environment_key(self):
+        """以 Python 執行檔與版本區分不同的虛擬環境"""
+        return f"{sys.executable}|{sys.version.split()[0]}"
+
+    def _load_cached(self):
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                cached = json.load(f).get(self._environment_key())
+        except (OSError, ValueError, AttributeError):
+            return None
+        if not cached or time.time() - cached.get("probed_at", 0) > self.ttl:
+            return None
+        return cached
+
+    def _save_cached(self, state):
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                with open(self.cache_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = {}
+            data[self._environment_key()] = state
+
+            temp_path = self.cache_path.with_suffix(f".{os.getpid()}.tmp")
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(temp_path, self.cache_path)
+        except OSError:
+            pass
+
+    def _probe_all(self):
+        """平行檢查所有引擎與 ffmpeg"""
+        with ThreadPoolExecutor(max_workers=len(ENGINE_REQUIREMENTS) + 1) as executor:
+            ffmpeg_future = executor.submit(_probe_ffmpeg)
+            engine_futures = {
+                name: executor.submit(_probe_engine, requirements)
+                for name, requirements in ENGINE_REQUIREMENTS.items()
+            }
+            engines = {name: future.result() for name, future in engine_futures.items()}
+            ffmpeg_version = ffmpeg_future.result()
+
+        return {
+            "probed_at": time.time(),
+            "engines": engines,
+            "ffmpeg": ffmpeg_version
+        }
+
+    def probe(self, refresh=False):
+        """取得檢查結果（優先使用狀態檔緩存）"""
+        with self._lock:
+            if self._state is not None and not refresh:
+                return self._state
+
+            state = None if refresh else self._load_cached()
+            if state is None:
+                state = self._probe_all()
+                self._save_cached(state)
+            self._state = state
+            return state
+
+    def start_background_probe(self):
+        """在背景執行緒預先檢查，不阻塞程式啟動"""
+        if self._background is None:
+            self._background = threading.Thread(target=self.probe, name="engine-probe", daemon=True)
+            self._background.start()
+
+    def invalidate(self):
+        """實際匯入失敗時清除結果，下次查詢重新檢查"""
+        with self._lock:
+            self._state = None
+        try:
+            self.cache_path.unlink()
+        except OSError:
+            pass
+
+    @property
+    def ffmpeg_available(self):
+        return self.probe()["ffmpeg"] is not None
+
+    @property
+    def ffmpeg_version(self):
+        return self.probe()["ffmpeg"]
+
+    def __getitem__(self, name):
+        return self.probe()["engines"][name]
+
+    def __iter__(self):
+        return iter(self.probe()["engines"])
+
+    def __len__(self):
+        return len(self.probe()["engines"])
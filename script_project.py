@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+稿件專案（增量重新合成）
+每份稿件對應一個專案資料夾，project.json 記錄每一句的指紋
+（正規化文字 + 說話者 + 語言 + 模型的雜湊）與對應的音頻片段。
+稿件修改後重新錄製時，只有新增或變動的句子需要合成，
+其餘直接沿用已保存的片段，再以交叉淡化拼接成完整音軌。
+清單記錄片段的取樣率；取樣率或格式版本不符時清除所有片段，視為新專案。
+"""
+
+import os
+import json
+import hashlib
+
+MANIFEST_NAME = "project.json"
+MANIFEST_VERSION = 1
+
+
+def default_project_dir(output_folder, source_path):
+    """依稿件路徑決定專案資料夾（同名稿件放在不同位置時不會互相覆蓋）"""
+    source_path = os.path.abspath(source_path)
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    digest = hashlib.sha256(source_path.encode("utf-8")).hexdigest()[:8]
+    return os.path.join(output_folder, "projects", f"{stem}-{digest}")
+
+
+class ScriptProject:
+    def __init__(self, project_dir, sample_rate):
+        """開啟（或建立）稿件專案"""
+        self.project_dir = project_dir
+        self.sample_rate = sample_rate
+        self.segment_dir = os.path.join(project_dir, "segments")
+        self._manifest_path = os.path.join(project_dir, MANIFEST_NAME)
+        os.makedirs(self.segment_dir, exist_ok=True)
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self):
+        try:
+            with open(self._manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = None
+
+        if (manifest and manifest.get("version") == MANIFEST_VERSION
+                and manifest.get("sample_rate") == self.sample_rate):
+            return manifest
+
+        # 取樣率不同（或來源不明）的片段無法拼接，清除後視為新專案；
+        # 立即寫入清單記錄取樣率，中途停止時已合成的片段下次仍可沿用
+        self._remove_segments()
+        manifest = {"version": MANIFEST_VERSION, "sample_rate": self.sample_rate, "segments": []}
+        self._write_manifest(manifest)
+        return manifest
+
+    def _write_manifest(self, manifest):
+        temp_path = f"{self._manifest_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self._manifest_path)
+
+    def _remove_segments(self, keep=()):
+        """刪除片段檔（保留 keep 中的指紋）"""
+        for name in os.listdir(self.segment_dir):
+            if name.endswith(".npy") and name[:-4] not in keep:
+                try:
+                    os.remove(os.path.join(self.segment_dir, name))
+                except OSError:
+                    pass
+
+    def _segment_path(self, fingerprint):
+        return os.path.join(self.segment_dir, f"{fingerprint}.npy")
+
+    def has_segment(self, fingerprint):
+        """檢查片段是否已保存"""
+        return os.path.exists(self._segment_path(fingerprint))
+
+    def load_segment(self, fingerprint):
+        """讀取片段（以 16-bit 保存，讀出時轉回 float32）"""
+        import numpy as np
+
+        return np.load(self._segment_path(fingerprint)).astype(np.float32) / 32767.0
+
+    def save_segment(self, fingerprint, pcm):
+        """保存片段（先寫暫存檔再替換）"""
+        import numpy as np
+
+        path = self._segment_path(fingerprint)
+        temp_path = f"{path}.{os.getpid()}.tmp.npy"
+        np.save(temp_path, (np.clip(pcm, -1.0, 1.0) * 32767).astype(np.int16))
+        os.replace(temp_path, path)
+
+    def save_manifest(self, sentences, fingerprints):
+        """寫入本次稿件的句子列表，並刪除不再使用的片段"""
+        self.manifest["segments"] = [
+            {"fingerprint": fingerprint, "text": sentence}
+            for sentence, fingerprint in zip(sentences, fingerprints)
+        ]
+        self._write_manifest(self.manifest)
+        self._remove_segments(keep=set(fingerprints))
@@ -3,19 +3,113 @@
 """
 簡化版 TTS 讀稿機 - 確保可用
 結合系統 TTS 和 XTTS v2，提供可靠的語音合成
+各引擎/模型的失敗原因記錄在 ~/.cache/tts_reader/engine_health.json：
+失敗的引擎在冷卻時間內直接略過（連續失敗時冷卻時間加倍），
+成功的引擎優先使用，載入過的模型保留在記憶體中供後續呼叫使用。
+播放失敗（音效裝置問題）不計入引擎失敗，也不會讓已載入的模型失效。
 """
 
 import sys
 import os
-import tempfile
+import json
+import time
 import argparse
+from pathlib import Path
 
-def try_system_tts(text):
-    """嘗試使用系統 TTS"""
-    try:
+from audio_sink import play_pcm
+
+HEALTH_STATE_PATH = Path.home() / ".cache" / "tts_reader" / "engine_health.json"
+
+# 失敗後的冷卻時間（秒），連續失敗時加倍，最長 6 小時
+COOLDOWN_SECONDS = 5 * 60
+MAX_COOLDOWN_SECONDS = 6 * 60 * 60
+
+# Coqui TTS 模型（依序嘗試）
+COQUI_MODELS = [
+    "tts_models/zh-CN/baker/tacotron2-DDC-GST",  # 中文模型
+    "tts_models/en/ljspeech/tacotron2-DDC",      # 英文模型
+    "tts_models/multilingual/multi-dataset/xtts_v2"  # XTTS v2
+]
+XTTS_SPEAKER = "Claribel Dervla"
+XTTS_LANGUAGE = "zh"
+
+# 已成功載入的引擎與模型（同一行程內的後續呼叫直接使用）
+_LOADED_ENGINES = {}
+
+
+class PlaybackError(Exception):
+    """合成成功但音效裝置播放失敗（不是引擎本身的問題）"""
+
+
+class EngineHealth:
+    def __init__(self, path=HEALTH_STATE_PATH):
+        """各引擎的健康狀態（斷路器），保存在磁碟供下次執行使用"""
+        self.path = Path(path)
+        self.state = self._load()
+    
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            if isinstance(state.get("engines"), dict):
+                return state
+        except (OSError, ValueError, AttributeError):
+            pass
+        return {"engines": {}, "preferred": None}
+    
+    def save(self):
+        """寫入狀態檔（先寫暫存檔再替換）"""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(self.state, f, ensure_ascii=False, indent=2)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"⚠️  無法保存引擎狀態: {e}")
+    
+    def entry(self, key):
+        return self.state["engines"].setdefault(key, {"failures": 0, "open_until": 0})
+    
+    def cooldown_remaining(self, key):
+        """冷卻剩餘秒數，0 表示可以使用"""
+        return max(0.0, self.entry(key).get("open_until", 0) - time.time())
+    
+    def record_failure(self, key, error):
+        """記錄失敗並開啟斷路器"""
+        entry = self.entry(key)
+        entry["failures"] = entry.get("failures", 0) + 1
+        cooldown = min(COOLDOWN_SECONDS * 2 ** (entry["failures"] - 1), MAX_COOLDOWN_SECONDS)
+        entry["open_until"] = time.time() + cooldown
+        entry["last_error"] = f"{type(error).__name__}: {error}"[:500]
+        entry["last_failure"] = time.time()
+        if self.state.get("preferred") == key:
+            self.state["preferred"] = None
+        self.save()
+        return cooldown
+    
+    def record_success(self, key):
+        """記錄成功，之後優先使用此引擎"""
+        entry = self.entry(key)
+        entry["failures"] = 0
+        entry["open_until"] = 0
+        entry.pop("last_error", None)
+        entry["last_success"] = time.time()
+        self.state["preferred"] = key
+        self.save()
+    
+    def reset(self):
+        """清除所有記錄"""
+        self.state = {"engines": {}, "preferred": None}
+        self.save()
+
+
+def _speak_pyttsx3(text):
+    """使用 pyttsx3 朗讀（失敗時拋出例外）"""
+    engine = _LOADED_ENGINES.get("system")
+    if engine is None:
         import pyttsx3
         
-        print("🔊 使用系統 TTS (pyttsx3)...")
         engine = pyttsx3.init()
         
         # 設置中文語音（如果可用）
@@ -27,23 +121,17 @@ def try_system_tts(text):
         
         # 調整語速
         engine.setProperty('rate', 150)
-        
-        engine.say(text)
-        engine.runAndWait()
-        
-        print("✅ 系統 TTS 播放完成")
-        return True
-        
-    except Exception as e:
-        print(f"❌ 系統 TTS 失敗: {e}")
-        return False
+        _LOADED_ENGINES["system"] = engine
+    
+    engine.say(text)
+    engine.runAndWait()
 
-def try_windows_sapi(text):
-    """嘗試使用 Windows SAPI"""
-    try:
+def _speak_sapi(text):
+    """使用 Windows SAPI 朗讀（失敗時拋出例外）"""
+    speaker = _LOADED_ENGINES.get("sapi")
+    if speaker is None:
         import win32com.client
         
-        print("🔊 使用 Windows SAPI...")
         speaker = win32com.client.Dispatch("SAPI.SpVoice")
         
         # 嘗試設置中文語音
@@ -52,104 +140,123 @@ def try_windows_sapi(text):
             if 'chinese' in voice.GetDescription().lower():
                 speaker.Voice = voice
                 break
-        
-        speaker.Speak(text)
-        print("✅ Windows SAPI 播放完成")
-        return True
-        
-    except Exception as e:
-        print(f"❌ Windows SAPI 失敗: {e}")
-        return False
+        _LOADED_ENGINES["sapi"] = speaker
+    
+    speaker.Speak(text)
 
-def try_xtts_simple(text):
-    """嘗試使用 XTTS v2 (簡化版)"""
-    try:
+def _speak_coqui(model_name, text):
+    """使用 Coqui TTS 模型合成並播放（模型保留在記憶體中）"""
+    key = f"coqui:{model_name}"
+    tts = _LOADED_ENGINES.get(key)
+    if tts is None:
         os.environ["COQUI_TOS_AGREED"] = "1"
-        
-        print("🔊 嘗試 XTTS v2 (簡化版)...")
         from TTS.api import TTS
+        tts = TTS(model_name)
+        _LOADED_ENGINES[key] = tts
+    
+    if "xtts" in model_name.lower():
+        # XTTS v2 需要說話者與語言參數
+        wav = tts.tts(text, speaker=XTTS_SPEAKER, language=XTTS_LANGUAGE)
+    else:
+        # 其他模型直接合成
+        wav = tts.tts(text)
+    
+    # 播放音頻（使用模型實際取樣率，不經暫存檔）
+    sample_rate = getattr(tts.synthesizer, "output_sample_rate", 22050)
+    try:
+        play_pcm(wav, sample_rate)
+    except Exception as e:
+        raise PlaybackError(e) from e
+
+
+# 路由候選: (健康狀態鍵, 顯示名稱, 朗讀函數)
+COQUI_ROUTES = [
+    (f"coqui:{model_name}", f"Coqui {model_name}",
+     lambda text, model_name=model_name: _speak_coqui(model_name, text))
+    for model_name in COQUI_MODELS
+]
+SYSTEM_ROUTES = [
+    ("system", "系統 TTS", _speak_pyttsx3),
+    ("sapi", "Windows SAPI", _speak_sapi)
+]
+
+
+class FallbackRouter:
+    def __init__(self, routes, health=None):
+        """依健康狀態選擇引擎：上次成功的優先，冷卻中的略過"""
+        self.routes = routes
+        self.health = health or EngineHealth()
+    
+    def ordered_routes(self):
+        """可用的候選順序；全部都在冷卻中時改試冷卻最快結束的一個"""
+        preferred = self.health.state.get("preferred")
+        routes = sorted(self.routes, key=lambda route: route[0] != preferred)
         
-        # 使用更簡單的模型
-        models_to_try = [
-            "tts_models/zh-CN/baker/tacotron2-DDC-GST",  # 中文模型
-            "tts_models/en/ljspeech/tacotron2-DDC",      # 英文模型
-            "tts_models/multilingual/multi-dataset/xtts_v2"  # XTTS v2
-        ]
+        available = [route for route in routes if self.health.cooldown_remaining(route[0]) == 0]
+        for key, label, _ in routes:
+            remaining = self.health.cooldown_remaining(key)
+            if remaining:
+                print(f"   ⏭️  略過 {label}（冷卻中，剩 {remaining / 60:.0f} 分鐘）: "
+                      f"{self.health.entry(key).get('last_error', '')}")
         
-        for model_name in models_to_try:
+        if not available and routes:
+            available = [min(routes, key=lambda route: self.health.cooldown_remaining(route[0]))]
+        return available
+    
+    def speak(self, text):
+        """依序嘗試候選引擎，回傳成功的顯示名稱或 None"""
+        playback_failed = False
+        for key, label, speak in self.ordered_routes():
+            if playback_failed and key.startswith("coqui:"):
+                # 同樣經由音效裝置播放，不必再載入其他模型
+                continue
+            print(f"\n🔄 嘗試 {label}...")
             try:
-                print(f"   嘗試模型: {model_name}")
-                tts = TTS(model_name)
-                
-                # 創建臨時文件
-                with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
-                    output_path = tmp.name
-                
-                # 嘗試合成
-                if "xtts" in model_name.lower():
-                    # XTTS v2 需要說話者參數
-                    try:
-                        wav = tts.tts(text, speaker_idx=0)
-                    except:
-                        wav = tts.tts(text)
-                else:
-                    # 其他模型直接合成
-                    wav = tts.tts(text)
-                
-                # 保存音頻
-                import soundfile as sf
-                sf.write(output_path, wav, 22050)
-                
-                # 播放音頻
-                import pygame
-                pygame.mixer.init()
-                pygame.mixer.music.load(output_path)
-                pygame.mixer.music.play()
-                
-                while pygame.mixer.music.get_busy():
-                    pygame.time.wait(100)
-                
-                print(f"✅ {model_name} 播放完成")
-                
-                # 清理
-                try:
-                    os.unlink(output_path)
-                except:
-                    pass
-                
-                return True
-                
+                speak(text)
+            except PlaybackError as e:
+                # 合成成功，不降級此引擎；改試其他引擎（系統 TTS 使用自己的音訊輸出）
+                print(f"🔇 {label} 合成成功但播放失敗: {e}（請檢查音響設備）")
+                playback_failed = True
+                continue
             except Exception as e:
-                print(f"   模型 {model_name} 失敗: {e}")
+                cooldown = self.health.record_failure(key, e)
+                print(f"❌ {label} 失敗: {e}（{cooldown / 60:.0f} 分鐘內不再嘗試）")
                 continue
-        
+            
+            self.health.record_success(key)
+            print(f"✅ {label} 播放完成")
+            return label
+        return None
+
+
+def try_system_tts(text):
+    """嘗試使用系統 TTS"""
+    print("🔊 使用系統 TTS (pyttsx3)...")
+    return FallbackRouter(SYSTEM_ROUTES[:1]).speak(text) is not None
+
+def try_windows_sapi(text):
+    """嘗試使用 Windows SAPI"""
+    print("🔊 使用 Windows SAPI...")
+    return FallbackRouter(SYSTEM_ROUTES[1:]).speak(text) is not None
+
+def try_xtts_simple(text):
+    """嘗試使用 XTTS v2 (簡化版)"""
+    print("🔊 嘗試 XTTS v2 (簡化版)...")
+    if FallbackRouter(COQUI_ROUTES).speak(text) is None:
         print("❌ 所有 TTS 模型都失敗")
         return False
-        
-    except Exception as e:
-        print(f"❌ XTTS 初始化失敗: {e}")
-        return False
+    return True
 
 def smart_tts(text):
-    """智能 TTS - 嘗試多種方法"""
+    """智能 TTS - 依引擎健康狀態嘗試多種方法"""
     print(f"🎯 智能 TTS 開始合成: {text}")
     print("=" * 50)
     
-    # 方法優先級
-    methods = [
-        ("XTTS v2", try_xtts_simple),
-        ("系統 TTS", try_system_tts),
-        ("Windows SAPI", try_windows_sapi)
-    ]
-    
-    for method_name, method_func in methods:
-        print(f"\n🔄 嘗試 {method_name}...")
-        try:
-            if method_func(text):
-                print(f"🎉 {method_name} 成功！")
-                return True
-        except Exception as e:
-            print(f"❌ {method_name} 異常: {e}")
+    # 方法優先級：XTTS/Coqui 模型 > 系統 TTS > Windows SAPI（上次成功的引擎優先）
+    label = FallbackRouter(COQUI_ROUTES + SYSTEM_ROUTES).speak(text)
+    if label:
+        print(f"🎉 {label} 成功！")
+        return True
     
     print("\n❌ 所有 TTS 方法都失敗")
     print("💡 建議:")
@@ -165,12 +272,33 @@ def main():
                        help="要合成的文字")
     parser.add_argument("--method", choices=["auto", "xtts", "system", "sapi"], 
                        default="auto", help="指定 TTS 方法")
+    parser.add_argument("--health", action="store_true", help="顯示各引擎的健康狀態")
+    parser.add_argument("--reset-health", action="store_true", help="清除失敗記錄（修復安裝後使用）")
     
     args = parser.parse_args()
     
     print("🚀 智能 TTS 讀稿機")
     print("=" * 50)
     
+    health = EngineHealth()
+    if args.reset_health:
+        health.reset()
+        print("🧹 已清除引擎失敗記錄")
+    
+    if args.health:
+        preferred = health.state.get("preferred")
+        for key, label, _ in COQUI_ROUTES + SYSTEM_ROUTES:
+            entry = health.entry(key)
+            remaining = health.cooldown_remaining(key)
+            if remaining:
+                status = f"❌ 冷卻中 ({remaining / 60:.0f} 分鐘): {entry.get('last_error', '')}"
+            elif entry.get("last_success"):
+                status = "✅ 正常"
+            else:
+                status = "❔ 未使用"
+            print(f"  {'⭐' if key == preferred else '  '} {label}: {status}")
+        return
+    
     if args.method == "auto":
         success = smart_tts(args.text)
     elif args.method == "xtts":
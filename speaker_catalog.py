@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+XTTS v2 內建說話者目錄
+由模型的 speaker_manager 一次建立：說話者名稱、嵌入向量與性別/年齡標籤。
+查詢與解析都是字典查找，在任何推理之前就能確認要求的聲音是否存在，
+不必再以「逐一嘗試合成」的方式找可用的說話者。
+"""
+
+import difflib
+
+# 內建說話者的性別（依官方示範音檔整理；模型本身不帶這些標籤）
+FEMALE_SPEAKERS = [
+    "Claribel Dervla", "Daisy Studious", "Gracie Wise", "Tammie Ema", "Alison Dietlinde",
+    "Ana Florence", "Annmarie Nele", "Asya Anara", "Brenda Stern", "Gitta Nikolina",
+    "Henriette Usha", "Sofia Hellen", "Tammy Grit", "Tanja Adelina", "Vjollca Johnnie",
+    "Nova Hogarth", "Maja Ruoho", "Uta Obando", "Lidiya Szekeres", "Chandra MacFarland",
+    "Szofi Granger", "Camilla Holmström", "Lilya Stainthorpe", "Zofija Kendrick",
+    "Narelle Moon", "Barbora MacLean", "Alexandra Hisakawa", "Alma María",
+    "Rosemary Okafor", "Ige Behringer"
+]
+MALE_SPEAKERS = [
+    "Andrew Chipper", "Badr Odhiambo", "Dionisio Schuyler", "Royston Min", "Viktor Eka",
+    "Abrahan Mack", "Adde Michal", "Baldur Sanjin", "Craig Gutsy", "Damien Black",
+    "Gilberto Mathias", "Ilkin Urbano", "Kazuhiko Atallah", "Ludvig Milivoj", "Suad Qasim",
+    "Torcull Diarmuid", "Viktor Menelaos", "Zacharie Aimilios", "Filip Traverse",
+    "Damjan Chapman", "Wulf Carlevaro", "Aaron Dreschner", "Kumar Dahl", "Eugenio Mataracı",
+    "Ferran Simen", "Xavier Hayasaka", "Luis Moray", "Marcos Rudaski"
+]
+# 年輕女性聲音（見 YOUNG_FEMALE_VOICE_CONFIG.md，依偏好順序）
+YOUNG_SPEAKERS = ["Tammie Ema", "Daisy Studious", "Gracie Wise", "Alison Dietlinde", "Claribel Dervla"]
+
+
+def normalize_speaker_name(name):
+    """名稱查找鍵：忽略大小寫與多餘空白"""
+    return " ".join(name.split()).casefold()
+
+
+def _default_attributes(name):
+    gender = "female" if name in FEMALE_SPEAKERS else "male" if name in MALE_SPEAKERS else None
+    return {"gender": gender, "age": "young" if name in YOUNG_SPEAKERS else None}
+
+
+class SpeakerCatalog:
+    def __init__(self, speakers):
+        """建立目錄（speakers: 名稱 -> 含 speaker_embedding 的字典）"""
+        import numpy as np
+
+        self.names = list(speakers)
+        self._index = {name: i for i, name in enumerate(self.names)}
+        self._lookup = {normalize_speaker_name(name): name for name in self.names}
+        self.attributes = {name: _default_attributes(name) for name in self.names}
+
+        vectors = [self._to_vector(speakers[name].get("speaker_embedding")) for name in self.names]
+        dim = max((len(v) for v in vectors if v is not None), default=0)
+        self.embeddings = np.zeros((len(self.names), dim), dtype=np.float32)
+        for i, vector in enumerate(vectors):
+            if vector is not None and len(vector) == dim:
+                self.embeddings[i] = vector
+
+    @staticmethod
+    def _to_vector(embedding):
+        """說話者嵌入（torch 張量，形狀 [1, 512, 1]）轉為一維 float32 陣列"""
+        import numpy as np
+
+        if embedding is None:
+            return None
+        if hasattr(embedding, "detach"):
+            embedding = embedding.detach().cpu().float().numpy()
+        return np.asarray(embedding, dtype=np.float32).reshape(-1)
+
+    @classmethod
+    def from_tts(cls, tts):
+        """由 TTS API 物件或 Xtts 模型建立，模型沒有內建說話者時回傳空目錄"""
+        from speaker_latents import get_xtts_core
+
+        xtts_core = get_xtts_core(tts)
+        speaker_manager = getattr(xtts_core, "speaker_manager", None)
+        speakers = getattr(speaker_manager, "speakers", None) or {}
+        return cls(speakers)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return self.resolve(name) is not None
+
+    def resolve(self, name):
+        """取得說話者的正式名稱（忽略大小寫/空白），不存在時回傳 None"""
+        if not name:
+            return None
+        if name in self._index:
+            return name
+        return self._lookup.get(normalize_speaker_name(name))
+
+    def resolve_first(self, names):
+        """依序解析，回傳第一個存在的說話者"""
+        for name in names:
+            resolved = self.resolve(name)
+            if resolved:
+                return resolved
+        return None
+
+    def suggest(self, name, count=3):
+        """名稱不存在時提供相近的名稱"""
+        matches = difflib.get_close_matches(normalize_speaker_name(name), list(self._lookup), n=count, cutoff=0.5)
+        return [self._lookup[key] for key in matches]
+
+    def embedding(self, name):
+        """取得說話者的嵌入向量"""
+        return self.embeddings[self._index[self.resolve(name)]]
+
+    def filter(self, gender=None, age=None):
+        """依性別/年齡標籤篩選說話者"""
+        return [
+            name for name in self.names
+            if (gender is None or self.attributes[name]["gender"] == gender)
+            and (age is None or self.attributes[name]["age"] == age)
+        ]
+
+
+_CATALOGS = {}
+
+
+def get_speaker_catalog(tts):
+    """取得模型的說話者目錄（每個模型只建立一次）"""
+    key = id(tts)
+    if key not in _CATALOGS:
+        _CATALOGS[key] = SpeakerCatalog.from_tts(tts)
+    return _CATALOGS[key]
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+XTTS v2 說話者條件向量緩存
+每個聲音只計算一次 gpt_cond_latent / speaker_embedding：
+- 內建說話者直接取自模型的 speaker_manager
+- 克隆聲音（參考音檔）計算後保存為 .pt，之後的執行與其他行程直接讀取，
+  不必再跑參考音檔編碼器
+"""
+
+import os
+import hashlib
+import threading
+
+
+def get_xtts_core(tts):
+    """從 TTS API 物件取得底層 Xtts 模型，不支援時回傳 None"""
+    synthesizer = getattr(tts, "synthesizer", None)
+    model = getattr(synthesizer, "tts_model", None) if synthesizer is not None else tts
+    if model is not None and hasattr(model, "inference") and hasattr(model, "get_conditioning_latents"):
+        return model
+    return None
+
+
+def _file_digest(path):
+    """計算參考音檔內容的雜湊值"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+_REFERENCE_DIGESTS = {}
+_REFERENCE_LOCK = threading.Lock()
+
+
+def reference_voice_id(speaker_wav):
+    """參考音檔的聲音識別字串（內容雜湊，依路徑/修改時間/大小緩存）
+
+    不需要模型，讀稿機連接常駐服務或退回 TTS API 時也以此區分克隆聲音。
+    """
+    stat = os.stat(speaker_wav)
+    signature = (os.path.abspath(speaker_wav), stat.st_mtime, stat.st_size)
+    with _REFERENCE_LOCK:
+        voice_id = _REFERENCE_DIGESTS.get(signature)
+    if voice_id is None:
+        voice_id = f"wav-{_file_digest(speaker_wav)[:16]}"
+        with _REFERENCE_LOCK:
+            _REFERENCE_DIGESTS[signature] = voice_id
+    return voice_id
+
+
+class SpeakerLatentStore:
+    def __init__(self, xtts_core, store_dir):
+        """初始化說話者條件向量緩存"""
+        self.xtts = xtts_core
+        self.store_dir = store_dir
+        self._memory = {}
+        self._lock = threading.Lock()
+        os.makedirs(store_dir, exist_ok=True)
+
+    def voice_id(self, speaker=None, speaker_wav=None):
+        """取得聲音識別字串（克隆聲音以音檔內容雜湊識別）"""
+        if speaker_wav:
+            return reference_voice_id(speaker_wav)
+        return speaker
+
+    def has_speaker(self, speaker):
+        """檢查內建說話者是否存在"""
+        speaker_manager = getattr(self.xtts, "speaker_manager", None)
+        speakers = getattr(speaker_manager, "speakers", None) or {}
+        return speaker in speakers
+
+    def get_latents(self, speaker=None, speaker_wav=None):
+        """取得 (gpt_cond_latent, speaker_embedding)"""
+        voice_id = self.voice_id(speaker, speaker_wav)
+
+        with self._lock:
+            if voice_id in self._memory:
+                return self._memory[voice_id]
+
+            if speaker_wav:
+                latents = self._load_or_compute(voice_id, speaker_wav)
+            else:
+                if not self.has_speaker(speaker):
+                    raise KeyError(f"找不到說話者: {speaker}")
+                entry = self.xtts.speaker_manager.speakers[speaker]
+                latents = (entry["gpt_cond_latent"], entry["speaker_embedding"])
+
+            self._memory[voice_id] = latents
+            return latents
+
+    def _load_or_compute(self, voice_id, speaker_wav):
+        """從磁碟讀取克隆聲音的條件向量，不存在時計算並保存"""
+        import torch
+
+        path = os.path.join(self.store_dir, f"{voice_id}.pt")
+        if os.path.exists(path):
+            try:
+                data = torch.load(path, map_location="cpu")
+                return data["gpt_cond_latent"], data["speaker_embedding"]
+            except Exception as e:
+                print(f"⚠️  說話者緩存損毀，重新計算: {e}")
+
+        print(f"🎙️ 正在計算參考音檔的說話者特徵: {os.path.basename(speaker_wav)}")
+        gpt_cond_latent, speaker_embedding = self.xtts.get_conditioning_latents(audio_path=[speaker_wav])
+
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        torch.save({
+            "gpt_cond_latent": gpt_cond_latent.detach().cpu(),
+            "speaker_embedding": speaker_embedding.detach().cpu()
+        }, temp_path)
+        os.replace(temp_path, path)
+
+        return gpt_cond_latent, speaker_embedding
+
+    def synthesize(self, text, language, speaker=None, speaker_wav=None):
+        """使用緩存的條件向量合成，回傳 float32 PCM"""
+        import numpy as np
+
+        gpt_cond_latent, speaker_embedding = self.get_latents(speaker, speaker_wav)
+        result = self.xtts.inference(text, language, gpt_cond_latent, speaker_embedding)
+
+        wav = result["wav"]
+        if hasattr(wav, "cpu"):
+            wav = wav.cpu().numpy()
+        return np.asarray(wav, dtype=np.float32).reshape(-1)
+
+    def synthesize_batch(self, texts, language, speaker=None, speaker_wav=None):
+        """同一聲音的多句批次合成，回傳與 texts 順序相同的 PCM 列表"""
+        from batch_scheduler import xtts_synthesize_batch
+
+        gpt_cond_latent, speaker_embedding = self.get_latents(speaker, speaker_wav)
+        return xtts_synthesize_batch(self.xtts, texts, language, gpt_cond_latent, speaker_embedding)
@@ -0,0 +1,31 @@
+@echo off
+title XTTS v2 常駐合成服務
+chcp 65001 >nul
+
+echo ================================================
+echo XTTS v2 常駐合成服務 - 啟動中...
+echo ================================================
+
+REM 設定工作目錄
+set "WORK_DIR=f:\VS_PJ\Python\語音模型_讀稿機"
+cd /d "%WORK_DIR%"
+
+REM 檢查虛擬環境是否存在
+if not exist "xtts_env\Scripts\python.exe" (
+    echo ❌ 虛擬環境不存在
+    echo 💡 請先執行 create_xtts_env.bat 創建虛擬環境
+    pause
+    exit /b 1
+)
+
+echo 🔧 使用虛擬環境 Python...
+echo 💡 服務啟動後，run_enhanced_tts.bat 命令行模式將不再重新載入模型
+
+"%WORK_DIR%\xtts_env\Scripts\python.exe" "%WORK_DIR%\tts_daemon.py" %*
+
+if %ERRORLEVEL% NEQ 0 (
+    echo.
+    echo ❌ 服務執行失敗，錯誤碼: %ERRORLEVEL%
+    pause
+    exit /b %ERRORLEVEL%
+)
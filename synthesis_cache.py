@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+語音合成磁碟緩存
+以 (正規化文字, 說話者, 語言, 模型) 的雜湊值為鍵，將合成結果保存為 .npy，
+重複出現的句子直接從磁碟讀取，不必再跑一次 XTTS 推理。
+"""
+
+import os
+import json
+import hashlib
+import unicodedata
+import threading
+
+# 預設緩存上限 512MB
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def normalize_text(text):
+    """正規化文字：全形轉半形、合併空白"""
+    text = unicodedata.normalize("NFKC", text)
+    return " ".join(text.split())
+
+
+def make_cache_key(text, speaker, language, model_id):
+    """由文字、說話者、語言、模型產生緩存鍵"""
+    payload = "\x1f".join([
+        normalize_text(text),
+        speaker or "",
+        language or "",
+        model_id or ""
+    ])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SynthesisCache:
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES):
+        """初始化合成緩存
+
+        以檔案修改時間作為最近使用時間（命中時更新），超過容量上限時
+        從最久未使用的項目開始淘汰。多個行程共用同一目錄也是安全的。
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._stats_path = os.path.join(cache_dir, "stats.json")
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._total_bytes = sum(size for _, size, _ in self._scan_entries())
+
+    def _entry_path(self, key):
+        """取得緩存項目路徑（以前兩碼分子目錄）"""
+        return os.path.join(self.cache_dir, key[:2], f"{key}.npy")
+
+    def _scan_entries(self):
+        """列出所有緩存項目 (路徑, 大小, 最近使用時間)"""
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".npy"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def get(self, key):
+        """讀取緩存，未命中回傳 None"""
+        import numpy as np
+
+        path = self._entry_path(key)
+        try:
+            pcm = np.load(path, allow_pickle=False)
+            os.utime(path)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return pcm
+
+    def put(self, key, pcm):
+        """寫入緩存，必要時淘汰舊項目"""
+        import numpy as np
+
+        path = self._entry_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # 先寫暫存檔再替換，避免其他行程讀到寫一半的檔案
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            np.save(f, np.asarray(pcm, dtype=np.float32), allow_pickle=False)
+        new_size = os.path.getsize(temp_path)
+
+        with self._lock:
+            # 覆寫既有項目時只計入大小差
+            try:
+                old_size = os.path.getsize(path)
+            except OSError:
+                old_size = 0
+            os.replace(temp_path, path)
+            self._total_bytes += new_size - old_size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """依最近使用時間淘汰項目，直到容量降至上限的九成"""
+        entries = sorted(self._scan_entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                continue
+
+        self._total_bytes = total
+
+    def clear(self):
+        """清空緩存"""
+        with self._lock:
+            for path, _, _ in self._scan_entries():
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._total_bytes = 0
+
+    def flush_stats(self):
+        """將本次的命中/未命中次數累加到 stats.json"""
+        with self._lock:
+            totals = self.load_stats()
+            totals["hits"] += self.hits
+            totals["misses"] += self.misses
+            self.hits = 0
+            self.misses = 0
+
+            temp_path = f"{self._stats_path}.{os.getpid()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(totals, f)
+            os.replace(temp_path, self._stats_path)
+
+    def load_stats(self):
+        """讀取累計的命中/未命中次數"""
+        try:
+            with open(self._stats_path, "r", encoding="utf-8") as f:
+                stats = json.load(f)
+            return {"hits": int(stats.get("hits", 0)), "misses": int(stats.get("misses", 0))}
+        except (OSError, ValueError):
+            return {"hits": 0, "misses": 0}
+
+    def get_stats(self):
+        """獲取緩存統計資訊（含本次尚未寫入的次數）"""
+        totals = self.load_stats()
+        entries = self._scan_entries()
+        return {
+            "hits": totals["hits"] + self.hits,
+            "misses": totals["misses"] + self.misses,
+            "entries": len(entries),
+            "size_bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+            "cache_dir": self.cache_dir
+        }
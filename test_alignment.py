@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+句子時間軸測試
+"""
+
+import json
+
+from alignment import SentenceTimeline
+
+
+def test_offsets_accumulate():
+    timeline = SentenceTimeline(1000)
+    assert timeline.add("一。", 500) == (0, 500)
+    assert timeline.add("二。", 1500) == (500, 2000)
+    assert timeline.total_samples == 2000
+    assert len(timeline) == 2
+
+
+def test_crossfade_overlap_matches_concat():
+    """交叉淡化時下一句與上一句重疊，總長度與 crossfade_concat 的輸出一致"""
+    import numpy as np
+    from audio_post import crossfade_concat
+
+    lengths = [300, 5, 200]
+    timeline = SentenceTimeline(1000, crossfade_samples=10)
+    for index, length in enumerate(lengths):
+        timeline.add(str(index), length)
+    chunks = [np.zeros(length, dtype=np.float32) for length in lengths]
+    output = sum(len(chunk) for chunk in crossfade_concat(chunks, 1000, crossfade_ms=10))
+    assert timeline.total_samples == output
+
+
+def test_at_finds_current_sentence():
+    timeline = SentenceTimeline(1000)
+    for length in (100, 200, 300):
+        timeline.add("x", length)
+    assert timeline.at(-1) is None
+    assert timeline.at(0) == 0
+    assert timeline.at(99) == 0
+    assert timeline.at(100) == 1
+    assert timeline.at(10000) == 2
+
+
+def test_subtitle_formats():
+    timeline = SentenceTimeline(1000)
+    timeline.add("第一句。", 1500)
+    timeline.add("第二句。", 3723000 - 1500)
+    srt = timeline.to_srt()
+    assert srt.startswith("1\n00:00:00,000 --> 00:00:01,500\n第一句。\n")
+    assert "2\n00:00:01,500 --> 01:02:03,000\n第二句。" in srt
+    vtt = timeline.to_vtt()
+    assert vtt.startswith("WEBVTT\n\n00:00:00.000 --> 00:00:01.500\n")
+
+
+def test_save_writes_all_formats(tmp_path):
+    timeline = SentenceTimeline(24000)
+    timeline.add("你好。", 24000)
+    paths = timeline.save(str(tmp_path / "speech"))
+    assert [path.rsplit("speech", 1)[1] for path in paths] == [".align.json", ".srt", ".vtt"]
+    with open(paths[0], encoding="utf-8") as f:
+        data = json.load(f)
+    assert data["segments"][0] == {
+        "index": 0, "text": "你好。", "start_sample": 0, "end_sample": 24000, "start": 0.0, "end": 1.0
+    }
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+串流音頻編碼測試（WAV 路徑，不需要 lameenc/ffmpeg）
+"""
+
+import wave
+
+import numpy as np
+
+from audio_encoder import WavStreamWriter, open_audio_writer
+
+
+def _read_wav(path):
+    with wave.open(path, "rb") as f:
+        params = (f.getnchannels(), f.getsampwidth(), f.getframerate())
+        frames = np.frombuffer(f.readframes(f.getnframes()), dtype="<i2")
+    return params, frames
+
+
+def test_wav_stream_writer_roundtrip(tmp_path):
+    """逐段寫入的 WAV 可被標準函式庫讀回，長度與內容一致"""
+    path = str(tmp_path / "out.wav")
+    writer = WavStreamWriter(path, 24000)
+    chunks = [np.full(1000, 0.5, dtype=np.float32), np.full(500, -0.25, dtype=np.float32)]
+    for chunk in chunks:
+        writer.write(chunk)
+    assert writer.close() == path
+
+    params, frames = _read_wav(path)
+    assert params == (1, 2, 24000)
+    assert len(frames) == 1500
+    assert frames[0] == int(0.5 * 32767)
+    assert frames[-1] == int(-0.25 * 32767)
+
+
+def test_wav_stream_writer_clips(tmp_path):
+    """超出 [-1, 1] 的取樣被限幅而不是溢位"""
+    path = str(tmp_path / "clip.wav")
+    writer = WavStreamWriter(path, 16000)
+    writer.write(np.array([2.0, -2.0], dtype=np.float32))
+    writer.close()
+    _, frames = _read_wav(path)
+    assert frames.tolist() == [32767, -32767]
+
+
+def test_open_audio_writer_wav(tmp_path):
+    """指定 WAV 時回傳 WAV 寫入器並加上副檔名"""
+    writer = open_audio_writer(str(tmp_path / "speech"), 22050, output_format="wav")
+    writer.write(np.zeros(100, dtype=np.float32))
+    assert writer.close() == str(tmp_path / "speech.wav")
+
+
+def test_open_audio_writer_falls_back_to_wav(tmp_path, monkeypatch):
+    """要求 MP3 但沒有任何編碼器時退回 WAV"""
+    import audio_encoder
+
+    monkeypatch.setattr(audio_encoder, "LAMEENC_AVAILABLE", False)
+    writer = open_audio_writer(str(tmp_path / "speech"), 22050, output_format="mp3",
+                               ffmpeg_available=False)
+    assert isinstance(writer, WavStreamWriter)
+    writer.close()
+
+
+def test_wav_header_patched_on_close(tmp_path):
+    """關閉前檔頭長度為 0，關閉後補上實際長度"""
+    import struct
+
+    path = str(tmp_path / "patch.wav")
+    writer = WavStreamWriter(path, 24000)
+    writer.write(np.zeros(2400, dtype=np.float32))
+    with open(path, "rb") as f:
+        assert struct.unpack("<I", f.read(44)[40:44])[0] == 0
+    writer.close()
+    with open(path, "rb") as f:
+        header = f.read(44)
+    assert struct.unpack("<I", header[40:44])[0] == 4800
+    assert struct.unpack("<I", header[4:8])[0] == 36 + 4800
+
+
+def test_wav_size_limit(tmp_path, monkeypatch):
+    """超過 RIFF 長度上限時拒絕寫入"""
+    import audio_encoder
+    import pytest
+
+    monkeypatch.setattr(audio_encoder, "WAV_MAX_DATA_BYTES", 100)
+    writer = WavStreamWriter(str(tmp_path / "big.wav"), 8000)
+    writer.write(np.zeros(50, dtype=np.float32))
+    with pytest.raises(Exception):
+        writer.write(np.zeros(1, dtype=np.float32))
+    writer.close()
+
+
+def test_parted_writer_splits_between_chunks(tmp_path):
+    """依時長切分分段檔，只在片段之間切分，所有取樣都被寫入"""
+    writer = open_audio_writer(str(tmp_path / "book"), 1000, output_format="wav", max_part_seconds=1.0)
+    lengths = [400, 400, 400, 1500, 100]
+    for length in lengths:
+        writer.write(np.zeros(length, dtype=np.float32))
+    paths = writer.close()
+
+    assert paths == [str(tmp_path / f"book_part{i:03d}.wav") for i in (1, 2, 3, 4)]
+    frames = [len(_read_wav(path)[1]) for path in paths]
+    # 1500 取樣的片段超過上限，但仍完整寫入同一分段，不會被切開
+    assert frames == [800, 400, 1500, 100]
+    assert sum(frames) == sum(lengths)
+
+
+def test_parted_writer_by_size(tmp_path):
+    """依估計大小切分（WAV 每秒 2 * 取樣率位元組）"""
+    writer = open_audio_writer(str(tmp_path / "book"), 1000, output_format="wav", max_part_bytes=1000)
+    for _ in range(4):
+        writer.write(np.zeros(300, dtype=np.float32))
+    assert len(writer.close()) == 4
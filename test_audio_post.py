@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+合成音頻後處理測試
+"""
+
+import numpy as np
+
+from audio_post import crossfade_concat, normalize_loudness, polish_segment, trim_silence
+
+
+def _chunks(lengths, value=0.5):
+    return [np.full(length, value, dtype=np.float32) for length in lengths]
+
+
+def test_crossfade_length():
+    """每個接縫重疊 overlap 個取樣，總長度相應縮短"""
+    sample_rate = 1000
+    lengths = [100, 50, 200]
+    output = list(crossfade_concat(_chunks(lengths), sample_rate, crossfade_ms=10))
+    assert sum(len(chunk) for chunk in output) == sum(lengths) - 2 * 10
+
+
+def test_crossfade_constant_signal_is_seamless():
+    """相同音量的片段交叉淡化後保持原值（淡入淡出相加恆為1）"""
+    output = np.concatenate(list(crossfade_concat(_chunks([100, 100]), 1000, crossfade_ms=10)))
+    np.testing.assert_allclose(output, 0.5, atol=1e-6)
+
+
+def test_crossfade_short_chunks():
+    """比重疊長度還短的片段也能處理"""
+    output = list(crossfade_concat(_chunks([3, 100, 2]), 1000, crossfade_ms=10))
+    assert sum(len(chunk) for chunk in output) == 3 + 100 + 2 - 3 - 2
+
+
+def test_crossfade_disabled():
+    """重疊長度為 0 時原樣輸出"""
+    chunks = _chunks([10, 20])
+    output = list(crossfade_concat(chunks, 1000, crossfade_ms=0))
+    assert [len(chunk) for chunk in output] == [10, 20]
+
+
+def _tone(length, amplitude):
+    return (amplitude * np.sin(np.arange(length, dtype=np.float32) * 0.3)).astype(np.float32)
+
+
+def _rms_db(pcm):
+    return 20 * np.log10(np.sqrt(np.mean(pcm.astype(np.float64) ** 2)))
+
+
+def test_trim_silence_keeps_margins():
+    """去除前後靜音，句首保留 40 ms、句尾保留 200 ms"""
+    pcm = np.concatenate([np.zeros(1000), _tone(500, 0.3), np.zeros(1000)]).astype(np.float32)
+    trimmed = trim_silence(pcm, 1000)
+    assert len(trimmed) == 40 + 500 + 200
+    assert not trim_silence(np.zeros(500, dtype=np.float32), 1000).size
+
+
+def test_normalize_loudness_reaches_target():
+    """有聲部分調整到約 -20 dBFS"""
+    pcm = _tone(2000, 0.05)
+    normalize_loudness(pcm, 1000)
+    assert abs(_rms_db(pcm) - (-20.0)) < 0.5
+
+
+def test_normalize_loudness_limits_peak_and_gain():
+    """增益受峰值與最大增益限制"""
+    loud = _tone(2000, 0.05)
+    loud[100] = 0.9
+    normalize_loudness(loud, 1000)
+    assert np.max(np.abs(loud)) <= 0.97 + 1e-6
+
+    quiet = _tone(2000, 0.01)
+    normalize_loudness(quiet, 1000)
+    assert _rms_db(quiet) < _rms_db(_tone(2000, 0.01)) + 12.0 + 0.1
+
+
+def test_polish_segment_copies_read_only_input():
+    """唯讀輸入先複製，不會原地修改"""
+    pcm = np.concatenate([np.zeros(500), _tone(500, 0.05)]).astype(np.float32)
+    pcm.flags.writeable = False
+    polished = polish_segment(pcm, 1000)
+    assert polished.flags.writeable
+    assert len(polished) < len(pcm)
+    assert np.max(np.abs(pcm[500:])) <= 0.05
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+有聲書匯出測試（以同一行程的假工作池與假合成取代 XTTS 工作行程）
+"""
+
+import json
+import sys
+import types
+import wave
+
+import numpy as np
+import pytest
+
+import audiobook
+import tts_batch
+from audiobook import export_audiobook, split_chapters
+
+SCRIPT = """前言的內容。
+
+第一章 開始
+第一章的第一句。第一章的第二句！
+
+第二章 結束
+第二章只有一句。
+"""
+
+
+def test_split_chapters():
+    chapters = split_chapters(SCRIPT)
+    assert [chapter["title"] for chapter in chapters] == ["開頭", "第一章 開始", "第二章 結束"]
+    assert chapters[1]["text"] == "第一章的第一句。第一章的第二句！"
+
+
+def test_heading_like_sentences_are_body_text():
+    """以句末標點結尾的行是內文，不是章節標題"""
+    chapters = split_chapters("第一部分的內容很長。\n# Chapter 1\nHello.")
+    assert [chapter["title"] for chapter in chapters] == ["開頭", "Chapter 1"]
+
+
+class _InlinePool:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def imap_unordered(self, function, tasks):
+        return map(function, tasks)
+
+
+class _InlineContext:
+    Pool = _InlinePool
+
+
+@pytest.fixture
+def fake_worker(tmp_path, monkeypatch):
+    """以假合成（含前後靜音）的讀稿機作為工作行程"""
+    monkeypatch.chdir(tmp_path)
+    from tts_enhanced import EnhancedTTSReader
+
+    reader = EnhancedTTSReader()
+    reader.engine_type = 'xtts'
+    reader.sample_rate = 16000
+    reader.use_cache = False
+
+    def synthesize(text):
+        tone = 0.3 * np.sin(np.arange(8000, dtype=np.float32) * 0.05)
+        silence = np.zeros(8000, dtype=np.float32)
+        return np.concatenate([silence, tone, silence])
+    reader._synthesize_pcm = synthesize
+
+    monkeypatch.setattr(tts_batch, "_WORKER_READER", reader)
+    monkeypatch.setattr(audiobook.multiprocessing, "get_context", lambda method: _InlineContext())
+    return reader
+
+
+def _wav_seconds(path):
+    with wave.open(path, "rb") as f:
+        return f.getnframes() / f.getframerate()
+
+
+def test_chapter_durations_match_written_audio(tmp_path, fake_worker):
+    """索引中的章節時長與起點依實際寫入的音頻計算（去除靜音後比合成長度短）"""
+    source = tmp_path / "book.txt"
+    source.write_text(SCRIPT, encoding="utf-8")
+    output_dir = tmp_path / "out"
+
+    assert export_audiobook(str(source), str(output_dir), {}, workers=1, torch_threads=1,
+                            output_format="wav", ffmpeg_available=False) == 0
+
+    index = json.loads((output_dir / "audiobook.json").read_text(encoding="utf-8"))
+    start = 0.0
+    for chapter in index["chapters"]:
+        written = _wav_seconds(str(output_dir / chapter["file"]))
+        assert chapter["duration"] == pytest.approx(written, abs=1e-3)
+        assert chapter["start"] == pytest.approx(start, abs=1e-3)
+        start += written
+        # 每句合成 1.5 秒，去除靜音後明顯較短
+        assert written < 1.5 * chapter["chars"]
+    assert _wav_seconds(str(output_dir / index["combined"])) == pytest.approx(start, abs=1e-3)
+
+    combined = json.loads((output_dir / "audiobook.align.json").read_text(encoding="utf-8"))
+    assert combined["total_samples"] / combined["sample_rate"] == pytest.approx(start, abs=1e-3)
+    second_chapter = index["chapters"][1]
+    first_sentence = [s for s in combined["segments"] if s["text"] == "第一章的第一句。"][0]
+    assert first_sentence["start"] == pytest.approx(second_chapter["start"], abs=1e-3)
+
+
+def test_unchanged_chapters_are_skipped(tmp_path, fake_worker):
+    """只重新合成變動的章節"""
+    source = tmp_path / "book.txt"
+    source.write_text(SCRIPT, encoding="utf-8")
+    output_dir = str(tmp_path / "out")
+    export_audiobook(str(source), output_dir, {}, workers=1, output_format="wav", ffmpeg_available=False)
+
+    rendered = []
+    original = audiobook._render_chapter
+    fake_pool = _InlinePool()
+    fake_pool.imap_unordered = lambda function, tasks: map(
+        lambda task: (rendered.append(task[1]), original(task))[1], tasks)
+    _InlineContext.Pool = lambda *args, **kwargs: fake_pool
+    try:
+        source.write_text(SCRIPT.replace("第二章只有一句。", "第二章改了一句。"), encoding="utf-8")
+        export_audiobook(str(source), output_dir, {}, workers=1, output_format="wav", ffmpeg_available=False)
+    finally:
+        _InlineContext.Pool = _InlinePool
+    assert rendered == ["第二章改了一句。"]
+
+
+def test_post_process_setting_reaches_signature():
+    chapter = {"text": "一句。"}
+    assert audiobook._chapter_signature(chapter, {"post_process": False}, "mp3") != \
+        audiobook._chapter_signature(chapter, {}, "mp3")
+
+
+class _InitializingPool(_InlinePool):
+    """會在本行程執行初始化函數的假工作池"""
+
+    def __init__(self, processes, initializer=None, initargs=()):
+        initializer(*initargs)
+
+
+def test_model_load_failure_fails_chapters(tmp_path, monkeypatch):
+    """工作行程載入模型失敗時每章回報失敗並正常結束，不會卡住"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("OMP_NUM_THREADS", "1")
+    monkeypatch.setenv("MKL_NUM_THREADS", "1")
+    monkeypatch.setitem(sys.modules, "torch", types.SimpleNamespace(
+        set_num_threads=lambda n: None, set_num_interop_threads=lambda n: None))
+    monkeypatch.setattr(tts_batch, "_WORKER_READER", None)
+    monkeypatch.setattr(tts_batch, "_WORKER_ERROR", None)
+
+    from tts_enhanced import EnhancedTTSReader
+
+    def broken_init(self, engine_type="auto"):
+        raise RuntimeError("checkpoint is corrupt")
+    monkeypatch.setattr(EnhancedTTSReader, "init_engine", broken_init)
+    context = types.SimpleNamespace(Pool=_InitializingPool)
+    monkeypatch.setattr(audiobook.multiprocessing, "get_context", lambda method: context)
+
+    source = tmp_path / "book.txt"
+    source.write_text(SCRIPT, encoding="utf-8")
+    output_dir = tmp_path / "out"
+    assert export_audiobook(str(source), str(output_dir), {}, workers=1, torch_threads=1,
+                            output_format="wav", ffmpeg_available=False) == 3
+
+    index = json.loads((output_dir / "audiobook.json").read_text(encoding="utf-8"))
+    assert index["chapters"] == []
+    assert index["combined"] is None
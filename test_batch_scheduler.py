@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批次推理排程測試（以假的合成函數取代模型）
+"""
+
+import pytest
+
+from batch_scheduler import BatchScheduler
+
+
+def test_map_preserves_order():
+    """批次內依長度排序，但結果依提交順序回傳"""
+    batches = []
+
+    def synthesize_batch(texts):
+        batches.append(list(texts))
+        return [f"pcm:{text}" for text in texts]
+
+    scheduler = BatchScheduler(synthesize_batch, max_batch_size=4, max_wait=0.2)
+    texts = ["長長長長長", "短", "中中中", "一二三四五六七"]
+    try:
+        assert list(scheduler.map(texts)) == [f"pcm:{text}" for text in texts]
+    finally:
+        scheduler.close()
+
+    assert sum(len(batch) for batch in batches) == len(texts)
+    for batch in batches:
+        assert batch == sorted(batch, key=len)
+
+
+def test_batch_size_is_bounded():
+    """每批不超過 max_batch_size"""
+    sizes = []
+
+    def synthesize_batch(texts):
+        sizes.append(len(texts))
+        return list(texts)
+
+    scheduler = BatchScheduler(synthesize_batch, max_batch_size=3, max_wait=0.2)
+    try:
+        assert list(scheduler.map([str(i) for i in range(10)])) == [str(i) for i in range(10)]
+    finally:
+        scheduler.close()
+    assert max(sizes) <= 3
+    assert scheduler.sentences_run == 10
+
+
+def test_errors_propagate_to_every_future():
+    """合成失敗時整批的 Future 都收到例外，排程繼續處理後續請求"""
+    def synthesize_batch(texts):
+        if "c" not in texts:
+            raise RuntimeError("boom")
+        return list(texts)
+
+    scheduler = BatchScheduler(synthesize_batch, max_batch_size=2, max_wait=0.2)
+    try:
+        futures = [scheduler.submit("a"), scheduler.submit("b")]
+        for future in futures:
+            with pytest.raises(RuntimeError):
+                future.result(timeout=5)
+        assert scheduler.submit("c").result(timeout=5) == "c"
+    finally:
+        scheduler.close()
+
+
+def test_submit_after_close_raises():
+    scheduler = BatchScheduler(lambda texts: list(texts))
+    scheduler.close()
+    with pytest.raises(RuntimeError):
+        scheduler.submit("a")
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+稿件專案（增量重新合成）測試
+"""
+
+import os
+
+import numpy as np
+
+from script_project import ScriptProject, default_project_dir
+
+
+def test_default_project_dir_distinguishes_paths(tmp_path):
+    """同名稿件放在不同位置時使用不同的專案資料夾"""
+    first = default_project_dir("out", str(tmp_path / "a" / "script.txt"))
+    second = default_project_dir("out", str(tmp_path / "b" / "script.txt"))
+    assert first != second
+    assert os.path.basename(first).startswith("script-")
+
+
+def test_segment_roundtrip(tmp_path):
+    """片段以 16-bit 保存，讀回的誤差在量化範圍內"""
+    project = ScriptProject(str(tmp_path), 24000)
+    pcm = np.linspace(-1, 1, 2400, dtype=np.float32)
+    project.save_segment("abc", pcm)
+    assert project.has_segment("abc")
+    np.testing.assert_allclose(project.load_segment("abc"), pcm, atol=1 / 32767)
+
+
+def test_manifest_removes_unused_segments(tmp_path):
+    """寫入清單後刪除本次稿件不再使用的片段"""
+    project = ScriptProject(str(tmp_path), 24000)
+    for fingerprint in ("keep", "drop"):
+        project.save_segment(fingerprint, np.zeros(10, dtype=np.float32))
+    project.save_manifest(["保留的句子。"], ["keep"])
+
+    reopened = ScriptProject(str(tmp_path), 24000)
+    assert reopened.manifest["segments"] == [{"fingerprint": "keep", "text": "保留的句子。"}]
+    assert reopened.has_segment("keep")
+    assert not reopened.has_segment("drop")
+
+
+def test_interrupted_run_keeps_segments(tmp_path):
+    """中途停止（尚未寫入句子清單）時，相同取樣率的片段下次仍可沿用"""
+    ScriptProject(str(tmp_path), 24000).save_segment("abc", np.zeros(10, dtype=np.float32))
+    assert ScriptProject(str(tmp_path), 24000).has_segment("abc")
+
+
+def test_sample_rate_change_discards_segments(tmp_path):
+    """取樣率不同時清除舊片段，不會以錯誤的取樣率沿用"""
+    project = ScriptProject(str(tmp_path), 24000)
+    project.save_segment("abc", np.zeros(10, dtype=np.float32))
+    project.save_manifest(["一句。"], ["abc"])
+
+    reopened = ScriptProject(str(tmp_path), 22050)
+    assert not reopened.has_segment("abc")
+    assert reopened.manifest["sample_rate"] == 22050
+    assert reopened.manifest["segments"] == []
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+引擎健康狀態（斷路器）與備援路由測試
+"""
+
+import pytest
+
+import smart_tts
+from smart_tts import EngineHealth, FallbackRouter, PlaybackError
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(smart_tts.time, "time", clock.time)
+    return clock
+
+
+def _route(key, calls, error=None):
+    def speak(text):
+        calls.append(key)
+        if error is not None:
+            raise error
+    return (key, key, speak)
+
+
+def test_failure_opens_breaker_with_growing_cooldown(tmp_path, clock):
+    """每次連續失敗冷卻時間加倍，最長不超過上限"""
+    health = EngineHealth(tmp_path / "health.json")
+    assert health.cooldown_remaining("a") == 0
+    cooldowns = [health.record_failure("a", RuntimeError("boom")) for _ in range(3)]
+    assert cooldowns == [smart_tts.COOLDOWN_SECONDS * factor for factor in (1, 2, 4)]
+    assert health.cooldown_remaining("a") == cooldowns[-1]
+    assert health.entry("a")["last_error"] == "RuntimeError: boom"
+
+    for _ in range(20):
+        cooldown = health.record_failure("a", RuntimeError("boom"))
+    assert cooldown == smart_tts.MAX_COOLDOWN_SECONDS
+
+
+def test_router_skips_open_breaker(tmp_path, clock):
+    """失敗的引擎在冷卻時間內被略過，直接使用下一個"""
+    health = EngineHealth(tmp_path / "health.json")
+    calls = []
+    router = FallbackRouter([_route("a", calls, RuntimeError("boom")), _route("b", calls)], health)
+    assert router.speak("一句。") == "b"
+    assert router.speak("一句。") == "b"
+    assert calls == ["a", "b", "b"]
+    assert health.state["preferred"] == "b"
+
+
+def test_half_open_retry_after_cooldown(tmp_path, clock):
+    """冷卻結束後再試一次；成功時清除失敗記錄"""
+    health = EngineHealth(tmp_path / "health.json")
+    health.record_failure("a", RuntimeError("boom"))
+    calls = []
+    router = FallbackRouter([_route("a", calls)], health)
+
+    # 所有引擎都在冷卻中時，仍試冷卻最快結束的一個
+    assert router.speak("一句。") == "a"
+    health.record_failure("a", RuntimeError("boom"))
+    clock.now += health.cooldown_remaining("a") + 1
+    assert router.ordered_routes()[0][0] == "a"
+    assert router.speak("一句。") == "a"
+    assert health.entry("a")["failures"] == 0
+    assert health.cooldown_remaining("a") == 0
+
+
+def test_playback_error_does_not_demote_engine(tmp_path, clock):
+    """播放失敗不開啟斷路器，也不再嘗試其他 Coqui 模型，改用系統引擎"""
+    health = EngineHealth(tmp_path / "health.json")
+    calls = []
+    routes = [
+        _route("coqui:a", calls, PlaybackError("no device")),
+        _route("coqui:b", calls),
+        _route("system", calls),
+    ]
+    assert FallbackRouter(routes, health).speak("一句。") == "system"
+    assert calls == ["coqui:a", "system"]
+    assert health.entry("coqui:a")["failures"] == 0
+    assert health.cooldown_remaining("coqui:a") == 0
+
+
+def test_health_state_persists(tmp_path, clock):
+    """狀態寫入磁碟，下次執行讀回；損毀的狀態檔視為空白"""
+    path = tmp_path / "health" / "engine_health.json"
+    health = EngineHealth(path)
+    health.record_failure("a", RuntimeError("boom"))
+    health.record_success("b")
+
+    reloaded = EngineHealth(path)
+    assert reloaded.cooldown_remaining("a") == smart_tts.COOLDOWN_SECONDS
+    assert reloaded.state["preferred"] == "b"
+    calls = []
+    assert FallbackRouter([_route("a", calls), _route("b", calls)], reloaded).speak("一句。") == "b"
+
+    path.write_text("not json", encoding="utf-8")
+    assert EngineHealth(path).state == {"engines": {}, "preferred": None}
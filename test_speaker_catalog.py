@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+XTTS v2 內建說話者目錄測試（以假的 speaker_manager 資料取代模型）
+"""
+
+import numpy as np
+
+from speaker_catalog import SpeakerCatalog, normalize_speaker_name
+
+
+def _catalog():
+    speakers = {
+        "Tammie Ema": {"speaker_embedding": np.ones((1, 4, 1), dtype=np.float32)},
+        "Andrew Chipper": {"speaker_embedding": np.arange(4, dtype=np.float32)},
+        "Ana Florence": {"speaker_embedding": None},
+    }
+    return SpeakerCatalog(speakers)
+
+
+def test_normalize_speaker_name():
+    assert normalize_speaker_name("  tammie   EMA ") == "tammie ema"
+
+
+def test_resolve_ignores_case_and_spacing():
+    catalog = _catalog()
+    assert catalog.resolve("tammie  ema") == "Tammie Ema"
+    assert catalog.resolve("Nobody") is None
+    assert catalog.resolve("") is None
+    assert "andrew chipper" in catalog
+    assert catalog.resolve_first(["Nobody", "ana florence", "Tammie Ema"]) == "Ana Florence"
+
+
+def test_suggest_close_names():
+    assert _catalog().suggest("Tamie Emma") == ["Tammie Ema"]
+
+
+def test_embeddings_matrix():
+    """嵌入向量攤平成矩陣，缺少嵌入的說話者為零向量"""
+    catalog = _catalog()
+    assert catalog.embeddings.shape == (3, 4)
+    np.testing.assert_array_equal(catalog.embedding("tammie ema"), np.ones(4))
+    np.testing.assert_array_equal(catalog.embedding("Ana Florence"), np.zeros(4))
+
+
+def test_filter_by_attributes():
+    catalog = _catalog()
+    assert catalog.filter(gender="female") == ["Tammie Ema", "Ana Florence"]
+    assert catalog.filter(gender="female", age="young") == ["Tammie Ema"]
+    assert catalog.filter(gender="male") == ["Andrew Chipper"]
+
+
+def test_empty_catalog():
+    catalog = SpeakerCatalog({})
+    assert len(catalog) == 0
+    assert catalog.resolve("Tammie Ema") is None
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+語音合成磁碟緩存測試
+"""
+
+import numpy as np
+
+from synthesis_cache import SynthesisCache, make_cache_key, normalize_text
+
+
+def test_normalize_text():
+    """全形轉半形、合併空白"""
+    assert normalize_text("  Ｈｅｌｌｏ\n  世界 ") == "Hello 世界"
+
+
+def test_cache_key_depends_on_voice():
+    """鍵只忽略文字的空白差異，說話者/語言/模型不同即不同鍵"""
+    key = make_cache_key("你好", "A", "zh-cn", "xtts")
+    assert key == make_cache_key(" 你好 ", "A", "zh-cn", "xtts")
+    assert key != make_cache_key("你好", "B", "zh-cn", "xtts")
+    assert key != make_cache_key("你好", "A", "en", "xtts")
+    assert key != make_cache_key("你好", "A", "zh-cn", "other")
+
+
+def test_get_put_roundtrip(tmp_path):
+    """寫入後可讀回，並記錄命中/未命中"""
+    cache = SynthesisCache(str(tmp_path))
+    key = make_cache_key("你好", "A", "zh-cn", "xtts")
+    assert cache.get(key) is None
+
+    pcm = np.linspace(-1, 1, 1000, dtype=np.float32)
+    cache.put(key, pcm)
+    np.testing.assert_array_equal(cache.get(key), pcm)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_reput_does_not_double_count(tmp_path):
+    """覆寫同一個鍵不會重複計入容量"""
+    cache = SynthesisCache(str(tmp_path))
+    pcm = np.zeros(1000, dtype=np.float32)
+    cache.put("ab" + "0" * 62, pcm)
+    size = cache._total_bytes
+    for _ in range(5):
+        cache.put("ab" + "0" * 62, pcm)
+    assert cache._total_bytes == size
+    assert cache.get_stats()["size_bytes"] == size
+
+
+def test_eviction_keeps_recent_entries(tmp_path):
+    """超過上限時淘汰最舊的項目，容量降至上限的九成以下"""
+    pcm = np.zeros(1000, dtype=np.float32)
+    entry_size = pcm.nbytes + 128
+    cache = SynthesisCache(str(tmp_path), max_bytes=entry_size * 3)
+
+    keys = [f"{i:02d}" + "0" * 62 for i in range(5)]
+    for key in keys:
+        cache.put(key, pcm)
+
+    stats = cache.get_stats()
+    assert stats["size_bytes"] <= cache.max_bytes
+    assert stats["size_bytes"] == cache._total_bytes
+    assert cache.get(keys[-1]) is not None
+
+
+def test_flush_stats_accumulates(tmp_path):
+    """命中次數累加到 stats.json"""
+    cache = SynthesisCache(str(tmp_path))
+    cache.get("ff" + "0" * 62)
+    cache.flush_stats()
+    cache.get("ff" + "0" * 62)
+    cache.flush_stats()
+    assert SynthesisCache(str(tmp_path)).load_stats() == {"hits": 0, "misses": 2}
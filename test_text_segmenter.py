@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+中英文斷句與正規化測試
+"""
+
+from text_segmenter import get_char_limit, iter_segments, normalize_text
+
+
+def test_split_on_cjk_and_latin_punctuation():
+    """中英文句末標點都會斷句，收尾引號歸入同一句"""
+    text = "今天天氣很好。你要出門嗎？「好啊！」Let's go. OK"
+    assert list(iter_segments(text)) == ["今天天氣很好。", "你要出門嗎？", "「好啊！」", "Let's go.", "OK"]
+
+
+def test_abbreviations_and_numbers_do_not_split():
+    """縮寫、小數與清單編號不是句尾"""
+    text = "Dr. Who paid 3.5 dollars. 1. First item. e.g. this one."
+    assert list(iter_segments(text, "en")) == [
+        "Dr. Who paid 3.5 dollars.", "1. First item.", "e.g. this one."
+    ]
+
+
+def test_abbreviation_after_cjk_without_space():
+    """縮寫緊接在中文後（沒有空白）仍被辨識"""
+    assert list(iter_segments("我說了。Mr. Smith來了。")) == ["我說了。", "Mr. Smith來了。"]
+    assert list(iter_segments("他是Dr. Wang的學生。")) == ["他是Dr. Wang的學生。"]
+
+
+def test_chunked_input_matches_whole_string():
+    """逐塊輸入的斷句結果與整份字串相同（跨塊的小數與縮寫不會被切開）"""
+    text = "價格是3.14元。Mr. Smith來了！最後一句"
+    chunks = [text[i:i + 3] for i in range(0, len(text), 3)]
+    assert list(iter_segments(iter(chunks))) == list(iter_segments(text))
+
+
+def test_segments_respect_char_limit():
+    """過長的句子切成不超過上限的片段"""
+    text = "，".join(["這是一個很長的子句"] * 30) + "。"
+    segments = list(iter_segments(text, "zh"))
+    assert len(segments) > 1
+    assert all(len(segment) <= get_char_limit("zh") for segment in segments)
+    assert "".join(segments) == text
+
+
+def test_punctuation_only_segments_are_skipped():
+    assert list(iter_segments("……\n。\n你好")) == ["你好"]
+
+
+def test_normalize_zh_expansions():
+    """中文稿件展開日期、時間、百分比與單位，全形英數轉半形"""
+    assert normalize_text("2024/3/5 14:30") == "2024年3月5日 14點30分"
+    assert normalize_text("成長５０％") == "成長百分之50"
+    assert normalize_text("跑了 10km") == "跑了 10公里"
+    assert normalize_text("跑了 10km", "en") == "跑了 10km"
+
+
+def test_char_limit_by_language():
+    assert get_char_limit("zh-cn") == 82
+    assert get_char_limit("en") == 250
+    assert get_char_limit("xx") == 250
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+稿件讀取與編碼偵測測試
+"""
+
+import codecs
+
+import pytest
+
+from text_source import SAMPLE_BYTES, detect_encoding, iter_text_blocks, read_text
+
+TEXT = "第一章\n今天天氣很好。Hello world.\n" * 50
+
+
+def _write(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_detect_bom(tmp_path):
+    assert detect_encoding(_write(tmp_path, "a.txt", codecs.BOM_UTF8 + TEXT.encode("utf-8"))) == ["utf-8-sig"]
+    assert detect_encoding(_write(tmp_path, "b.txt", TEXT.encode("utf-16"))) == ["utf-16"]
+
+
+def test_detect_from_sample(tmp_path):
+    assert detect_encoding(_write(tmp_path, "a.txt", TEXT.encode("utf-8")))[0] == "utf-8"
+    assert detect_encoding(_write(tmp_path, "b.txt", TEXT.encode("big5")))[0] == "big5"
+
+
+def test_blocks_split_multibyte_characters(tmp_path):
+    """逐塊讀取時，跨塊的多位元組字元仍正確解碼"""
+    for encoding in ("utf-8", "big5", "utf-16"):
+        path = _write(tmp_path, f"{encoding}.txt", TEXT.encode(encoding))
+        assert "".join(iter_text_blocks(path, encoding, block_size=7)) == TEXT
+
+
+def test_read_text_falls_back_to_next_candidate(tmp_path):
+    """樣本之後才出現的無效位元組使 utf-8 失敗時，整份讀取改用下一個候選編碼"""
+    data = b"a" * (SAMPLE_BYTES + 10) + "你好，錯誤。".encode("gbk")
+    path = _write(tmp_path, "late.txt", data)
+    assert detect_encoding(path)[0] == "utf-8"
+    with pytest.raises(UnicodeDecodeError):
+        "".join(iter_text_blocks(path, "utf-8", strict=True))
+
+    text, encoding = read_text(path)
+    assert encoding == "gbk"
+    assert text.endswith("你好，錯誤。")
+
+
+def test_blocks_replace_undecodable_bytes(tmp_path, capsys):
+    """非嚴格模式遇到無效位元組時警告並以替代字元繼續，不會中途失敗"""
+    data = "第一句。".encode("big5") + b"\xff\xff" + "最後一句。".encode("big5")
+    path = _write(tmp_path, "mixed.txt", data)
+    text = "".join(iter_text_blocks(path, "big5", block_size=5))
+    assert text.startswith("第一句。")
+    assert text.endswith("最後一句。")
+    assert "�" in text
+    assert "無法以 big5 解碼" in capsys.readouterr().out
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+非同步讀稿機測試（以記錄聲音設定的假讀稿機取代 XTTS）
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from tts_async import AsyncTTSReader
+
+
+class FakeReader:
+    engine_type = 'xtts'
+    sample_rate = 24000
+
+    def __init__(self):
+        self.language = "zh-cn"
+        self.speaker = "Default"
+        self.speaker_wav = None
+        self.calls = []
+
+    def _synthesize_pcm(self, text):
+        self.calls.append((text, self.language, self.speaker, self.speaker_wav))
+        return np.zeros(10, dtype=np.float32)
+
+
+def _run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_request_voice_does_not_leak():
+    """請求指定的聲音只用於該請求，之後的預設請求仍使用預設聲音"""
+    reader = FakeReader()
+
+    async def scenario():
+        async with AsyncTTSReader(reader) as tts:
+            await tts.synthesize_pcm("第一句。", speaker="B", language="en")
+            await tts.synthesize_pcm("第二句。")
+            await tts.synthesize_pcm("第三句。", speaker_wav="ref.wav")
+
+    _run(scenario())
+    assert reader.calls == [
+        ("第一句。", "en", "B", None),
+        ("第二句。", "zh-cn", "Default", None),
+        ("第三句。", "zh-cn", "Default", "ref.wav"),
+    ]
+    assert (reader.language, reader.speaker, reader.speaker_wav) == ("zh-cn", "Default", None)
+
+
+def test_reader_restored_after_error():
+    """合成失敗時也會還原讀稿機的聲音設定，例外傳給呼叫端"""
+    reader = FakeReader()
+
+    def failing(text):
+        raise RuntimeError("boom")
+    reader._synthesize_pcm = failing
+
+    async def scenario():
+        async with AsyncTTSReader(reader) as tts:
+            await tts.synthesize_pcm("一句。", speaker="B")
+
+    with pytest.raises(RuntimeError):
+        _run(scenario())
+    assert reader.speaker == "Default"
+
+
+def test_sentences_stream_in_order():
+    """逐句產出，句數與斷句結果一致"""
+    reader = FakeReader()
+
+    async def scenario():
+        async with AsyncTTSReader(reader, prefetch=1) as tts:
+            return [pcm async for pcm in tts.synthesize("一。二。三。")]
+
+    assert len(_run(scenario())) == 3
+    assert [call[0] for call in reader.calls] == ["一。", "二。", "三。"]
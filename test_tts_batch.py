@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批次合成測試（以同一行程的假工作池取代 spawn 工作行程）
+"""
+
+import json
+import os
+import sys
+import types
+
+import pytest
+
+import tts_batch
+from tts_batch import MANIFEST_NAME, run_batch
+
+
+class InlinePool:
+    """在本行程執行初始化函數與工作的假工作池"""
+
+    def __init__(self, processes, initializer=None, initargs=()):
+        if initializer is not None:
+            initializer(*initargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def imap_unordered(self, function, tasks):
+        return map(function, tasks)
+
+
+class InlineContext:
+    Pool = InlinePool
+
+
+@pytest.fixture
+def inline_pool(monkeypatch):
+    monkeypatch.setattr(tts_batch.multiprocessing, "get_context", lambda method: InlineContext())
+    # 初始化函數會設定執行緒環境變數與工作行程全域狀態，測試後還原
+    monkeypatch.setenv("OMP_NUM_THREADS", "1")
+    monkeypatch.setenv("MKL_NUM_THREADS", "1")
+    monkeypatch.setattr(tts_batch, "_WORKER_READER", None)
+    monkeypatch.setattr(tts_batch, "_WORKER_ERROR", None)
+
+
+@pytest.fixture
+def fake_renderer(monkeypatch):
+    """取代模型的假合成：寫出輸出檔並記錄處理過的檔案"""
+    rendered = []
+
+    def render(task):
+        relative_path, source_path, output_path = task
+        rendered.append(relative_path)
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        with open(output_path, "wb") as f:
+            f.write(b"audio")
+        return relative_path, output_path, None, 0.0
+
+    monkeypatch.setattr(tts_batch, "_init_worker", lambda torch_threads, settings: None)
+    monkeypatch.setattr(tts_batch, "_render_file", render)
+    return rendered
+
+
+def _write_sources(input_dir, files):
+    for relative_path, text in files.items():
+        path = input_dir / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+
+
+def test_second_run_skips_done_files(tmp_path, inline_pool, fake_renderer):
+    """再次執行時略過已是最新的檔案，只重新合成內容或設定變動的檔案"""
+    input_dir, output_dir = tmp_path / "in", tmp_path / "out"
+    _write_sources(input_dir, {"a.txt": "第一句。", "sub/b.txt": "第二句。", "c.txt": "第三句。"})
+
+    assert run_batch(str(input_dir), str(output_dir), {}, workers=1, torch_threads=1) == 0
+    assert sorted(fake_renderer) == ["a.txt", "c.txt", os.path.join("sub", "b.txt")]
+    manifest = json.loads((output_dir / MANIFEST_NAME).read_text(encoding="utf-8"))
+    assert {entry["status"] for entry in manifest["files"].values()} == {"done"}
+    assert manifest["files"]["a.txt"]["output"] == "a.mp3"
+
+    fake_renderer.clear()
+    assert run_batch(str(input_dir), str(output_dir), {}, workers=1, torch_threads=1) == 0
+    assert fake_renderer == []
+
+    _write_sources(input_dir, {"a.txt": "第一句改寫了。"})
+    (output_dir / "c.mp3").unlink()
+    run_batch(str(input_dir), str(output_dir), {}, workers=1, torch_threads=1)
+    assert sorted(fake_renderer) == ["a.txt", "c.txt"]
+
+    fake_renderer.clear()
+    run_batch(str(input_dir), str(output_dir), {"speaker": "B"}, workers=1, torch_threads=1)
+    assert len(fake_renderer) == 3
+
+
+def test_failed_files_are_retried(tmp_path, inline_pool, fake_renderer, monkeypatch):
+    """失敗的檔案記錄在清單中，下次執行重試"""
+    input_dir, output_dir = tmp_path / "in", tmp_path / "out"
+    _write_sources(input_dir, {"a.txt": "第一句。", "b.txt": "第二句。"})
+    render = tts_batch._render_file
+
+    def flaky(task):
+        if task[0] == "b.txt":
+            return task[0], None, "boom", 0.0
+        return render(task)
+    monkeypatch.setattr(tts_batch, "_render_file", flaky)
+    assert run_batch(str(input_dir), str(output_dir), {}, workers=1, torch_threads=1) == 1
+    manifest = json.loads((output_dir / MANIFEST_NAME).read_text(encoding="utf-8"))
+    assert manifest["files"]["b.txt"]["status"] == "failed"
+    assert manifest["files"]["b.txt"]["error"] == "boom"
+
+    monkeypatch.setattr(tts_batch, "_render_file", render)
+    fake_renderer.clear()
+    assert run_batch(str(input_dir), str(output_dir), {}, workers=1, torch_threads=1) == 0
+    assert fake_renderer == ["b.txt"]
+
+
+def test_model_load_failure_reports_every_file(tmp_path, inline_pool, monkeypatch, capsys):
+    """工作行程載入模型失敗時不拋出例外（避免工作池不斷重啟），每個檔案回報失敗"""
+    fake_torch = types.SimpleNamespace(set_num_threads=lambda n: None,
+                                       set_num_interop_threads=lambda n: None)
+    monkeypatch.setitem(sys.modules, "torch", fake_torch)
+
+    from tts_enhanced import EnhancedTTSReader
+
+    def broken_init(self, engine_type="auto"):
+        raise RuntimeError("checkpoint is corrupt")
+    monkeypatch.setattr(EnhancedTTSReader, "init_engine", broken_init)
+
+    input_dir, output_dir = tmp_path / "in", tmp_path / "out"
+    _write_sources(input_dir, {"a.txt": "第一句。", "b.txt": "第二句。"})
+    monkeypatch.chdir(tmp_path)
+    assert run_batch(str(input_dir), str(output_dir), {}, workers=1, torch_threads=1) == 2
+
+    manifest = json.loads((output_dir / MANIFEST_NAME).read_text(encoding="utf-8"))
+    for entry in manifest["files"].values():
+        assert entry["status"] == "failed"
+        assert "checkpoint is corrupt" in entry["error"]
+    assert "模型載入失敗" in capsys.readouterr().out
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+效能基準測試（使用離線的 stub 引擎，不需要任何 TTS 套件）
+"""
+
+import json
+import sys
+
+import tts_benchmark
+from tts_benchmark import compare_reports, run_benchmark
+
+CORPUS = [("two_sentences", "今天天氣很好，我們一起去公園散步吧。明天再見。")]
+
+
+def _write_report(path, report):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+def test_stub_benchmark_report(tmp_path):
+    """stub 引擎的報告包含載入時間、RTF、首段延遲與各設定的結果，並可存為 JSON"""
+    path = tmp_path / "report.json"
+    _write_report(path, run_benchmark(["stub"], CORPUS))
+    report = json.loads(path.read_text(encoding="utf-8"))
+
+    assert set(report["engines"]["stub"]) == {"cold_load_seconds", "warm_load_seconds"}
+    results = {result["config"]: result for result in report["results"]}
+    assert set(results) == {"whole", "sentence"}
+    for result in results.values():
+        assert "error" not in result
+        assert (result["engine"], result["text_id"]) == ("stub", "two_sentences")
+        assert result["chars"] == len(CORPUS[0][1])
+        assert result["audio_seconds"] > 0
+        assert result["rtf"] == round(result["synthesis_seconds"] / result["audio_seconds"], 4)
+        assert 0 < result["rtf"] < 1
+        assert result["rms"] > 0
+
+    # 逐句合成時，第一句完成即有聲音，早於整段完成
+    sentence = results["sentence"]
+    assert sentence["time_to_first_audio"] < sentence["synthesis_seconds"]
+    assert results["whole"]["time_to_first_audio"] <= results["whole"]["synthesis_seconds"]
+
+
+def test_compare_reports_flags_regression():
+    """RTF 變慢超過門檻才列為退化，沒有基準的項目不比較"""
+    def report(rtf, text_id="two_sentences"):
+        return {"results": [{"engine": "stub", "config": "whole", "text_id": text_id, "rtf": rtf}]}
+
+    assert compare_reports(report(0.10), report(0.105)) == []
+    assert compare_reports(report(0.10), report(0.20)) == [{
+        "engine": "stub", "config": "whole", "text_id": "two_sentences",
+        "baseline_rtf": 0.10, "rtf": 0.20
+    }]
+    assert compare_reports(report(0.10, "other"), report(0.20)) == []
+
+
+def test_main_returns_nonzero_on_regression(tmp_path, monkeypatch):
+    """命令列 --compare 發現退化時回傳 1，沒有退化時回傳 0"""
+    monkeypatch.setattr(tts_benchmark, "BENCHMARK_CORPUS", CORPUS)
+    output = tmp_path / "current.json"
+    monkeypatch.setattr(sys, "argv", ["tts_benchmark.py", "--no-long", "--configs", "whole", "-o", str(output)])
+    assert tts_benchmark.main() == 0
+    current = json.loads(output.read_text(encoding="utf-8"))
+
+    fast = tmp_path / "fast.json"
+    slow = tmp_path / "slow.json"
+    _write_report(fast, {"results": [dict(result, rtf=result["rtf"] / 10) for result in current["results"]]})
+    _write_report(slow, {"results": [dict(result, rtf=result["rtf"] * 10) for result in current["results"]]})
+
+    monkeypatch.setattr(sys, "argv", ["tts_benchmark.py", "--no-long", "--configs", "whole",
+                                      "-o", str(output), "--compare", str(fast)])
+    assert tts_benchmark.main() == 1
+    monkeypatch.setattr(sys, "argv", ["tts_benchmark.py", "--no-long", "--configs", "whole",
+                                      "-o", str(output), "--compare", str(slow)])
+    assert tts_benchmark.main() == 0
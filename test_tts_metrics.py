@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+效能量測測試
+"""
+
+import copy
+import json
+import pickle
+import types
+
+from tts_metrics import Metrics, instrument_xtts, uninstrument_xtts
+
+
+class FakeGPT:
+    def generate(self, *args):
+        return "codes"
+
+
+class FakeDecoder:
+    def forward(self, latents):
+        return latents
+
+
+def test_disabled_metrics_record_nothing():
+    metrics = Metrics()
+    with metrics.stage("inference"):
+        pass
+    metrics.count("sentences")
+    assert metrics.snapshot() == {"stages": {}, "counters": {}, "rtf": None}
+
+
+def test_stage_histogram_and_trace(tmp_path):
+    trace_path = tmp_path / "trace.jsonl"
+    metrics = Metrics()
+    metrics.enable(str(trace_path))
+    metrics.observe("inference", 0.2)
+    metrics.observe("inference", 3.0, error=True)
+    metrics.count("synthesized_audio_seconds", 8.0)
+    metrics.disable()
+
+    stat = metrics.snapshot()["stages"]["inference"]
+    assert (stat["count"], stat["errors"], stat["max"]) == (2, 1, 3.0)
+    assert sum(stat["buckets"]) == 2
+    assert abs(metrics.snapshot()["rtf"] - 3.2 / 8.0) < 1e-9
+
+    events = [json.loads(line) for line in trace_path.read_text(encoding="utf-8").splitlines()]
+    assert [event["type"] for event in events] == ["stage", "stage", "counter"]
+
+    text = metrics.to_prometheus()
+    assert 'tts_stage_seconds_bucket{stage="inference",le="+Inf"} 2' in text
+    assert 'tts_stage_errors_total{stage="inference"} 1' in text
+
+
+def test_instrument_and_uninstrument():
+    """包裝可移除，移除後的模組可以複製與序列化（int8 量化前需要）"""
+    metrics = Metrics()
+    metrics.enable()
+    core = types.SimpleNamespace(gpt=FakeGPT(), hifigan_decoder=FakeDecoder())
+
+    instrument_xtts(core, metrics)
+    instrument_xtts(core, metrics)
+    assert core.gpt.generate() == "codes"
+    assert core.hifigan_decoder.forward(1) == 1
+    assert metrics.snapshot()["stages"]["gpt_generate"]["count"] == 1
+
+    assert uninstrument_xtts(core)
+    assert "generate" not in vars(core.gpt)
+    pickle.dumps(copy.deepcopy(core.gpt))
+    assert not uninstrument_xtts(core)
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+相似聲音索引測試
+"""
+
+import numpy as np
+
+from voice_index import VoiceIndex, find_similar_voices
+
+NAMES = ["Alpha", "Beta", "Gamma", "Delta"]
+EMBEDDINGS = np.array([
+    [1.0, 0.0, 0.0],
+    [0.9, 0.1, 0.0],
+    [0.0, 1.0, 0.0],
+    [-1.0, 0.0, 0.0],
+], dtype=np.float32)
+
+
+def test_query_orders_by_cosine_similarity():
+    index = VoiceIndex(NAMES, EMBEDDINGS * 5)
+    results = index.query([2.0, 0.0, 0.0], k=3)
+    assert [name for name, _ in results] == ["Alpha", "Beta", "Gamma"]
+    assert abs(results[0][1] - 1.0) < 1e-6
+
+
+def test_similar_to_excludes_itself():
+    index = VoiceIndex(NAMES, EMBEDDINGS)
+    results = index.similar_to("Alpha", k=10)
+    assert [name for name, _ in results] == ["Beta", "Gamma", "Delta"]
+    assert results[-1][1] < 0
+
+
+def test_resolve_and_contains():
+    index = VoiceIndex(NAMES, EMBEDDINGS)
+    assert index.resolve(" alpha ") == "Alpha"
+    assert "gamma" in index
+    assert "Omega" not in index
+
+
+def test_save_and_load(tmp_path):
+    path = str(tmp_path / "index.npz")
+    VoiceIndex(NAMES, EMBEDDINGS, genders=["female", "", "male", ""]).save(path)
+    loaded = VoiceIndex.load(path)
+    assert loaded.matches(NAMES)
+    assert loaded.genders == ["female", "", "male", ""]
+    np.testing.assert_allclose(loaded.vectors, VoiceIndex(NAMES, EMBEDDINGS).vectors)
+    assert VoiceIndex.load(str(tmp_path / "missing.npz")) is None
+
+
+def test_find_by_name_uses_saved_index_without_model(tmp_path):
+    """以名稱查詢且索引已保存時不需要載入模型"""
+    path = str(tmp_path / "index.npz")
+    VoiceIndex(NAMES, EMBEDDINGS).save(path)
+    results = find_similar_voices("beta", k=1, path=path)
+    assert results[0][0] == "Alpha"
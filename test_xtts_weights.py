@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+權重轉換鎖測試（以假的轉換函數取代 torch/TTS）
+"""
+
+import os
+import threading
+import time
+
+import pytest
+
+import xtts_weights
+from xtts_weights import CONVERT_LOCK_NAME, conversion_lock, convert_checkpoint, mmap_weights_path
+
+
+def _model_dir(tmp_path):
+    (tmp_path / "model.pth").write_bytes(b"checkpoint")
+    return tmp_path
+
+
+def test_concurrent_first_load_converts_once(tmp_path, monkeypatch):
+    """多個工作行程同時首次載入時只轉換一次，其餘等待後沿用轉換結果"""
+    model_dir = _model_dir(tmp_path)
+    conversions = []
+
+    def fake_convert(model_dir, checkpoint):
+        conversions.append(threading.get_ident())
+        time.sleep(0.2)
+        output_path = mmap_weights_path(model_dir)
+        output_path.write_bytes(b"weights")
+        return output_path
+
+    monkeypatch.setattr(xtts_weights, "_convert", fake_convert)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(convert_checkpoint(model_dir)))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(conversions) == 1
+    assert results == [mmap_weights_path(model_dir)] * 4
+    assert not (model_dir / CONVERT_LOCK_NAME).exists()
+
+
+def test_lock_released_on_failure(tmp_path, monkeypatch):
+    """轉換失敗時釋放鎖檔，下次可重試"""
+    model_dir = _model_dir(tmp_path)
+
+    def failing_convert(model_dir, checkpoint):
+        raise RuntimeError("out of memory")
+
+    monkeypatch.setattr(xtts_weights, "_convert", failing_convert)
+    with pytest.raises(RuntimeError):
+        convert_checkpoint(model_dir)
+    assert not (model_dir / CONVERT_LOCK_NAME).exists()
+
+
+def test_stale_lock_is_removed(tmp_path):
+    """中斷的轉換留下的過期鎖檔不會讓之後的行程永遠等待"""
+    lock_path = tmp_path / CONVERT_LOCK_NAME
+    lock_path.write_text("12345")
+    old = time.time() - xtts_weights.LOCK_STALE_SECONDS - 60
+    os.utime(lock_path, (old, old))
+
+    with conversion_lock(tmp_path, poll_interval=0.01):
+        assert lock_path.read_text() == str(os.getpid())
+    assert not lock_path.exists()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+中英文混合稿件的文字正規化與斷句
+- 依中英文句末標點（。！？；!?;…）與換行斷句，不會切開小數、縮寫與省略號
+- 中文稿件將日期、時間、百分比與常見單位展開為口語讀法
+- 每段長度不超過 XTTS v2 各語言的字數上限，過長的句子優先在逗號、
+  中英文交界、空白處切開
+- iter_segments 是惰性產生器，可直接接收逐塊讀入的文字，大檔案不必整份載入
+"""
+
+import re
+
+# XTTS v2 分詞器的各語言字數上限（超過時模型會警告並可能截斷）
+XTTS_CHAR_LIMITS = {
+    "en": 250, "de": 253, "fr": 273, "es": 239, "it": 213, "pt": 203,
+    "pl": 224, "tr": 226, "ru": 182, "nl": 251, "cs": 186, "ar": 166,
+    "zh": 82, "ja": 71, "hu": 224, "ko": 95
+}
+DEFAULT_CHAR_LIMIT = 250
+
+# 句末標點，以及緊接在句末標點後仍屬同一句的收尾引號/括號
+_SENTENCE_END = set("。！？；!?;…")
+_CLOSING_MARKS = set("」』”’\"')）】》")
+# 過長句子的優先切分點
+_CLAUSE_BREAKS = set("，、,：:—")
+
+# 句點後接空白但不是句尾的英文縮寫
+_ABBREVIATIONS = {"mr", "mrs", "ms", "dr", "prof", "st", "vs", "no", "e.g", "i.e", "etc", "jr", "sr"}
+# 句點前的英文單字或數字（中文稿件中前面常直接接中文字或全形標點，沒有空白）
+_TRAILING_WORD = re.compile(r"[A-Za-z0-9.]+$")
+
+# 未遇到句末標點時緩衝區的上限（字數上限的倍數），避免無標點長文無限累積
+_MAX_PENDING_FACTOR = 4
+
+_FULLWIDTH_ALNUM = {code: code - 0xFEE0 for code in range(0xFF10, 0xFF5B)
+                    if chr(code).isalnum()}
+_FULLWIDTH_ALNUM[0x3000] = 0x20  # 全形空白
+
+_CJK_PATTERN = r"[㐀-鿿豈-﫿]"
+
+# 中文稿件的單位讀法（長的單位放前面，避免 km 被當成 m）
+_ZH_UNITS = [
+    ("km/h", "公里每小時"), ("km²", "平方公里"), ("m²", "平方公尺"),
+    ("km", "公里"), ("cm", "公分"), ("mm", "毫米"), ("kg", "公斤"),
+    ("mg", "毫克"), ("ml", "毫升"), ("GB", "GB"), ("MB", "MB"),
+    ("°C", "度"), ("℃", "度"), ("g", "公克"), ("m", "公尺"), ("L", "公升")
+]
+_ZH_UNIT_PATTERN = re.compile(
+    r"(\d+(?:\.\d+)?)\s?(" + "|".join(re.escape(unit) for unit, _ in _ZH_UNITS) + r")(?![A-Za-z])"
+)
+_ZH_UNIT_NAMES = dict(_ZH_UNITS)
+_ZH_PERCENT_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s?[%％]")
+_ZH_DATE_PATTERN = re.compile(r"(?<!\d)(\d{4})[/\-.](\d{1,2})[/\-.](\d{1,2})(?!\d)")
+_ZH_TIME_PATTERN = re.compile(r"(?<!\d)(\d{1,2}):(\d{2})(?!\d)")
+
+
+def get_char_limit(language):
+    """取得語言的每段字數上限"""
+    return XTTS_CHAR_LIMITS.get((language or "").split("-")[0], DEFAULT_CHAR_LIMIT)
+
+
+def normalize_text(text, language="zh"):
+    """正規化單句文字：全形英數轉半形、合併空白，中文稿件展開日期/時間/單位"""
+    text = text.translate(_FULLWIDTH_ALNUM)
+    text = " ".join(text.split())
+
+    if (language or "").startswith("zh"):
+        text = _ZH_DATE_PATTERN.sub(lambda m: f"{m.group(1)}年{int(m.group(2))}月{int(m.group(3))}日", text)
+        text = _ZH_TIME_PATTERN.sub(
+            lambda m: f"{int(m.group(1))}點" + (f"{m.group(2)}分" if m.group(2) != "00" else ""), text
+        )
+        text = _ZH_PERCENT_PATTERN.sub(lambda m: f"百分之{m.group(1)}", text)
+        text = _ZH_UNIT_PATTERN.sub(lambda m: f"{m.group(1)}{_ZH_UNIT_NAMES[m.group(2)]}", text)
+        # 中文字之間的空白不需朗讀停頓
+        text = re.sub(f"(?<={_CJK_PATTERN}) (?={_CJK_PATTERN})", "", text)
+
+    return text
+
+
+def _is_sentence_period(text, index):
+    """判斷 text[index] 的英文句點是否為句尾（需已知下一個字元）"""
+    next_char = text[index + 1]
+    if not next_char.isspace():
+        return False
+    match = _TRAILING_WORD.search(text[max(0, index - 16):index])
+    word = match.group().lower() if match else ""
+    # 數字後的句點（如清單編號 "1. "）不視為句尾
+    if word[-1:].isdigit() and len(word) <= 3:
+        return False
+    return word.rstrip(".") not in _ABBREVIATIONS
+
+
+def _split_complete(buffer):
+    """從緩衝區切出已完整的句子，回傳 (句子列表, 剩餘文字)
+
+    只有在看到斷句位置的下一個字元後才確定斷句，因此逐塊讀入時
+    不會把跨塊的小數或引號切開。
+    """
+    sentences = []
+    start = 0
+    index = 0
+    length = len(buffer)
+
+    while index < length - 1:
+        char = buffer[index]
+        end = None
+
+        if char == "\n":
+            end = index + 1
+        elif char in _SENTENCE_END or (char == "." and _is_sentence_period(buffer, index)):
+            end = index + 1
+            # 連續的句末標點與收尾引號歸入同一句
+            while end < length and (buffer[end] in _SENTENCE_END or buffer[end] in _CLOSING_MARKS
+                                    or buffer[end] == "."):
+                end += 1
+            if end == length:
+                break
+
+        if end is not None:
+            sentences.append(buffer[start:end])
+            start = end
+            index = end
+        else:
+            index += 1
+
+    return sentences, buffer[start:]
+
+
+def _find_break(text, limit):
+    """在 limit 之內找最適合的切分位置"""
+    window = text[:limit]
+
+    for index in range(len(window) - 1, 0, -1):
+        if window[index] in _CLAUSE_BREAKS:
+            return index + 1
+
+    space = window.rfind(" ")
+    if space > 0:
+        return space + 1
+
+    # 中英文交界
+    for index in range(len(window) - 1, 0, -1):
+        left_cjk = re.match(_CJK_PATTERN, window[index - 1]) is not None
+        right_cjk = re.match(_CJK_PATTERN, window[index]) is not None
+        if left_cjk != right_cjk:
+            return index
+
+    return limit
+
+
+def _bound_length(sentence, limit):
+    """將過長的句子切成不超過 limit 字的片段"""
+    while len(sentence) > limit:
+        cut = _find_break(sentence, limit)
+        piece = sentence[:cut].strip()
+        if piece:
+            yield piece
+        sentence = sentence[cut:].strip()
+    if sentence:
+        yield sentence
+
+
+def _has_speakable(text):
+    """是否包含可朗讀的文字（純標點的片段略過）"""
+    return any(char.isalnum() for char in text)
+
+
+def _iter_blocks(source):
+    """將字串或逐塊文字的可疊代物件統一為文字塊"""
+    if isinstance(source, str):
+        yield source
+    else:
+        for block in source:
+            yield block
+
+
+def iter_segments(source, language="zh", max_chars=None):
+    """惰性斷句：依序產出正規化後、長度受限的句子片段
+
+    source 可以是完整字串，也可以是逐塊產出文字的可疊代物件（例如逐塊讀檔）。
+    """
+    limit = max_chars or get_char_limit(language)
+    max_pending = limit * _MAX_PENDING_FACTOR
+    buffer = ""
+
+    for block in _iter_blocks(source):
+        buffer += block
+        sentences, buffer = _split_complete(buffer)
+
+        # 長時間沒有標點時強制輸出，保持記憶體用量有界
+        if len(buffer) > max_pending:
+            cut = _find_break(buffer, max_pending)
+            sentences.append(buffer[:cut])
+            buffer = buffer[cut:]
+
+        for sentence in sentences:
+            normalized = normalize_text(sentence, language)
+            if _has_speakable(normalized):
+                yield from _bound_length(normalized, limit)
+
+    normalized = normalize_text(buffer, language)
+    if _has_speakable(normalized):
+        yield from _bound_length(normalized, limit)
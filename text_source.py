@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+稿件讀取與編碼偵測
+只讀取檔案開頭的 BOM 與有限長度的樣本判斷編碼，之後以遞增解碼器逐塊讀取，
+解碼結果可直接交給 text_segmenter.iter_segments 斷句，大型稿件不必整份載入記憶體。
+樣本之後才出現無效位元組時，逐塊讀取改以替代字元繼續解碼並提出警告，不會中途失敗。
+"""
+
+import codecs
+
+# 依序嘗試的編碼（與原本 read_txt_file 的順序相同，utf-8-sig 由 BOM 判斷）
+CANDIDATE_ENCODINGS = ["utf-8", "gb2312", "gbk", "big5"]
+
+# BOM 與對應編碼（較長的 BOM 放前面，避免 UTF-32 被誤判為 UTF-16）
+_BOMS = [
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+
+SAMPLE_BYTES = 64 * 1024
+BLOCK_BYTES = 64 * 1024
+
+
+def _decodes(sample, encoding, final):
+    """檢查樣本能否以指定編碼解碼（樣本末端被截斷的多位元組字元不算錯誤）"""
+    try:
+        codecs.getincrementaldecoder(encoding)().decode(sample, final=final)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+
+def detect_encoding(file_path, sample_size=SAMPLE_BYTES, candidates=CANDIDATE_ENCODINGS):
+    """由 BOM 或檔案開頭的樣本判斷編碼，回傳候選編碼列表（最可能的在前）"""
+    with open(file_path, "rb") as f:
+        sample = f.read(sample_size)
+        final = len(f.read(1)) == 0
+
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return [encoding]
+
+    matches = [encoding for encoding in candidates if _decodes(sample, encoding, final)]
+    if not matches:
+        raise UnicodeError(f"無法判斷檔案編碼（已嘗試 {', '.join(candidates)}）")
+    return matches
+
+
+def iter_text_blocks(file_path, encoding=None, block_size=BLOCK_BYTES, strict=False):
+    """以遞增解碼器逐塊讀取文字，記憶體用量與檔案大小無關
+
+    遇到無法解碼的位元組時，strict 為 True 則拋出 UnicodeDecodeError，
+    否則警告一次並以替代字元（U+FFFD）繼續。
+    """
+    encoding = encoding or detect_encoding(file_path)[0]
+    decoder = codecs.getincrementaldecoder(encoding)()
+
+    with open(file_path, "rb") as f:
+        offset = 0
+        while True:
+            data = f.read(block_size)
+            # 解碼失敗後多位元組解碼器的內部狀態不可靠，保留待解碼的位元組以便重新解碼
+            pending = decoder.getstate()[0]
+            try:
+                text = decoder.decode(data, final=not data)
+            except UnicodeDecodeError as e:
+                if strict:
+                    raise
+                print(f"⚠️  {file_path} 約第 {offset - len(pending) + e.start} 位元組無法以 {encoding} 解碼，"
+                      f"以替代字元繼續")
+                decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+                text = decoder.decode(pending + data, final=not data)
+            offset += len(data)
+            if text:
+                yield text
+            if not data:
+                return
+
+
+def read_text(file_path):
+    """讀取整份文字，回傳 (內容, 編碼)
+
+    樣本之後才出現的無效位元組會使該編碼失敗，此時改用下一個候選編碼；
+    最後一個候選編碼仍失敗時以替代字元解碼。
+    """
+    candidates = detect_encoding(file_path)
+    for encoding in candidates[:-1]:
+        try:
+            return "".join(iter_text_blocks(file_path, encoding, strict=True)), encoding
+        except UnicodeDecodeError:
+            continue
+    return "".join(iter_text_blocks(file_path, candidates[-1])), candidates[-1]
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+非同步讀稿機介面
+讓 asyncio 服務（如 aiohttp）嵌入讀稿機而不阻塞事件迴圈：
+- 模型推理在執行緒池中執行，事件迴圈只等待結果
+- 以 asyncio.Semaphore 限制同時推理的句數，多個請求逐句輪流使用模型
+- 每個請求最多預先合成 prefetch 句，消費端讀得慢時生產端暫停（背壓）
+- 消費端中斷迭代或取消任務時，後續句子不再合成
+
+使用範例:
+    async with AsyncTTSReader() as tts:
+        await tts.init_engine("xtts")
+        async for pcm in tts.synthesize("第一句。第二句。"):
+            await response.write(pcm.tobytes())
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from text_segmenter import iter_segments
+
+
+class AsyncTTSReader:
+    def __init__(self, reader=None, max_concurrency=1, prefetch=2, executor=None):
+        """初始化非同步讀稿機（reader 未指定時建立 EnhancedTTSReader）"""
+        if reader is None:
+            from tts_enhanced import EnhancedTTSReader
+            reader = EnhancedTTSReader()
+
+        self.reader = reader
+        self.max_concurrency = max_concurrency
+        self.prefetch = prefetch
+        self._own_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="tts-async"
+        )
+        self._semaphore = None
+        # 讀稿機的聲音設定是共用狀態，設定與推理必須一起串行化
+        self._voice_lock = threading.Lock()
+
+    @property
+    def sample_rate(self):
+        return self.reader.sample_rate
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, traceback):
+        self.close()
+
+    def _get_semaphore(self):
+        # 在事件迴圈內建立，避免綁定到其他迴圈
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def init_engine(self, engine_type="xtts"):
+        """在執行緒池中初始化引擎（載入模型不阻塞事件迴圈）"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self.reader.init_engine, engine_type)
+
+    def _synthesize_sentence(self, text, voice):
+        """執行緒池內：套用請求的聲音設定並合成單句，完成後還原讀稿機的預設聲音"""
+        reader = self.reader
+        with self._voice_lock:
+            saved = (reader.language, reader.speaker, reader.speaker_wav)
+            try:
+                if voice["language"]:
+                    reader.language = voice["language"]
+                # 請求指定聲音時取代預設聲音（包括預設的參考音檔）
+                if voice["speaker"] or voice["speaker_wav"]:
+                    reader.speaker = voice["speaker"] or reader.speaker
+                    reader.speaker_wav = voice["speaker_wav"]
+                return reader._synthesize_pcm(text)
+            finally:
+                reader.language, reader.speaker, reader.speaker_wav = saved
+
+    async def _produce(self, text, voice, results):
+        """逐句合成並放入佇列，佇列已滿時等待消費端（背壓）"""
+        loop = asyncio.get_running_loop()
+        semaphore = self._get_semaphore()
+        try:
+            for sentence in iter_segments(text, voice["language"] or self.reader.language):
+                async with semaphore:
+                    pcm = await loop.run_in_executor(
+                        self._executor, self._synthesize_sentence, sentence, voice
+                    )
+                await results.put(pcm)
+        except Exception as e:
+            await results.put(e)
+            return
+        await results.put(None)
+
+    async def synthesize(self, text, language=None, speaker=None, speaker_wav=None):
+        """非同步逐句產出 float32 PCM 陣列"""
+        if self.reader.engine_type != 'xtts':
+            raise RuntimeError("非同步合成需要 XTTS v2 引擎")
+
+        voice = {"language": language, "speaker": speaker, "speaker_wav": speaker_wav}
+        results = asyncio.Queue(maxsize=self.prefetch)
+        producer = asyncio.ensure_future(self._produce(text, voice, results))
+
+        try:
+            while True:
+                item = await results.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # 消費端提前結束或被取消：停止合成後續句子
+            if not producer.done():
+                producer.cancel()
+                try:
+                    await producer
+                except asyncio.CancelledError:
+                    pass
+
+    async def synthesize_pcm(self, text, language=None, speaker=None, speaker_wav=None):
+        """非同步合成整段文字，回傳串接後的 PCM 陣列"""
+        import numpy as np
+
+        chunks = [pcm async for pcm in self.synthesize(text, language, speaker, speaker_wav)]
+        return np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float32)
+
+    def close(self):
+        """關閉自行建立的執行緒池"""
+        if self._own_executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批次文件合成
+走訪資料夾內所有 TXT 檔，分派到多個工作行程（各自載入 XTTS v2 模型，
+並限制 torch 執行緒數）平行合成，輸出與 batch_manifest.json 放在同一資料夾。
+再次執行時會略過輸出已是最新的檔案，可中斷後續跑。
+"""
+
+import os
+import json
+import time
+import multiprocessing
+
+MANIFEST_NAME = "batch_manifest.json"
+
+# 工作行程內的讀稿機（每個行程各自載入一次模型）
+_WORKER_READER = None
+# 工作行程初始化失敗的原因（初始化函數拋出例外時工作池會不斷重啟行程，改為記錄後逐檔回報）
+_WORKER_ERROR = None
+
+
+def default_worker_settings(workers=None, torch_threads=None):
+    """依CPU核心數決定工作行程數與每個行程的 torch 執行緒數"""
+    cpu_count = os.cpu_count() or 1
+    if workers is None:
+        workers = max(1, cpu_count // (torch_threads or 4))
+    if torch_threads is None:
+        torch_threads = max(1, cpu_count // workers)
+    return workers, torch_threads
+
+
+def collect_txt_files(input_dir):
+    """遞迴列出資料夾內所有 TXT 檔（相對路徑，已排序）"""
+    files = []
+    for root, _, names in os.walk(input_dir):
+        for name in names:
+            if name.lower().endswith(".txt"):
+                files.append(os.path.relpath(os.path.join(root, name), input_dir))
+    return sorted(files)
+
+
+def load_manifest(output_dir):
+    """讀取批次清單，不存在時回傳空清單"""
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"files": {}}
+
+
+def save_manifest(output_dir, manifest):
+    """寫入批次清單（先寫暫存檔再替換，中斷時不會損毀）"""
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, path)
+
+
+def _source_signature(path, settings):
+    """來源檔案與合成設定的簽章，任一變動即需重新合成"""
+    stat = os.stat(path)
+    return {
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        "speaker": settings.get("speaker"),
+        "speaker_wav": settings.get("speaker_wav"),
+        "language": settings.get("language"),
+        "precision": settings.get("precision"),
+        "post_process": settings.get("post_process", True)
+    }
+
+
+def is_up_to_date(entry, signature, output_dir):
+    """檢查清單中的輸出是否仍為最新"""
+    if not entry or entry.get("status") != "done":
+        return False
+    if entry.get("source") != signature:
+        return False
+    return os.path.exists(os.path.join(output_dir, entry.get("output", "")))
+
+
+def _init_worker(torch_threads, settings):
+    """工作行程初始化：限制執行緒數並載入模型（失敗時記錄原因，不拋出例外）"""
+    global _WORKER_READER, _WORKER_ERROR
+
+    # 必須在匯入 torch 之前設定
+    for name in ("OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[name] = str(torch_threads)
+
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+        try:
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            pass
+
+        from tts_enhanced import EnhancedTTSReader
+
+        reader = EnhancedTTSReader()
+        reader.use_daemon = False
+        reader.use_cache = settings.get("use_cache", True)
+        reader.speaker = settings.get("speaker") or reader.speaker
+        reader.speaker_wav = settings.get("speaker_wav")
+        reader.language = settings.get("language") or reader.language
+        reader.batch_size = settings.get("batch_size", 1)
+        reader.precision = settings.get("precision")
+        reader.write_alignment = settings.get("write_alignment", True)
+        reader.post_process = settings.get("post_process", True)
+        # 套用精度時以工作行程分配到的執行緒數為準，不依全機核心數
+        reader.torch_threads = torch_threads
+        reader.init_engine("xtts")
+    except Exception as e:
+        _WORKER_READER = None
+        _WORKER_ERROR = f"模型載入失敗: {type(e).__name__}: {e}"
+        print(f"❌ 工作行程 {os.getpid()} {_WORKER_ERROR}")
+        return
+    _WORKER_READER = reader
+    _WORKER_ERROR = None
+
+
+def _render_file(task):
+    """工作行程：合成單一檔案"""
+    relative_path, source_path, output_path = task
+    start_time = time.time()
+    if _WORKER_READER is None:
+        return relative_path, None, _WORKER_ERROR or "模型未載入", 0.0
+    try:
+        if os.path.getsize(source_path) == 0:
+            raise Exception("檔案為空")
+
+        # 逐塊讀檔並斷句，大型稿件不必整份載入記憶體
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        saved_path = _WORKER_READER.synthesize_to_file(
+            _WORKER_READER.iter_txt_file(source_path), output_path
+        )
+        if _WORKER_READER.use_cache:
+            _WORKER_READER.synthesis_cache.flush_stats()
+
+        return relative_path, saved_path, None, time.time() - start_time
+    except Exception as e:
+        return relative_path, None, str(e), time.time() - start_time
+
+
+def run_batch(input_dir, output_dir, settings, workers=None, torch_threads=None, output_format="mp3"):
+    """批次合成資料夾內所有 TXT 檔，回傳失敗的檔案數"""
+    workers, torch_threads = default_worker_settings(workers, torch_threads)
+    os.makedirs(output_dir, exist_ok=True)
+
+    manifest = load_manifest(output_dir)
+    entries = manifest.setdefault("files", {})
+
+    tasks = []
+    skipped = 0
+    for relative_path in collect_txt_files(input_dir):
+        source_path = os.path.join(input_dir, relative_path)
+        signature = _source_signature(source_path, settings)
+
+        if is_up_to_date(entries.get(relative_path), signature, output_dir):
+            skipped += 1
+            continue
+
+        output_relative = os.path.splitext(relative_path)[0] + f".{output_format}"
+        entries[relative_path] = {"status": "pending", "source": signature}
+        tasks.append((relative_path, source_path, os.path.join(output_dir, output_relative)))
+
+    print(f"📚 批次合成: {len(tasks)} 個檔案待處理，{skipped} 個已是最新")
+    if not tasks:
+        return 0
+
+    workers = min(workers, len(tasks))
+    print(f"⚙️  工作行程: {workers} 個，每個行程 torch 執行緒: {torch_threads}")
+    save_manifest(output_dir, manifest)
+
+    failures = 0
+    start_time = time.time()
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(workers, initializer=_init_worker, initargs=(torch_threads, settings)) as pool:
+        for index, (relative_path, saved_path, error, elapsed) in enumerate(
+                pool.imap_unordered(_render_file, tasks), 1):
+            entry = entries[relative_path]
+            entry["elapsed_seconds"] = round(elapsed, 2)
+            if error:
+                failures += 1
+                entry["status"] = "failed"
+                entry["error"] = error
+                print(f"❌ [{index}/{len(tasks)}] {relative_path}: {error}")
+            else:
+                entry["status"] = "done"
+                entry["output"] = os.path.relpath(saved_path, output_dir)
+                entry.pop("error", None)
+                print(f"✅ [{index}/{len(tasks)}] {relative_path} ({elapsed:.1f} 秒)")
+            save_manifest(output_dir, manifest)
+
+    print(f"🏁 批次合成完成，耗時 {time.time() - start_time:.1f} 秒，失敗 {failures} 個")
+    print(f"📁 輸出資料夾: {output_dir}")
+    return failures
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TTS 引擎效能基準測試
+以 tts_compare.TTSComparator 的引擎組合，對固定語料（短/中/長 中英文，
+含 test_script.txt）量測每個引擎與設定的：
+- 冷/熱載入時間
+- 即時率 RTF（合成耗時 / 音頻長度，小於1代表快於即時）
+- 首段音頻延遲（time-to-first-audio）
+- 每秒處理字數、行程峰值記憶體 (RSS)
+結果輸出為 JSON，可與先前的結果比較以追蹤效能退化。
+stub 引擎不需要任何模型，可在 CI 上執行。
+
+使用範例:
+  python tts_benchmark.py --engines stub                      # 離線模擬引擎
+  python tts_benchmark.py --engines xtts --output base.json   # 量測 XTTS v2
+  python tts_benchmark.py --engines xtts --compare base.json  # 與基準比較
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+
+from text_segmenter import iter_segments
+
+# 基準語料（長文使用 test_script.txt）
+BENCHMARK_CORPUS = [
+    ("short_zh", "你好，歡迎使用讀稿機。"),
+    ("short_en", "Hello, welcome to the script reader."),
+    ("medium_zh", "今天天氣很好，我們一起去公園散步吧。公園裡有很多花，紅的、黃的、紫的，非常漂亮。"
+                  "走累了就在湖邊的長椅上休息，看看湖面上的小船。"),
+    ("medium_mixed", "這份報告使用 XTTS v2 模型生成語音。The model supports multiple languages, "
+                     "包括中文與英文。Please review the results and send your feedback by Friday."),
+]
+LONG_SCRIPT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_script.txt")
+
+# 各設定：whole 為整段一次合成，sentence 為逐句合成（首段延遲取決於第一句）
+BENCHMARK_CONFIGS = ["whole", "sentence"]
+
+# RTF 變慢超過此比例時視為效能退化
+REGRESSION_THRESHOLD = 0.10
+
+
+class StubEngine:
+    def __init__(self, sample_rate=24000, chars_per_second=6.0, realtime_factor=0.05):
+        """模擬引擎：依字數產生固定長度的正弦波，並按設定的 RTF 等待"""
+        self.sample_rate = sample_rate
+        self.chars_per_second = chars_per_second
+        self.realtime_factor = realtime_factor
+
+    def synthesize_pcm(self, text):
+        import numpy as np
+
+        duration = max(len(text) / self.chars_per_second, 0.1)
+        time.sleep(duration * self.realtime_factor)
+
+        t = np.arange(int(duration * self.sample_rate), dtype=np.float32) / self.sample_rate
+        return 0.1 * np.sin(2 * math.pi * 220.0 * t).astype(np.float32), self.sample_rate
+
+
+def load_corpus(include_long=True):
+    """取得基準語料"""
+    corpus = list(BENCHMARK_CORPUS)
+    if include_long and os.path.exists(LONG_SCRIPT_PATH):
+        with open(LONG_SCRIPT_PATH, "r", encoding="utf-8") as f:
+            corpus.append(("long_script", f.read().strip()))
+    return corpus
+
+
+def peak_rss_mb():
+    """行程峰值記憶體 (MB)，無法取得時回傳 None"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux 單位為 KB，macOS 為 bytes
+        return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    except ImportError:
+        pass
+    try:
+        import psutil
+        memory = psutil.Process().memory_info()
+        return round(getattr(memory, "peak_wset", memory.rss) / (1024 * 1024), 1)
+    except ImportError:
+        return None
+
+
+def _load_engine(comparator, engine_name):
+    """載入引擎，回傳耗時（秒）"""
+    start = time.perf_counter()
+    if engine_name == "stub":
+        comparator.engines["stub"] = StubEngine()
+    else:
+        comparator.load_engine(engine_name)
+    return time.perf_counter() - start
+
+
+def _measure(comparator, engine_name, config, text):
+    """量測單一語料的合成效能"""
+    import numpy as np
+
+    start = time.perf_counter()
+    first_audio = None
+    chunks = []
+    sample_rate = None
+
+    if config == "whole":
+        pcm, sample_rate = comparator.synthesize_pcm(text, engine_name)
+        chunks.append(pcm)
+        first_audio = time.perf_counter() - start
+    else:
+        for sentence in iter_segments(text):
+            pcm, sample_rate = comparator.synthesize_pcm(sentence, engine_name)
+            chunks.append(pcm)
+            if first_audio is None:
+                first_audio = time.perf_counter() - start
+
+    elapsed = time.perf_counter() - start
+    samples = sum(len(chunk) for chunk in chunks) if chunks else 0
+    audio_seconds = samples / sample_rate if sample_rate else 0.0
+
+    return {
+        "chars": len(text),
+        "synthesis_seconds": round(elapsed, 4),
+        "audio_seconds": round(audio_seconds, 4),
+        "rtf": round(elapsed / audio_seconds, 4) if audio_seconds else None,
+        "time_to_first_audio": round(first_audio, 4) if first_audio is not None else None,
+        "chars_per_second": round(len(text) / elapsed, 2) if elapsed else None,
+        "peak_rss_mb": peak_rss_mb(),
+        "rms": round(float(np.sqrt(np.mean(np.square(np.concatenate(chunks))))), 5) if samples else 0.0
+    }
+
+
+def run_benchmark(engine_names, corpus, configs=BENCHMARK_CONFIGS):
+    """執行基準測試，回傳結果字典"""
+    from tts_compare import TTSComparator
+
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "engines": {},
+        "results": []
+    }
+
+    for engine_name in engine_names:
+        print(f"\n🔧 引擎: {engine_name}")
+        comparator = TTSComparator(engine_names=[])
+        try:
+            cold_load = _load_engine(comparator, engine_name)
+            comparator.engines.pop(engine_name, None)
+            warm_load = _load_engine(comparator, engine_name)
+        except Exception as e:
+            print(f"❌ 引擎載入失敗，略過: {e}")
+            report["engines"][engine_name] = {"error": str(e)}
+            continue
+
+        print(f"   ⏱️  冷載入 {cold_load:.2f} 秒 / 熱載入 {warm_load:.2f} 秒")
+        report["engines"][engine_name] = {
+            "cold_load_seconds": round(cold_load, 4),
+            "warm_load_seconds": round(warm_load, 4)
+        }
+
+        for config in configs:
+            for text_id, text in corpus:
+                try:
+                    result = _measure(comparator, engine_name, config, text)
+                except Exception as e:
+                    print(f"   ❌ {config}/{text_id} 失敗: {e}")
+                    result = {"error": str(e)}
+
+                result.update({"engine": engine_name, "config": config, "text_id": text_id})
+                report["results"].append(result)
+
+                if "error" not in result:
+                    print(f"   📊 {config:<8} {text_id:<13} RTF {result['rtf']:<7} "
+                          f"首段 {result['time_to_first_audio']:.3f} 秒  "
+                          f"{result['chars_per_second']} 字/秒")
+
+    return report
+
+
+def compare_reports(baseline, current, threshold=REGRESSION_THRESHOLD):
+    """與基準結果比較 RTF，回傳退化項目列表"""
+    def index(report):
+        return {(r["engine"], r["config"], r["text_id"]): r
+                for r in report.get("results", []) if r.get("rtf")}
+
+    baseline_results = index(baseline)
+    regressions = []
+    for key, result in index(current).items():
+        previous = baseline_results.get(key)
+        if previous and result["rtf"] > previous["rtf"] * (1 + threshold):
+            regressions.append({
+                "engine": key[0], "config": key[1], "text_id": key[2],
+                "baseline_rtf": previous["rtf"], "rtf": result["rtf"]
+            })
+    return regressions
+
+
+def main():
+    """主函數"""
+    parser = argparse.ArgumentParser(
+        description="TTS 引擎效能基準測試",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__.split("使用範例:")[1]
+    )
+    parser.add_argument("--engines", "-e", nargs="+", default=["stub"],
+                        choices=["stub", "pyttsx3", "win32", "xtts"], help="要測試的引擎 (預設: stub)")
+    parser.add_argument("--configs", nargs="+", default=BENCHMARK_CONFIGS,
+                        choices=BENCHMARK_CONFIGS, help="要測試的設定")
+    parser.add_argument("--no-long", action="store_true", help="略過長文 (test_script.txt)")
+    parser.add_argument("--output", "-o", help="結果 JSON 路徑 (預設: tts_outputs/benchmarks/)")
+    parser.add_argument("--compare", "-c", help="與先前的結果 JSON 比較，RTF 退化時回傳非零")
+
+    args = parser.parse_args()
+
+    print("🏁 TTS 引擎效能基準測試")
+    print("=" * 60)
+
+    report = run_benchmark(args.engines, load_corpus(not args.no_long), args.configs)
+
+    output_path = args.output or os.path.join(
+        "tts_outputs", "benchmarks", f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 結果已保存: {output_path}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_reports(baseline, report)
+        if regressions:
+            print(f"⚠️  發現 {len(regressions)} 項效能退化 (RTF 變慢超過 {REGRESSION_THRESHOLD:.0%}):")
+            for item in regressions:
+                print(f"   {item['engine']}/{item['config']}/{item['text_id']}: "
+                      f"{item['baseline_rtf']} → {item['rtf']}")
+            return 1
+        print("✅ 沒有效能退化")
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -6,8 +6,11 @@ TTS 引擎比較工具
 """
 
 import argparse
+import os
 import sys
 import time
+import wave
+import tempfile
 
 # 嘗試導入各種 TTS 引擎
 ENGINES_AVAILABLE = {}
@@ -27,19 +30,59 @@ except ImportError:
 try:
     from TTS.api import TTS
     import torch
-    import pygame
-    import tempfile
-    import os
     ENGINES_AVAILABLE['xtts'] = True
 except ImportError:
     ENGINES_AVAILABLE['xtts'] = False
 
+from audio_sink import play_pcm
+
+XTTS_MODEL_NAME = "tts_models/multilingual/multi-dataset/xtts_v2"
+
+
+def _read_wav_pcm(path):
+    """讀取16-bit WAV為 (float32 PCM, 取樣率)"""
+    import numpy as np
+    
+    with wave.open(path, 'rb') as wav_file:
+        sample_rate = wav_file.getframerate()
+        channels = wav_file.getnchannels()
+        frames = wav_file.readframes(wav_file.getnframes())
+    
+    samples = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return samples, sample_rate
+
 
 class TTSComparator:
-    def __init__(self):
-        """初始化 TTS 比較工具"""
+    def __init__(self, engine_names=None):
+        """初始化 TTS 比較工具
+        
+        engine_names 為 None 時初始化所有可用引擎；指定列表時只安靜地載入這些引擎。
+        """
         self.engines = {}
-        self._init_all_engines()
+        if engine_names is None:
+            self._init_all_engines()
+        else:
+            for engine_name in engine_names:
+                self.load_engine(engine_name)
+    
+    def load_engine(self, engine_name):
+        """載入單一引擎並加入比較清單，回傳引擎物件"""
+        if not ENGINES_AVAILABLE.get(engine_name, False):
+            raise Exception(f"引擎 {engine_name} 不可用")
+        
+        if engine_name == 'pyttsx3':
+            engine = pyttsx3.init()
+            engine.setProperty('rate', 150)
+            engine.setProperty('volume', 0.9)
+        elif engine_name == 'win32':
+            engine = win32com.client.Dispatch("SAPI.SpVoice")
+        elif engine_name == 'xtts':
+            engine = TTS(XTTS_MODEL_NAME)
+        
+        self.engines[engine_name] = engine
+        return engine
     
     def _init_all_engines(self):
         """初始化所有可用的 TTS 引擎"""
@@ -51,10 +94,7 @@ class TTSComparator:
         # 初始化 pyttsx3
         if ENGINES_AVAILABLE['pyttsx3']:
             try:
-                engine = pyttsx3.init()
-                engine.setProperty('rate', 150)
-                engine.setProperty('volume', 0.9)
-                self.engines['pyttsx3'] = engine
+                self.load_engine('pyttsx3')
                 print("✅ pyttsx3 (系統內建)")
                 print("   📋 特徵: 機械感較強，語調平穩")
                 print("   🎯 用途: 一般文字朗讀")
@@ -65,8 +105,7 @@ class TTSComparator:
         # 初始化 Windows SAPI
         if ENGINES_AVAILABLE['win32']:
             try:
-                engine = win32com.client.Dispatch("SAPI.SpVoice")
-                self.engines['win32'] = engine
+                self.load_engine('win32')
                 print("✅ Windows SAPI (系統內建)")
                 print("   📋 特徵: 標準 Windows 語音，發音清晰")
                 print("   🎯 用途: Windows 系統語音")
@@ -77,9 +116,7 @@ class TTSComparator:
         # 初始化 XTTS v2
         if ENGINES_AVAILABLE['xtts']:
             try:
-                pygame.mixer.init()
-                engine = TTS("tts_models/multilingual/multi-dataset/xtts_v2")
-                self.engines['xtts'] = engine
+                self.load_engine('xtts')
                 print("✅ XTTS v2 (AI 語音合成)")
                 print("   📋 特徵: 高品質 AI 語音，自然度高")
                 print("   🎯 用途: 專業語音合成，支援聲音克隆")
@@ -112,27 +149,11 @@ class TTSComparator:
                 
             elif engine_name == 'xtts':
                 print(f"🔊 XTTS v2 朗讀: {text}")
-                # 創建臨時檔案
-                temp_file = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
-                output_path = temp_file.name
-                temp_file.close()
-                
-                # 生成語音
-                engine.tts_to_file(text=text, file_path=output_path, language="zh")
+                # 與 synthesize_pcm 使用相同的說話者與語言
+                pcm, sample_rate = self.synthesize_pcm(text, engine_name)
                 
-                # 播放語音
-                pygame.mixer.music.load(output_path)
-                pygame.mixer.music.play()
-                
-                # 等待播放完成
-                while pygame.mixer.music.get_busy():
-                    pygame.time.wait(100)
-                
-                # 清理臨時檔案
-                try:
-                    os.unlink(output_path)
-                except OSError:
-                    pass
+                # 播放語音（直接送出PCM，不經暫存檔）
+                play_pcm(pcm, sample_rate)
             
             return True
             
@@ -140,6 +161,42 @@ class TTSComparator:
             print(f"❌ {engine_name} 語音合成失敗: {e}")
             return False
     
+    def synthesize_pcm(self, text, engine_name):
+        """合成但不播放，回傳 (float32 PCM, 取樣率)"""
+        import numpy as np
+        
+        engine = self.engines[engine_name]
+        
+        # 其他符合介面的引擎（例如基準測試用的模擬引擎）
+        if hasattr(engine, 'synthesize_pcm'):
+            return engine.synthesize_pcm(text)
+        
+        if engine_name == 'xtts':
+            wav = engine.tts(text=text, language="zh", speaker="Claribel Dervla")
+            return np.asarray(wav, dtype=np.float32), engine.synthesizer.output_sample_rate
+        
+        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
+            output_path = temp_file.name
+        try:
+            if engine_name == 'pyttsx3':
+                engine.save_to_file(text, output_path)
+                engine.runAndWait()
+            elif engine_name == 'win32':
+                # 使用獨立的 SpVoice 輸出到檔案，不影響原引擎的播放設定
+                stream = win32com.client.Dispatch("SAPI.SpFileStream")
+                stream.Open(output_path, 3)
+                file_voice = win32com.client.Dispatch("SAPI.SpVoice")
+                file_voice.Voice = engine.Voice
+                file_voice.AudioOutputStream = stream
+                file_voice.Speak(text)
+                stream.Close()
+            return _read_wav_pcm(output_path)
+        finally:
+            try:
+                os.unlink(output_path)
+            except OSError:
+                pass
+    
     def compare_engines(self, text):
         """比較所有可用引擎的聲音效果"""
         print(f"\n🎯 比較文字: '{text}'")
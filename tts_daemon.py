@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+XTTS v2 常駐合成服務
+在本機啟動一個 HTTP 服務並常駐已載入的 XTTS v2 模型（約1.8GB），
+tts_enhanced.py 的命令行模式會自動改用此服務合成，省去每次執行的模型載入時間。
+
+使用方式:
+  python tts_daemon.py                  # 啟動服務 (預設 127.0.0.1:5123)
+  python tts_daemon.py --port 6000      # 指定埠號
+  python tts_daemon.py --status         # 檢查服務狀態
+  curl http://127.0.0.1:5123/metrics    # Prometheus 格式的分階段耗時與計數
+"""
+
+import argparse
+import os
+import json
+import time
+import threading
+import urllib.request
+import urllib.error
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from tts_metrics import METRICS
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = int(os.environ.get("XTTS_DAEMON_PORT", "5123"))
+
+# 單次請求文字長度上限，避免誤送整份文件
+MAX_REQUEST_BYTES = 64 * 1024
+
+
+class DaemonClient:
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, timeout=600):
+        """初始化常駐服務客戶端"""
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.base_url = f"http://{host}:{port}"
+
+    def health(self, timeout=0.5):
+        """查詢服務狀態，服務未啟動時回傳 None"""
+        try:
+            with urllib.request.urlopen(f"{self.base_url}/health", timeout=timeout) as response:
+                return json.loads(response.read().decode("utf-8"))
+        except (urllib.error.URLError, OSError, ValueError):
+            return None
+
+    def synthesize(self, text, language, speaker=None, speaker_wav=None, use_cache=True):
+        """請求服務合成單句，回傳 float32 PCM"""
+        import numpy as np
+
+        payload = json.dumps({
+            "text": text,
+            "language": language,
+            "speaker": speaker,
+            "speaker_wav": os.path.abspath(speaker_wav) if speaker_wav else None,
+            "use_cache": use_cache
+        }).encode("utf-8")
+
+        request = urllib.request.Request(
+            f"{self.base_url}/synthesize",
+            data=payload,
+            headers={"Content-Type": "application/json"},
+            method="POST"
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return np.frombuffer(response.read(), dtype="<f4").copy()
+        except urllib.error.HTTPError as e:
+            detail = e.read().decode("utf-8", errors="replace")
+            raise Exception(f"常駐服務合成失敗 ({e.code}): {detail}")
+
+
+class SynthesisDaemon:
+    def __init__(self, precision=None):
+        """載入 XTTS v2 模型並常駐"""
+        from tts_enhanced import EnhancedTTSReader
+
+        # 常駐服務提供 /metrics 端點，量測一律啟用（含模型載入）
+        METRICS.enable()
+        self.reader = EnhancedTTSReader()
+        self.reader.use_daemon = False
+        self.reader.precision = precision
+        self.reader.init_engine("xtts")
+        self.lock = threading.Lock()
+        self.requests_served = 0
+
+    def health(self):
+        """服務狀態"""
+        from tts_enhanced import XTTS_MODEL_NAME
+
+        return {
+            "status": "ok",
+            "model": XTTS_MODEL_NAME,
+            "sample_rate": self.reader.sample_rate,
+            "precision": self.reader.precision or "fp32",
+            "requests_served": self.requests_served,
+            "pid": os.getpid()
+        }
+
+    def synthesize(self, payload):
+        """合成單句（模型推理不可並行，以鎖串行化）"""
+        import numpy as np
+
+        text = payload.get("text") or ""
+        if not text.strip():
+            raise ValueError("文字內容為空")
+
+        with self.lock:
+            self.reader.language = payload.get("language") or self.reader.language
+            self.reader.speaker = payload.get("speaker") or self.reader.speaker
+            self.reader.speaker_wav = payload.get("speaker_wav")
+            self.reader.use_cache = payload.get("use_cache", True)
+
+            start_time = time.perf_counter()
+            pcm = self.reader._synthesize_pcm(text)
+            self.reader._record_synthesis_time(text, time.perf_counter() - start_time, pcm)
+            if self.reader.use_cache:
+                self.reader.synthesis_cache.flush_stats()
+            self.requests_served += 1
+
+        return np.asarray(pcm, dtype="<f4").tobytes()
+
+
+class _DaemonRequestHandler(BaseHTTPRequestHandler):
+    """HTTP 請求處理"""
+
+    def _send(self, status, body, content_type="application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status, data):
+        self._send(status, json.dumps(data, ensure_ascii=False).encode("utf-8"))
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, self.server.daemon.health())
+        elif self.path == "/metrics":
+            self._send(200, METRICS.to_prometheus().encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8")
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/synthesize":
+            self._send_json(404, {"error": "not found"})
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        if length <= 0 or length > MAX_REQUEST_BYTES:
+            self._send_json(413, {"error": "request too large"})
+            return
+
+        try:
+            payload = json.loads(self.rfile.read(length).decode("utf-8"))
+            body = self.server.daemon.synthesize(payload)
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        except Exception as e:
+            self._send_json(500, {"error": str(e)})
+            return
+
+        self._send(200, body, "application/octet-stream")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, precision=None):
+    """啟動常駐服務"""
+    print("🤖 XTTS v2 常駐合成服務")
+    print("=" * 50)
+
+    daemon = SynthesisDaemon(precision)
+    server = ThreadingHTTPServer((host, port), _DaemonRequestHandler)
+    server.daemon = daemon
+
+    print(f"✅ 服務已啟動: http://{host}:{port}")
+    print("💡 tts_enhanced.py 命令行模式將自動使用此服務，按 Ctrl+C 停止")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n⏹️  服務已停止")
+    finally:
+        server.server_close()
+    return 0
+
+
+def main():
+    """主函數"""
+    parser = argparse.ArgumentParser(description="XTTS v2 常駐合成服務")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"監聽位址 (預設: {DEFAULT_HOST})")
+    parser.add_argument("--port", "-p", type=int, default=DEFAULT_PORT, help=f"監聽埠號 (預設: {DEFAULT_PORT})")
+    parser.add_argument("--status", action="store_true", help="檢查服務狀態")
+    parser.add_argument("--precision", choices=["fp32", "bf16", "int8"],
+                        help="CPU 推理精度 (int8 動態量化 / bf16)")
+
+    args = parser.parse_args()
+
+    if args.status:
+        health = DaemonClient(args.host, args.port).health()
+        if health:
+            print(f"✅ 服務運行中: {json.dumps(health, ensure_ascii=False)}")
+            return 0
+        print("❌ 服務未啟動")
+        return 1
+
+    try:
+        return serve(args.host, args.port, args.precision)
+    except Exception as e:
+        print(f"❌ 服務啟動失敗: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -6,57 +6,70 @@
 1. 選擇TXT檔念稿
 2. 選擇是否在念稿時錄製mp3
 3. 支援多種語音引擎 (pyttsx3, SAPI, XTTS v2)
+4. XTTS v2 串流朗讀：逐句合成，下一句在背景合成時播放當前句
+5. 逐句合成結果的磁碟緩存，重複句子不必重新推理
+6. 偵測到 tts_daemon.py 常駐服務時改用服務合成，免去每次載入模型
+7. 批次模式：以多個工作行程平行合成整個資料夾的TXT檔
+8. 引擎可用性延遲檢查並緩存，只有選用XTTS v2時才匯入 torch/TTS
+9. 可選的 CPU 推理精度 (int8 動態量化 / bf16) 與 torch 執行緒調整
+10. 模型權重轉換為 safetensors 後以 mmap 載入，多個行程共用實體記憶體
+11. 圖形界面在背景執行緒合成與播放，顯示逐句進度與預估剩餘時間，可暫停/停止
+12. 錄製TXT檔時以稿件專案記錄每句指紋，修改稿件後只重新合成變動的句子
+13. 可選的分階段效能量測（--metrics / --trace），量測數據可輸出為 JSON lines
+14. 錄製時逐句串流寫檔，可依時長或大小切分為多個分段檔，長篇文件記憶體用量固定
+15. 有聲書匯出：依章節平行合成，輸出各章音軌、完整檔案與 JSON/M3U/CUE 章節索引
+16. 錄製時同時輸出每句的起訖時間（JSON/SRT/VTT），圖形界面依播放位置標示目前的句子
+17. 逐句去除前後靜音、統一響度並以交叉淡化拼接（NumPy 向量運算，不需另跑 ffmpeg 濾鏡）
 """
 
 import argparse
 import sys
 import os
-import tempfile
+import collections
+import itertools
+import queue
+import threading
 import subprocess
+import time
 from pathlib import Path
 import json
 from datetime import datetime
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 
+from synthesis_cache import SynthesisCache, make_cache_key
+from speaker_latents import SpeakerLatentStore, get_xtts_core, reference_voice_id
+from tts_daemon import DaemonClient
+from tts_batch import run_batch
+from audiobook import export_audiobook
+from audio_encoder import open_audio_writer
+from audio_sink import create_audio_sink
+from text_segmenter import iter_segments
+from text_source import read_text, iter_text_blocks, detect_encoding
+from script_project import ScriptProject, default_project_dir
+from audio_post import DEFAULT_CROSSFADE_MS, crossfade_concat, polish_segment
+from alignment import SentenceTimeline
+from batch_scheduler import BatchScheduler
+from engine_registry import EngineRegistry
+from xtts_precision import PRECISIONS, apply_precision, precision_context
+from xtts_weights import load_xtts_mmap, get_weights_info
+from tts_metrics import METRICS, instrument_xtts
+
 # 設置XTTS v2環境變量
 os.environ["COQUI_TOS_AGREED"] = "1"
 
-# 嘗試導入可用的 TTS 引擎
-ENGINES = {}
-
-try:
-    import pyttsx3
-    ENGINES['pyttsx3'] = True
-except ImportError:
-    ENGINES['pyttsx3'] = False
-
-try:
-    import win32com.client
-    ENGINES['win32'] = True
-except ImportError:
-    ENGINES['win32'] = False
-
-try:
-    from TTS.api import TTS
-    import torch
-    import pygame
-    ENGINES['xtts'] = True
-except ImportError:
-    ENGINES['xtts'] = False
-
-# MP3錄製相關
-try:
-    import subprocess
-    # 檢查是否有 ffmpeg (用於錄製mp3)
-    result = subprocess.run(['ffmpeg', '-version'], capture_output=True, text=True)
-    FFMPEG_AVAILABLE = True
-except (FileNotFoundError, subprocess.CalledProcessError):
-    FFMPEG_AVAILABLE = False
+# 可用的 TTS 引擎與 ffmpeg (用於錄製mp3)：第一次查詢時才檢查，結果緩存於狀態檔
+ENGINES = EngineRegistry()
 
 # XTTS v2 模型緩存（全局變量，避免重複載入）
 _XTTS_MODEL_CACHE = None
 
+# XTTS v2 預設參數
+XTTS_MODEL_NAME = "tts_models/multilingual/multi-dataset/xtts_v2"
+XTTS_DEFAULT_SPEAKER = "Claribel Dervla"
+XTTS_DEFAULT_LANGUAGE = "zh"
+XTTS_SAMPLE_RATE = 24000
+
 class EnhancedTTSReader:
     def __init__(self):
         """初始化增強版TTS讀稿機"""
@@ -64,8 +77,44 @@ class EnhancedTTSReader:
         self.engine_type = None
         self.xtts_model = None
         self.recording = False
+        self.streaming = False
+        self.speaker = XTTS_DEFAULT_SPEAKER
+        self.speaker_wav = None
+        self.speaker_store = None
+        self.use_daemon = True
+        self.daemon_client = None
+        self.audio_sink_kind = None
+        self.batch_size = 1
+        self.batch_wait = 0.05
+        self._batch_scheduler = None
+        self.precision = None
+        self.torch_threads = None
+        self.mmap_weights = True
+        self.language = XTTS_DEFAULT_LANGUAGE
+        self.sample_rate = XTTS_SAMPLE_RATE
         self.output_folder = "tts_outputs"
         self._ensure_output_folder()
+        self.synthesis_cache = SynthesisCache(os.path.join(self.output_folder, "cache"))
+        self.use_cache = True
+        # 朗讀控制與進度（progress_callback 於合成執行緒呼叫，參數為進度字典）
+        self.progress_callback = None
+        self.synthesis_seconds = 0.0
+        self.synthesized_audio_seconds = 0.0
+        self._stop_event = threading.Event()
+        self._resume_event = threading.Event()
+        self._resume_event.set()
+        self._active_sink = None
+        # 稿件專案資料夾（錄製時沿用未變動句子的音頻片段），None 表示不使用
+        self.project_dir = None
+        self.record_playback = True
+        # 錄製分段上限（秒 / 位元組），None 表示輸出單一檔案
+        self.part_seconds = None
+        self.part_bytes = None
+        # 目前朗讀/錄製的句子時間軸；錄製時另存為 .align.json/.srt/.vtt
+        self.timeline = None
+        self.write_alignment = True
+        # 串流朗讀與錄製時逐句去除前後靜音並統一響度
+        self.post_process = True
         
     def _ensure_output_folder(self):
         """確保輸出資料夾存在"""
@@ -75,6 +124,10 @@ class EnhancedTTSReader:
     
     def init_engine(self, engine_type="auto"):
         """初始化指定的TTS引擎"""
+        if engine_type in ("auto", "xtts") and self.use_daemon and self._connect_daemon():
+            print(f"✅ TTS引擎初始化完成: {self.get_engine_info()}")
+            return
+        
         if engine_type == "auto":
             # 自動選擇最佳引擎：XTTS v2 > pyttsx3 > SAPI
             if ENGINES['xtts']:
@@ -86,20 +139,26 @@ class EnhancedTTSReader:
             else:
                 raise Exception("沒有可用的TTS引擎")
         
-        if engine_type == "xtts" and ENGINES['xtts']:
-            self._init_xtts()
-        elif engine_type == "pyttsx3" and ENGINES['pyttsx3']:
-            self._init_pyttsx3()
-        elif engine_type == "win32" and ENGINES['win32']:
-            self._init_win32()
-        else:
-            raise Exception(f"引擎 {engine_type} 不可用")
+        try:
+            if engine_type == "xtts" and ENGINES['xtts']:
+                self._init_xtts()
+            elif engine_type == "pyttsx3" and ENGINES['pyttsx3']:
+                self._init_pyttsx3()
+            elif engine_type == "win32" and ENGINES['win32']:
+                self._init_win32()
+            else:
+                raise Exception(f"引擎 {engine_type} 不可用")
+        except ImportError:
+            # 緩存的檢查結果已過時（例如套件已移除），下次重新檢查
+            ENGINES.invalidate()
+            raise
         
         print(f"✅ TTS引擎初始化完成: {self.get_engine_info()}")
     
     def _init_pyttsx3(self):
         """初始化pyttsx3引擎"""
         print("🔧 正在初始化 pyttsx3 引擎...")
+        import pyttsx3
         self.engine = pyttsx3.init()
         self.engine_type = 'pyttsx3'
         
@@ -117,6 +176,7 @@ class EnhancedTTSReader:
     def _init_win32(self):
         """初始化Windows SAPI引擎"""
         print("🔧 正在初始化 Windows SAPI 引擎...")
+        import win32com.client
         self.engine = win32com.client.Dispatch("SAPI.SpVoice")
         self.engine_type = 'win32'
     
@@ -130,6 +190,8 @@ class EnhancedTTSReader:
         if _XTTS_MODEL_CACHE is not None:
             print("   ⚡ 使用已載入的模型緩存，瞬間完成！")
             self.xtts_model = _XTTS_MODEL_CACHE
+            self.sample_rate = self._get_xtts_sample_rate()
+            self._init_speaker_store()
             self.engine_type = 'xtts'
             return
         
@@ -148,12 +210,20 @@ class EnhancedTTSReader:
             print("   📥 首次使用，正在下載模型（約1.8GB），請稍候...")
             print("   💡 模型將緩存到本地，之後使用會更快！")
         
-        # 初始化pygame用於播放
-        import pygame
-        pygame.mixer.init()
+        # 只有選用XTTS v2時才匯入 torch/TTS
+        from TTS.api import TTS
         
-        # 創建XTTS模型（會自動使用緩存）
-        self.xtts_model = TTS("tts_models/multilingual/multi-dataset/xtts_v2").to("cpu")
+        # 已下載的模型以 mmap 權重載入，失敗時退回一般載入（會自動使用緩存）
+        with METRICS.stage("model_load"):
+            self.xtts_model = None
+            if self.mmap_weights and model_path.exists():
+                self.xtts_model = load_xtts_mmap(model_path)
+            if self.xtts_model is None:
+                self.xtts_model = TTS(XTTS_MODEL_NAME).to("cpu")
+            if self.precision:
+                print(f"   🔧 推理精度: {apply_precision(self.xtts_model, self.precision, self.torch_threads)}")
+        self.sample_rate = self._get_xtts_sample_rate()
+        self._init_speaker_store()
         
         # 將模型保存到全局緩存
         _XTTS_MODEL_CACHE = self.xtts_model
@@ -161,28 +231,86 @@ class EnhancedTTSReader:
         self.engine_type = 'xtts'
         print("   ✅ XTTS v2 引擎載入完成！模型已緩存，下次使用更快！")
     
+    def _connect_daemon(self):
+        """連接 XTTS v2 常駐服務，服務未啟動時回傳 False"""
+        client = DaemonClient()
+        health = client.health()
+        if not health or health.get("status") != "ok":
+            return False
+        
+        print(f"🔌 發現 XTTS v2 常駐服務 ({client.base_url})，略過模型載入")
+        # 合成以服務的推理精度進行，緩存鍵也必須使用服務的精度
+        daemon_precision = health.get("precision") or "fp32"
+        if (self.precision or "fp32") != daemon_precision:
+            print(f"   ⚠️  常駐服務使用 {daemon_precision} 精度，忽略 --precision {self.precision}")
+        self.precision = daemon_precision
+        self.daemon_client = client
+        self.sample_rate = int(health.get("sample_rate", XTTS_SAMPLE_RATE))
+        self.engine_type = 'xtts'
+        return True
+    
+    def _init_speaker_store(self):
+        """建立說話者條件向量緩存（模型不支援時退回 TTS API）"""
+        xtts_core = get_xtts_core(self.xtts_model)
+        if xtts_core is None:
+            self.speaker_store = None
+            return
+        # 分別量測 GPT 生成與聲碼器（未啟用量測時只多一次判斷）
+        instrument_xtts(xtts_core)
+        self.speaker_store = SpeakerLatentStore(
+            xtts_core, os.path.join(self.output_folder, "speakers")
+        )
+    
+    def _get_xtts_sample_rate(self):
+        """取得XTTS模型輸出取樣率"""
+        try:
+            return int(self.xtts_model.synthesizer.output_sample_rate)
+        except AttributeError:
+            return XTTS_SAMPLE_RATE
+    
     def read_txt_file(self, file_path):
         """讀取TXT文件內容"""
         try:
-            # 嘗試不同編碼
-            encodings = ['utf-8', 'utf-8-sig', 'gb2312', 'gbk', 'big5']
-            
-            for encoding in encodings:
-                try:
-                    with open(file_path, 'r', encoding=encoding) as f:
-                        content = f.read().strip()
-                        print(f"✅ 成功讀取文件 ({encoding}): {len(content)} 字符")
-                        return content
-                except UnicodeDecodeError:
-                    continue
-            
-            raise Exception("無法讀取文件，嘗試所有編碼都失敗")
+            # 由BOM與檔案開頭樣本判斷編碼，只解碼一次
+            with METRICS.stage("text_decode"):
+                content, encoding = read_text(file_path)
+            content = content.strip()
+            print(f"✅ 成功讀取文件 ({encoding}): {len(content)} 字符")
+            return content
             
         except Exception as e:
             print(f"❌ 讀取文件失敗: {e}")
             return None
     
-    def speak_text(self, text, record_mp3=False, output_filename=None):
+    def iter_txt_file(self, file_path):
+        """逐塊讀取TXT文件（可直接傳給 split_sentences / synthesize_to_file，大檔案不必整份載入）"""
+        return iter_text_blocks(file_path)
+    
+    def record_file(self, file_path, output_filename=None):
+        """逐塊讀取TXT文件並錄製（XTTS v2），記憶體用量與文件大小無關"""
+        try:
+            with METRICS.stage("text_decode"):
+                encoding = detect_encoding(file_path)[0]
+                blocks = iter_text_blocks(file_path, encoding)
+                # 只確認開頭有內容，其餘邊讀邊合成
+                first = next((block for block in blocks if block.strip()), None)
+        except Exception as e:
+            print(f"❌ 讀取文件失敗: {e}")
+            return False
+        if first is None:
+            print("❌ 文字內容為空")
+            return False
+        
+        print(f"✅ 逐塊讀取文件 ({encoding}): {file_path}")
+        self._stop_event.clear()
+        self._resume_event.set()
+        return self._speak_and_record(itertools.chain([first], blocks), output_filename)
+    
+    def split_sentences(self, text):
+        """將文字正規化並切分為長度受限的句子（惰性產生，text 可為逐塊文字）"""
+        return iter_segments(text, language=self.language)
+    
+    def speak_text(self, text, record_mp3=False, output_filename=None, stream=None):
         """朗讀文字，可選擇錄製為MP3"""
         try:
             if not text or not text.strip():
@@ -191,8 +319,16 @@ class EnhancedTTSReader:
                 
             print(f"🔊 正在朗讀: {text[:50]}{'...' if len(text) > 50 else ''}")
             
+            self._stop_event.clear()
+            self._resume_event.set()
+            
+            if stream is None:
+                stream = self.streaming
+            
             if record_mp3:
                 return self._speak_and_record(text, output_filename)
+            elif stream and self.engine_type == 'xtts':
+                return self._speak_streaming(text)
             else:
                 return self._speak_only(text)
                 
@@ -200,6 +336,103 @@ class EnhancedTTSReader:
             print(f"❌ 語音合成失敗: {e}")
             return False
     
+    def stop(self):
+        """停止朗讀（可從其他執行緒呼叫）"""
+        self._stop_event.set()
+        self._resume_event.set()
+        
+        sink = self._active_sink
+        if sink is not None:
+            sink.stop()
+        
+        try:
+            if self.engine_type == 'pyttsx3':
+                self.engine.stop()
+            elif self.engine_type == 'win32':
+                # SVSFPurgeBeforeSpeak：清除正在朗讀的內容
+                self.engine.Speak("", 2)
+        except Exception as e:
+            print(f"⚠️  停止朗讀失敗: {e}")
+    
+    def pause(self):
+        """暫停朗讀（XTTS v2）"""
+        self._resume_event.clear()
+        sink = self._active_sink
+        if sink is not None:
+            sink.pause()
+    
+    def resume(self):
+        """繼續朗讀"""
+        self._resume_event.set()
+        sink = self._active_sink
+        if sink is not None:
+            sink.resume()
+    
+    @property
+    def is_paused(self):
+        return not self._resume_event.is_set()
+    
+    @property
+    def stop_requested(self):
+        return self._stop_event.is_set()
+    
+    @property
+    def measured_rtf(self):
+        """實測即時率（合成耗時 / 音頻長度），尚無資料時回傳 None"""
+        if self.synthesized_audio_seconds <= 0:
+            return None
+        return self.synthesis_seconds / self.synthesized_audio_seconds
+    
+    def _record_synthesis_time(self, sentence, seconds, pcm):
+        self.synthesis_seconds += seconds
+        self.synthesized_audio_seconds += len(pcm) / self.sample_rate
+        METRICS.count("sentences")
+        METRICS.count("chars_in", len(sentence))
+        METRICS.count("audio_seconds_out", len(pcm) / self.sample_rate)
+    
+    def _iter_with_progress(self, sentences, synthesized=None, polish=False):
+        """逐句產出PCM，處理暫停/停止並回報進度（句數、預估剩餘時間）
+        
+        synthesized 為產出 (句子, PCM) 的疊代器，未指定時逐句合成 sentences；
+        polish 為 True 時先去除句子前後靜音並統一響度，時間軸以處理後的長度計算。
+        """
+        if self.progress_callback is not None:
+            # 進度需要總句數；未回報進度時保持惰性，逐塊讀入的大檔案不會整份展開
+            sentences = list(sentences)
+            chars_total = sum(len(sentence) for sentence in sentences)
+        chars_done = 0
+        audio_done = 0.0
+        
+        if synthesized is None:
+            synthesized = self._iter_synthesized(sentences)
+        
+        for index, (sentence, pcm) in enumerate(synthesized, 1):
+            self._resume_event.wait()
+            if self._stop_event.is_set():
+                print("⏹️  朗讀已停止")
+                return
+            
+            if polish:
+                with METRICS.stage("post_process"):
+                    pcm = polish_segment(pcm, self.sample_rate)
+            
+            chars_done += len(sentence)
+            audio_done += len(pcm) / self.sample_rate
+            if self.timeline is not None:
+                self.timeline.add(sentence, len(pcm))
+            if self.progress_callback is not None:
+                # 播放與合成重疊進行，剩餘時間取決於較慢的一方
+                rtf = self.measured_rtf
+                remaining_audio = (chars_total - chars_done) * audio_done / max(chars_done, 1)
+                self.progress_callback({
+                    "index": index,
+                    "total": len(sentences),
+                    "sentence": sentence,
+                    "rtf": rtf,
+                    "eta_seconds": remaining_audio * max(1.0, rtf or 1.0)
+                })
+            yield sentence, pcm
+    
     def _speak_only(self, text):
         """只朗讀，不錄製"""
         try:
@@ -211,36 +444,236 @@ class EnhancedTTSReader:
                 self.engine.Speak(text)
                 
             elif self.engine_type == 'xtts':
-                # 使用XTTS v2朗讀
-                with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-                    output_path = temp_file.name
-                
-                self.xtts_model.tts_to_file(
+                # 使用XTTS v2朗讀：逐句合成（已緩存的句子直接從磁碟讀取）後直接播放PCM
+                self._play_pcm_chunks([self._synthesize_text(text)])
+            
+            print("✅ 朗讀完成")
+            return True
+            
+        except Exception as e:
+            print(f"❌ 朗讀失敗: {e}")
+            return False
+    
+    def _cache_key(self, text):
+        """取得句子的合成緩存鍵，未啟用緩存時回傳 None"""
+        if not self.use_cache:
+            return None
+        return self._sentence_fingerprint(text)
+    
+    def _sentence_fingerprint(self, text):
+        """句子指紋：正規化文字、聲音、語言、模型與推理精度的雜湊"""
+        # 克隆聲音一律以參考音檔內容識別（常駐服務與 TTS API 路徑沒有 speaker_store）
+        voice_id = reference_voice_id(self.speaker_wav) if self.speaker_wav else self.speaker
+        model_name = XTTS_MODEL_NAME
+        if self.precision and self.precision != "fp32":
+            # 量化後音頻略有不同，與 fp32 的緩存分開
+            model_name = f"{XTTS_MODEL_NAME}@{self.precision}"
+        return make_cache_key(text, voice_id, self.language, model_name)
+    
+    def _synthesize_pcm(self, text):
+        """使用XTTS v2合成單句，回傳float32 PCM陣列（優先讀取磁碟緩存）"""
+        import numpy as np
+        
+        cache_key = self._cache_key(text)
+        if cache_key is not None:
+            pcm = self.synthesis_cache.get(cache_key)
+            METRICS.count("cache_hits" if pcm is not None else "cache_misses")
+            if pcm is not None:
+                return pcm
+        
+        if self.daemon_client is not None:
+            # 常駐服務會寫入同一份緩存，這裡不再重複寫入
+            with METRICS.stage("daemon_request"):
+                return self.daemon_client.synthesize(
+                    text, self.language, speaker=self.speaker,
+                    speaker_wav=self.speaker_wav, use_cache=self.use_cache
+                )
+        elif self.speaker_store is not None:
+            # 直接使用緩存的說話者條件向量推理
+            with METRICS.stage("inference"), precision_context(self.precision):
+                pcm = self.speaker_store.synthesize(
+                    text, self.language, speaker=self.speaker, speaker_wav=self.speaker_wav
+                )
+        else:
+            with METRICS.stage("inference"), precision_context(self.precision):
+                wav = self.xtts_model.tts(
                     text=text,
-                    file_path=output_path,
-                    language="zh",
-                    speaker="Claribel Dervla"  # 使用預設說話者
+                    language=self.language,
+                    speaker=None if self.speaker_wav else self.speaker,
+                    speaker_wav=self.speaker_wav
                 )
-                
-                # 播放音頻
-                import pygame
-                pygame.mixer.music.load(output_path)
-                pygame.mixer.music.play()
-                
-                while pygame.mixer.music.get_busy():
-                    pygame.time.wait(100)
-                
-                # 清理臨時文件
+            pcm = np.asarray(wav, dtype=np.float32)
+        METRICS.count("synthesized_audio_seconds", len(pcm) / self.sample_rate)
+        
+        if cache_key is not None:
+            self.synthesis_cache.put(cache_key, pcm)
+        return pcm
+    
+    def _synthesize_text(self, text):
+        """逐句合成整段文字並串接為單一PCM陣列"""
+        import numpy as np
+        
+        chunks = [pcm for _, pcm in self._iter_synthesized(self.split_sentences(text))]
+        if self.use_cache:
+            self.synthesis_cache.flush_stats()
+        if not chunks:
+            return np.zeros(0, dtype=np.float32)
+        return np.concatenate(chunks)
+    
+    def _get_batch_scheduler(self):
+        """batch_size 大於1且於本行程載入模型時，建立批次推理排程"""
+        if self.batch_size <= 1 or self.speaker_store is None or self.daemon_client is not None:
+            return None
+        if self._batch_scheduler is None:
+            self._batch_scheduler = BatchScheduler(
+                self._synthesize_batch, max_batch_size=self.batch_size, max_wait=self.batch_wait
+            )
+        return self._batch_scheduler
+    
+    def _synthesize_batch(self, texts):
+        """批次合成同一聲音的多句"""
+        with METRICS.stage("inference"), precision_context(self.precision):
+            results = self.speaker_store.synthesize_batch(
+                texts, self.language, speaker=self.speaker, speaker_wav=self.speaker_wav
+            )
+        METRICS.count("synthesized_audio_seconds", sum(len(pcm) for pcm in results) / self.sample_rate)
+        return results
+    
+    def _submit_synthesis(self, text, scheduler):
+        """提交單句到批次排程，緩存命中時直接回傳已完成的 Future"""
+        from concurrent.futures import Future
+        
+        cache_key = self._cache_key(text)
+        if cache_key is not None:
+            pcm = self.synthesis_cache.get(cache_key)
+            METRICS.count("cache_hits" if pcm is not None else "cache_misses")
+            if pcm is not None:
+                future = Future()
+                future.set_result(pcm)
+                return future
+        
+        future = scheduler.submit(text)
+        if cache_key is not None:
+            def store(done):
+                if done.exception() is None:
+                    self.synthesis_cache.put(cache_key, done.result())
+            future.add_done_callback(store)
+        return future
+    
+    def _iter_synthesized(self, sentences, prefetch=2):
+        """在背景執行緒逐句合成，依序產出 (句子, PCM)
+        
+        工作執行緒最多預先合成 prefetch 句，播放第N句時同時合成第N+1句。
+        """
+        results = queue.Queue(maxsize=prefetch)
+        stop_event = threading.Event()
+        done = object()
+        
+        def put(item):
+            while not stop_event.is_set():
                 try:
-                    os.unlink(output_path)
-                except:
-                    pass
+                    results.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        
+        def worker():
+            try:
+                scheduler = self._get_batch_scheduler()
+                if scheduler is None:
+                    for sentence in sentences:
+                        start_time = time.perf_counter()
+                        pcm = self._synthesize_pcm(sentence)
+                        self._record_synthesis_time(sentence, time.perf_counter() - start_time, pcm)
+                        if not put((sentence, pcm)):
+                            return
+                else:
+                    # 保持 batch_size 句在排程中，讓排程器能湊成批次
+                    pending = collections.deque()
+                    start_time = time.perf_counter()
+                    
+                    def take():
+                        # 以等待結果的時間估計批次合成耗時
+                        nonlocal start_time
+                        sentence, future = pending.popleft()
+                        pcm = future.result()
+                        now = time.perf_counter()
+                        self._record_synthesis_time(sentence, now - start_time, pcm)
+                        start_time = now
+                        return put((sentence, pcm))
+                    
+                    for sentence in sentences:
+                        pending.append((sentence, self._submit_synthesis(sentence, scheduler)))
+                        if len(pending) >= self.batch_size and not take():
+                            return
+                    while pending:
+                        if not take():
+                            return
+            except Exception as e:
+                put(e)
+            put(done)
+        
+        thread = threading.Thread(target=worker, name="xtts-synth", daemon=True)
+        thread.start()
+        
+        try:
+            while True:
+                item = results.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop_event.set()
+            thread.join(timeout=1.0)
+    
+    def _play_pcm_chunks(self, chunks):
+        """將PCM片段依序送入音頻輸出端，無需暫存檔且片段間無間隙"""
+        sink = create_audio_sink(self.sample_rate, self.audio_sink_kind)
+        self._active_sink = sink
+        if self.is_paused:
+            sink.pause()
+        try:
+            for pcm in chunks:
+                if self._stop_event.is_set():
+                    break
+                with METRICS.stage("playback"):
+                    sink.write(pcm)
+        except BaseException:
+            sink.stop()
+            raise
+        finally:
+            sink.close()
+            self._active_sink = None
+        
+        if sink.underruns:
+            print(f"⚠️  播放緩衝欠載 {sink.underruns} 次（合成速度低於播放速度）")
+        return sink.get_stats()
+    
+    def _speak_streaming(self, text):
+        """串流朗讀：逐句合成並立即播放"""
+        try:
+            sentences = list(self.split_sentences(text))
+            print(f"🎧 串流模式: 共 {len(sentences)} 句")
+            self.timeline = SentenceTimeline(self.sample_rate)
+            
+            def chunks():
+                for index, (sentence, pcm) in enumerate(
+                        self._iter_with_progress(sentences, polish=self.post_process), 1):
+                    print(f"   ▶️  [{index}/{len(sentences)}] {sentence[:30]}")
+                    yield pcm
+            
+            self._play_pcm_chunks(chunks())
+            if self.use_cache:
+                self.synthesis_cache.flush_stats()
             
             print("✅ 朗讀完成")
             return True
             
         except Exception as e:
-            print(f"❌ 朗讀失敗: {e}")
+            print(f"❌ 串流朗讀失敗: {e}")
             return False
     
     def _speak_and_record(self, text, output_filename=None):
@@ -258,22 +691,19 @@ class EnhancedTTSReader:
             mp3_path = os.path.join(self.output_folder, f"{output_filename}.mp3")
             
             if self.engine_type == 'xtts':
-                # XTTS v2 直接生成WAV文件
-                self.xtts_model.tts_to_file(
-                    text=text,
-                    file_path=wav_path,
-                    language="zh",
-                    speaker="Claribel Dervla"
+                # XTTS v2 逐句合成，邊播放邊直接編碼為MP3（不產生中間WAV）
+                saved_path = self._record_xtts(
+                    text, os.path.join(self.output_folder, output_filename), play=self.record_playback
                 )
+                if isinstance(saved_path, list):
+                    print(f"✅ 音頻文件已保存為 {len(saved_path)} 個分段:")
+                    for path in saved_path:
+                        print(f"   {path}")
+                else:
+                    print(f"✅ 音頻文件已保存: {saved_path}")
+                print("✅ 朗讀和錄製完成")
+                return True
                 
-                # 播放音頻
-                import pygame
-                pygame.mixer.music.load(wav_path)
-                pygame.mixer.music.play()
-                
-                while pygame.mixer.music.get_busy():
-                    pygame.time.wait(100)
-                    
             else:
                 # 對於其他引擎，需要錄製系統音頻
                 print("⚠️  非XTTS引擎的錄製功能需要額外設定")
@@ -286,30 +716,8 @@ class EnhancedTTSReader:
                     self.engine.Speak(text)
             
             # 轉換為MP3（如果有ffmpeg）
-            if FFMPEG_AVAILABLE and os.path.exists(wav_path):
-                print(f"🔄 正在轉換為MP3格式...")
-                try:
-                    result = subprocess.run([
-                        'ffmpeg', '-i', wav_path, '-acodec', 'mp3', 
-                        '-ab', '192k', mp3_path, '-y'
-                    ], capture_output=True, text=True)
-                    
-                    if result.returncode == 0:
-                        print(f"✅ MP3文件已保存: {mp3_path}")
-                        # 刪除臨時WAV文件
-                        try:
-                            os.remove(wav_path)
-                        except:
-                            pass
-                    else:
-                        print(f"⚠️  MP3轉換失敗，保留WAV文件: {wav_path}")
-                        
-                except Exception as e:
-                    print(f"⚠️  MP3轉換出錯: {e}")
-            
-            elif os.path.exists(wav_path):
-                print(f"✅ 音頻文件已保存: {wav_path}")
-                print("💡 提示: 安裝 ffmpeg 可支援MP3格式")
+            if os.path.exists(wav_path):
+                self._convert_to_mp3(wav_path, mp3_path)
             
             print("✅ 朗讀和錄製完成")
             return True
@@ -318,6 +726,123 @@ class EnhancedTTSReader:
             print(f"❌ 錄製失敗: {e}")
             return False
     
+    def _convert_to_mp3(self, wav_path, mp3_path):
+        """將WAV轉換為MP3，回傳最終保存的檔案路徑"""
+        if not ENGINES.ffmpeg_available:
+            print(f"✅ 音頻文件已保存: {wav_path}")
+            print("💡 提示: 安裝 ffmpeg 可支援MP3格式")
+            return wav_path
+        
+        print(f"🔄 正在轉換為MP3格式...")
+        try:
+            with METRICS.stage("ffmpeg_encode"):
+                result = subprocess.run([
+                    'ffmpeg', '-i', wav_path, '-acodec', 'mp3', 
+                    '-ab', '192k', mp3_path, '-y'
+                ], capture_output=True, text=True)
+            
+            if result.returncode == 0:
+                print(f"✅ MP3文件已保存: {mp3_path}")
+                # 刪除臨時WAV文件
+                try:
+                    os.remove(wav_path)
+                except:
+                    pass
+                return mp3_path
+            else:
+                print(f"⚠️  MP3轉換失敗，保留WAV文件: {wav_path}")
+                
+        except Exception as e:
+            print(f"⚠️  MP3轉換出錯: {e}")
+        return wav_path
+    
+    def _iter_project(self, sentences):
+        """依稿件專案逐句產出 (句子, PCM)：已保存的片段直接讀取，只合成變動的句子"""
+        project = ScriptProject(self.project_dir, self.sample_rate)
+        fingerprints = [self._sentence_fingerprint(sentence) for sentence in sentences]
+        
+        # 重複的句子只合成一次，依第一次出現的順序在背景合成
+        missing = {}
+        for sentence, fingerprint in zip(sentences, fingerprints):
+            if fingerprint not in missing and not project.has_segment(fingerprint):
+                missing[fingerprint] = sentence
+        print(f"♻️  稿件專案: 共 {len(sentences)} 句，沿用 {len(sentences) - len(missing)} 句，"
+              f"重新合成 {len(missing)} 句")
+        
+        synthesized = self._iter_synthesized(list(missing.values()))
+        for sentence, fingerprint in zip(sentences, fingerprints):
+            if project.has_segment(fingerprint):
+                pcm = project.load_segment(fingerprint)
+            else:
+                _, pcm = next(synthesized)
+                project.save_segment(fingerprint, pcm)
+            yield sentence, pcm
+        
+        # 全部完成才更新清單並清除不再使用的片段（中途停止時保留已合成的片段）
+        project.save_manifest(sentences, fingerprints)
+    
+    def _record_xtts(self, text, base_path, play=True, output_format="mp3"):
+        """逐句合成並串流寫入編碼器，回傳實際保存的檔案路徑（分段輸出時為路徑列表）"""
+        writer = open_audio_writer(
+            base_path, self.sample_rate, output_format, ffmpeg_available=ENGINES.ffmpeg_available,
+            max_part_seconds=self.part_seconds, max_part_bytes=self.part_bytes
+        )
+        
+        sentences = self.split_sentences(text)
+        synthesized = None
+        if self.project_dir:
+            sentences = list(sentences)
+            synthesized = self._iter_project(sentences)
+        # 沿用的片段、去除靜音後的片段與相鄰句子以交叉淡化拼接，接縫處不會爆音
+        crossfade = bool(self.project_dir or self.post_process)
+        crossfade_samples = int(self.sample_rate * DEFAULT_CROSSFADE_MS / 1000) if crossfade else 0
+        self.timeline = SentenceTimeline(self.sample_rate, crossfade_samples)
+        
+        def pcm_stream():
+            for _, pcm in self._iter_with_progress(sentences, synthesized, polish=self.post_process):
+                yield pcm
+        
+        stream = pcm_stream()
+        if crossfade:
+            stream = crossfade_concat(stream, self.sample_rate)
+        
+        def chunks():
+            for pcm in stream:
+                with METRICS.stage("encode"):
+                    writer.write(pcm)
+                yield pcm
+        
+        try:
+            if play:
+                self._play_pcm_chunks(chunks())
+            else:
+                for _ in chunks():
+                    pass
+        finally:
+            with METRICS.stage("encode"):
+                saved_path = writer.close()
+            if self.use_cache:
+                self.synthesis_cache.flush_stats()
+        
+        if self.write_alignment and len(self.timeline):
+            # 分段輸出時時間以整份錄音計算
+            self.timeline.save(base_path)
+            print(f"🕒 句子時間軸: {base_path}.align.json / .srt / .vtt")
+        return saved_path
+    
+    def synthesize_to_file(self, text, output_path):
+        """只合成不播放（XTTS v2），output_path 副檔名為 .mp3 時直接編碼為MP3
+        
+        回傳實際保存的檔案路徑（沒有MP3編碼器時為WAV，設定分段上限時為路徑列表）。
+        """
+        if self.engine_type != 'xtts':
+            raise Exception("只有 XTTS v2 引擎支援離線合成")
+        
+        self._stop_event.clear()
+        base_path, extension = os.path.splitext(output_path)
+        output_format = "mp3" if extension.lower() == ".mp3" else "wav"
+        return self._record_xtts(text, base_path, play=False, output_format=output_format)
+    
     def get_engine_info(self):
         """獲取當前引擎資訊"""
         global _XTTS_MODEL_CACHE
@@ -326,6 +851,8 @@ class EnhancedTTSReader:
             return "pyttsx3 - 跨平台文字轉語音引擎"
         elif self.engine_type == 'win32':
             return "Windows SAPI - 系統內建語音合成"
+        elif self.engine_type == 'xtts' and self.daemon_client is not None:
+            return f"XTTS v2 - 高品質AI語音合成（常駐服務 {self.daemon_client.base_url}）"
         elif self.engine_type == 'xtts':
             cache_status = "（已緩存）" if _XTTS_MODEL_CACHE is not None else "（首次載入）"
             return f"XTTS v2 - 高品質AI語音合成 {cache_status}"
@@ -351,7 +878,9 @@ class EnhancedTTSReader:
         if model_path.exists():
             info['disk_cached'] = True
             info['cache_path'] = str(model_path)
+            info['mmap_weights'] = get_weights_info(model_path)
         
+        info['synthesis_cache'] = self.synthesis_cache.get_stats()
         return info
 
 class TTSGui:
@@ -361,11 +890,24 @@ class TTSGui:
         self.root.title("增強版讀稿機 - TXT檔念稿與MP3錄製")
         self.root.geometry("800x600")
         
+        # 在背景檢查可用引擎，不阻塞視窗開啟
+        ENGINES.start_background_probe()
+        
         self.reader = EnhancedTTSReader()
+        self.reader.progress_callback = lambda progress: self._events.put(("progress", progress))
         self.current_file_path = None
         self.current_text = ""
+        # 目前標示的句子（時間軸序號）與下一次在預覽中搜尋句子的起點
+        self._highlight_index = None
+        self._highlight_cursor = "1.0"
+        
+        # 模型載入與朗讀在背景執行緒進行，結果經佇列交回Tk主執行緒
+        self._events = queue.Queue()
+        self._worker = None
         
         self.setup_gui()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.after(100, self._poll_events)
         
     def setup_gui(self):
         """設置圖形界面"""
@@ -419,6 +961,7 @@ class TTSGui:
         
         self.text_display.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        self.text_display.tag_configure("current_sentence", background="#fff3b0")
         
         # 控制按鈕
         control_frame = ttk.Frame(main_frame)
@@ -426,12 +969,26 @@ class TTSGui:
         
         ttk.Button(control_frame, text="初始化引擎", command=self.init_engine).grid(row=0, column=0, padx=5)
         ttk.Button(control_frame, text="開始朗讀", command=self.start_reading).grid(row=0, column=1, padx=5)
-        ttk.Button(control_frame, text="測試引擎", command=self.test_engine).grid(row=0, column=2, padx=5)
-        ttk.Button(control_frame, text="緩存狀態", command=self.show_cache_status).grid(row=0, column=3, padx=5)
+        self.pause_button = ttk.Button(control_frame, text="暫停", command=self.toggle_pause, state=tk.DISABLED)
+        self.pause_button.grid(row=0, column=2, padx=5)
+        self.stop_button = ttk.Button(control_frame, text="停止", command=self.stop_reading, state=tk.DISABLED)
+        self.stop_button.grid(row=0, column=3, padx=5)
+        ttk.Button(control_frame, text="測試引擎", command=self.test_engine).grid(row=0, column=4, padx=5)
+        ttk.Button(control_frame, text="緩存狀態", command=self.show_cache_status).grid(row=0, column=5, padx=5)
+        
+        # 朗讀進度
+        progress_frame = ttk.Frame(main_frame)
+        progress_frame.grid(row=5, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 5))
+        
+        self.progress_bar = ttk.Progressbar(progress_frame, mode="determinate")
+        self.progress_bar.grid(row=0, column=0, sticky=(tk.W, tk.E))
+        self.progress_label = ttk.Label(progress_frame, text="")
+        self.progress_label.grid(row=0, column=1, padx=(10, 0))
+        progress_frame.columnconfigure(0, weight=1)
         
         # 狀態欄
         self.status_label = ttk.Label(main_frame, text="就緒 - 請選擇TXT檔案", foreground="blue")
-        self.status_label.grid(row=5, column=0, columnspan=2, sticky=(tk.W, tk.E))
+        self.status_label.grid(row=6, column=0, columnspan=2, sticky=(tk.W, tk.E))
         
         # 配置權重
         self.root.columnconfigure(0, weight=1)
@@ -471,18 +1028,100 @@ class TTSGui:
             else:
                 self.status_label.config(text="檔案讀取失敗", foreground="red")
     
+    def _run_in_background(self, task, busy_text, error_title, playback=True):
+        """在背景執行緒執行耗時工作，界面保持可操作"""
+        if self._worker is not None and self._worker.is_alive():
+            messagebox.showwarning("警告", "請等待目前的工作完成，或按停止")
+            return
+        
+        self.status_label.config(text=busy_text, foreground="orange")
+        if playback:
+            self.pause_button.config(state=tk.NORMAL, text="暫停")
+            self.stop_button.config(state=tk.NORMAL)
+        
+        def run():
+            try:
+                task()
+            except Exception as e:
+                self._events.put(("error", error_title, str(e)))
+            finally:
+                self._events.put(("idle",))
+        
+        self._worker = threading.Thread(target=run, name="tts-gui-worker", daemon=True)
+        self._worker.start()
+    
+    def _post_status(self, text, color):
+        """從背景執行緒更新狀態欄"""
+        self._events.put(("status", text, color))
+    
+    def _poll_events(self):
+        """主執行緒定期處理背景執行緒送來的事件"""
+        try:
+            while True:
+                event = self._events.get_nowait()
+                if event[0] == "status":
+                    self.status_label.config(text=event[1], foreground=event[2])
+                elif event[0] == "progress":
+                    self._show_progress(event[1])
+                elif event[0] == "error":
+                    self.status_label.config(text=f"{event[1]}: {event[2]}", foreground="red")
+                    messagebox.showerror("錯誤", f"{event[1]}:\n{event[2]}")
+                elif event[0] == "idle":
+                    self.pause_button.config(state=tk.DISABLED, text="暫停")
+                    self.stop_button.config(state=tk.DISABLED)
+                    self._clear_highlight()
+        except queue.Empty:
+            pass
+        self._update_highlight()
+        self.root.after(100, self._poll_events)
+    
+    def _show_progress(self, progress):
+        """顯示逐句進度、預估剩餘時間與實測即時率"""
+        self.progress_bar.config(maximum=progress["total"], value=progress["index"])
+        eta = int(progress["eta_seconds"])
+        text = f"第 {progress['index']}/{progress['total']} 句，預估剩餘 {eta // 60}:{eta % 60:02d}"
+        if progress["rtf"] is not None:
+            text += f" (RTF {progress['rtf']:.2f})"
+        self.progress_label.config(text=text)
+    
+    def _update_highlight(self):
+        """依音頻輸出端的播放位置標示目前的句子（查詢時間軸，不分析音頻）"""
+        sink = self.reader._active_sink
+        timeline = self.reader.timeline
+        if sink is None or timeline is None:
+            return
+        
+        index = timeline.at(sink.samples_played)
+        if index is None or index == self._highlight_index:
+            return
+        self._highlight_index = index
+        
+        # 朗讀的句子經過正規化（全形轉半形、日期展開等），以句首數字元在預覽中向後搜尋
+        sentence = timeline.segments[index]["text"]
+        for length in (8, 4, 2):
+            position = self.text_display.search(sentence[:length], self._highlight_cursor, stopindex=tk.END)
+            if position:
+                end = f"{position}+{len(sentence)}c"
+                self.text_display.tag_remove("current_sentence", "1.0", tk.END)
+                self.text_display.tag_add("current_sentence", position, end)
+                self.text_display.see(position)
+                self._highlight_cursor = self.text_display.index(end)
+                return
+    
+    def _clear_highlight(self):
+        self.text_display.tag_remove("current_sentence", "1.0", tk.END)
+        self._highlight_index = None
+        self._highlight_cursor = "1.0"
+    
     def init_engine(self):
         """初始化語音引擎"""
-        try:
-            self.status_label.config(text="正在初始化引擎...", foreground="orange")
-            self.root.update()
-            
-            self.reader.init_engine(self.engine_var.get())
-            self.status_label.config(text=f"引擎初始化完成: {self.reader.get_engine_info()}", foreground="green")
-            
-        except Exception as e:
-            self.status_label.config(text=f"引擎初始化失敗: {str(e)}", foreground="red")
-            messagebox.showerror("錯誤", f"引擎初始化失敗:\n{str(e)}")
+        engine_type = self.engine_var.get()
+        
+        def task():
+            self.reader.init_engine(engine_type)
+            self._post_status(f"引擎初始化完成: {self.reader.get_engine_info()}", "green")
+        
+        self._run_in_background(task, "正在初始化引擎...", "引擎初始化失敗", playback=False)
     
     def start_reading(self):
         """開始朗讀"""
@@ -494,32 +1133,54 @@ class TTSGui:
             messagebox.showwarning("警告", "請先初始化語音引擎")
             return
         
-        try:
-            self.status_label.config(text="正在朗讀...", foreground="blue")
-            self.root.update()
-            
-            # 獲取錄製設定
-            record_mp3 = self.record_var.get()
-            output_filename = self.filename_entry.get() if record_mp3 else None
-            
-            # 開始朗讀
+        # 獲取錄製設定
+        text = self.current_text
+        record_mp3 = self.record_var.get()
+        output_filename = self.filename_entry.get() if record_mp3 else None
+        self.progress_bar.config(value=0)
+        self.progress_label.config(text="")
+        self.reader.timeline = None
+        self._clear_highlight()
+        
+        def task():
+            # XTTS v2 以串流方式朗讀：播放當前句時背景預先合成後續句子
             success = self.reader.speak_text(
-                self.current_text,
+                text,
                 record_mp3=record_mp3,
-                output_filename=output_filename
+                output_filename=output_filename,
+                stream=True
             )
             
-            if success:
-                if record_mp3:
-                    self.status_label.config(text="朗讀和錄製完成", foreground="green")
-                else:
-                    self.status_label.config(text="朗讀完成", foreground="green")
+            if self.reader.stop_requested:
+                self._post_status("朗讀已停止", "orange")
+            elif success:
+                self._post_status("朗讀和錄製完成" if record_mp3 else "朗讀完成", "green")
             else:
-                self.status_label.config(text="朗讀失敗", foreground="red")
-                
-        except Exception as e:
-            self.status_label.config(text=f"朗讀出錯: {str(e)}", foreground="red")
-            messagebox.showerror("錯誤", f"朗讀過程出錯:\n{str(e)}")
+                self._post_status("朗讀失敗", "red")
+        
+        self._run_in_background(task, "正在朗讀...", "朗讀過程出錯")
+    
+    def toggle_pause(self):
+        """暫停/繼續朗讀"""
+        if self.reader.is_paused:
+            self.reader.resume()
+            self.pause_button.config(text="暫停")
+            self.status_label.config(text="正在朗讀...", foreground="orange")
+        else:
+            self.reader.pause()
+            self.pause_button.config(text="繼續")
+            self.status_label.config(text="已暫停", foreground="blue")
+    
+    def stop_reading(self):
+        """停止朗讀"""
+        self.reader.stop()
+        self.pause_button.config(text="暫停")
+        self.status_label.config(text="正在停止...", foreground="orange")
+    
+    def on_close(self):
+        """關閉視窗時先停止朗讀"""
+        self.reader.stop()
+        self.root.destroy()
     
     def test_engine(self):
         """測試當前引擎"""
@@ -529,19 +1190,15 @@ class TTSGui:
         
         test_text = "你好，這是語音引擎測試。Hello, this is a voice engine test."
         
-        try:
-            self.status_label.config(text="正在測試引擎...", foreground="blue")
-            self.root.update()
-            
+        def task():
             success = self.reader.speak_text(test_text)
             
             if success:
-                self.status_label.config(text="引擎測試成功", foreground="green")
+                self._post_status("引擎測試成功", "green")
             else:
-                self.status_label.config(text="引擎測試失敗", foreground="red")
-                
-        except Exception as e:
-            self.status_label.config(text=f"測試出錯: {str(e)}", foreground="red")
+                self._post_status("引擎測試失敗", "red")
+        
+        self._run_in_background(task, "正在測試引擎...", "測試出錯")
     
     def show_cache_status(self):
         """顯示模型緩存狀態"""
@@ -557,9 +1214,18 @@ class TTSGui:
         if cache_info['disk_cached']:
             status_text += "🟢 磁盤緩存: 已下載（無需重新下載）\n"
             status_text += f"📁 緩存路徑: {cache_info['cache_path']}\n"
+            if cache_info['mmap_weights']['converted']:
+                status_text += "🟢 mmap 權重: 已轉換（載入更快，多行程共用記憶體）\n"
+            else:
+                status_text += "🔴 mmap 權重: 未轉換（首次載入時自動轉換）\n"
         else:
             status_text += "🔴 磁盤緩存: 未下載（首次使用需下載約1.8GB）\n"
         
+        synth_stats = cache_info['synthesis_cache']
+        status_text += (f"🗂️ 語句緩存: {synth_stats['entries']} 句, "
+                        f"{synth_stats['size_bytes'] / (1024 * 1024):.1f} MB, "
+                        f"命中 {synth_stats['hits']} / 未命中 {synth_stats['misses']}\n")
+        
         status_text += "\n💡 提示:\n"
         status_text += "• 首次使用會下載模型到磁盤緩存\n"
         status_text += "• 之後每次程式啟動只需載入到記憶體\n"
@@ -582,6 +1248,15 @@ def main():
   python tts_enhanced.py --gui              # 啟動圖形界面
   python tts_enhanced.py --file input.txt  # 命令行模式讀取檔案
   python tts_enhanced.py --text "文字"      # 命令行模式讀取文字
+  python tts_enhanced.py --file input.txt --engine xtts --stream  # 串流朗讀
+  python tts_daemon.py                      # 啟動常駐服務，之後命令行呼叫免載入模型
+  python tts_enhanced.py --batch scripts/ --workers 4  # 批次合成資料夾內所有TXT檔
+  python tts_enhanced.py --file input.txt --no-daemon --precision int8  # CPU int8 量化推理
+  python xtts_precision.py --precision int8  # fp32 與 int8 的 RTF/音質 A/B 檢查
+  python tts_enhanced.py --file input.txt --record --no-play  # 修改稿件後只重新合成變動的句子
+  python tts_enhanced.py --file input.txt --no-daemon --metrics --trace trace.jsonl  # 分階段效能量測
+  python tts_enhanced.py --file book.txt --record --no-play --part-minutes 30  # 每30分鐘一個分段檔
+  python tts_enhanced.py --file book.txt --audiobook --workers 4  # 依章節平行匯出有聲書
   
 新功能:
   1. 圖形界面選擇TXT檔案念稿
@@ -598,17 +1273,50 @@ def main():
                        default="auto", help="指定語音引擎")
     parser.add_argument("--record", "-r", action="store_true", help="錄製為MP3")
     parser.add_argument("--output", "-o", help="輸出檔名 (不含副檔名)")
+    parser.add_argument("--stream", "-s", action="store_true", help="XTTS v2 串流朗讀（逐句合成並播放）")
+    parser.add_argument("--no-cache", action="store_true", help="不使用語句合成緩存")
+    parser.add_argument("--speaker", default=XTTS_DEFAULT_SPEAKER, help="XTTS v2 內建說話者名稱")
+    parser.add_argument("--speaker-wav", help="XTTS v2 克隆聲音的參考音檔 (WAV)")
+    parser.add_argument("--no-daemon", action="store_true", help="不使用常駐服務，於本行程載入模型")
+    parser.add_argument("--audio-sink", choices=["auto", "sounddevice", "pygame", "null"],
+                       help="音頻輸出端 (null 適用於無音效裝置的伺服器)")
+    parser.add_argument("--batch", "-b", metavar="DIR", help="批次合成資料夾內所有TXT檔 (XTTS v2)")
+    parser.add_argument("--audiobook", action="store_true",
+                       help="將 --file 依章節匯出為有聲書（各章音軌 + 完整檔案 + 章節索引）")
+    parser.add_argument("--batch-size", type=int, default=1,
+                       help="XTTS v2 每批推理的句數 (預設1，即逐句推理)")
+    parser.add_argument("--batch-wait", type=float, default=50,
+                       help="湊批次的最長等待時間，毫秒 (預設50)")
+    parser.add_argument("--workers", type=int, help="批次模式/有聲書匯出的工作行程數 (預設依CPU核心數)")
+    parser.add_argument("--torch-threads", type=int, help="批次模式/有聲書匯出每個工作行程的 torch 執行緒數")
+    parser.add_argument("--precision", choices=PRECISIONS,
+                       help="XTTS v2 CPU 推理精度 (int8 動態量化 / bf16)，同時依核心數調整執行緒")
+    parser.add_argument("--no-play", action="store_true", help="錄製時不播放，只輸出檔案")
+    parser.add_argument("--no-project", action="store_true",
+                       help="錄製TXT檔時不使用稿件專案（整份重新合成）")
+    parser.add_argument("--no-mmap", action="store_true", help="不使用 mmap 權重，以原始 model.pth 載入")
+    parser.add_argument("--part-minutes", type=float, help="錄製時每個分段檔的最長時間（分鐘）")
+    parser.add_argument("--part-mb", type=float, help="錄製時每個分段檔的最大大小（MB）")
+    parser.add_argument("--no-align", action="store_true", help="錄製時不輸出句子時間軸 (JSON/SRT/VTT)")
+    parser.add_argument("--no-post", action="store_true",
+                       help="不做逐句後處理（去除前後靜音、統一響度、交叉淡化）")
+    parser.add_argument("--metrics", action="store_true", help="結束時列出各階段耗時與計數")
+    parser.add_argument("--trace", metavar="FILE", help="將每次量測寫入 JSON lines 追蹤檔")
     parser.add_argument("--info", "-i", action="store_true", help="顯示引擎資訊")
+    parser.add_argument("--rescan", action="store_true", help="重新檢查可用引擎（忽略緩存的檢查結果）")
     
     args = parser.parse_args()
     
+    if args.rescan:
+        ENGINES.probe(refresh=True)
+    
     # 顯示引擎資訊
     if args.info:
         print("🔍 可用的TTS引擎:")
         for engine, available in ENGINES.items():
             status = "✅ 可用" if available else "❌ 不可用"
             print(f"  {engine}: {status}")
-        print(f"📁 FFmpeg (MP3支援): {'✅ 可用' if FFMPEG_AVAILABLE else '❌ 不可用'}")
+        print(f"📁 FFmpeg (MP3支援): {'✅ 可用' if ENGINES.ffmpeg_available else '❌ 不可用'}")
         
         # 顯示XTTS v2緩存狀態
         if ENGINES.get('xtts', False):
@@ -624,17 +1332,108 @@ def main():
             
             if cache_info['disk_cached']:
                 print(f"  緩存路徑: {cache_info['cache_path']}")
+                weights_info = cache_info['mmap_weights']
+                weights_status = "✅ 已轉換" if weights_info['converted'] else "❌ 未轉換（首次載入時自動轉換）"
+                print(f"  mmap 權重 ({weights_info['format']}): {weights_status}")
             else:
                 print("  💡 首次使用XTTS v2會下載約1.8GB模型")
+            
+            synth_stats = cache_info['synthesis_cache']
+            print(f"  語句緩存: {synth_stats['entries']} 句 / "
+                  f"{synth_stats['size_bytes'] / (1024 * 1024):.1f} MB "
+                  f"(上限 {synth_stats['max_bytes'] / (1024 * 1024):.0f} MB)")
+            print(f"  緩存命中: {synth_stats['hits']} / 未命中: {synth_stats['misses']}")
         
         return 0
     
+    # 批次模式與有聲書匯出（多個工作行程各自載入模型）
+    if args.batch or args.audiobook:
+        if args.batch and not os.path.isdir(args.batch):
+            print(f"❌ 資料夾不存在: {args.batch}")
+            return 1
+        if args.audiobook and not (args.file and os.path.isfile(args.file)):
+            print("❌ 有聲書匯出需要以 --file 指定存在的TXT檔")
+            return 1
+        # 工作行程都要載入 XTTS v2，先在主行程確認可用，避免啟動注定失敗的工作池
+        if not ENGINES['xtts']:
+            print("❌ 批次模式與有聲書匯出需要 XTTS v2（請安裝 torch 與 TTS）")
+            return 1
+
+        settings = {
+            "speaker": args.speaker,
+            "speaker_wav": os.path.abspath(args.speaker_wav) if args.speaker_wav else None,
+            "language": XTTS_DEFAULT_LANGUAGE,
+            "use_cache": not args.no_cache,
+            "batch_size": args.batch_size,
+            "precision": args.precision,
+            "write_alignment": not args.no_align,
+            "post_process": not args.no_post
+        }
+        output_format = "mp3" if ENGINES.ffmpeg_available else "wav"
+        if args.audiobook:
+            output_dir = args.output or os.path.join(
+                "tts_outputs", f"audiobook_{Path(args.file).stem}"
+            )
+            try:
+                failures = export_audiobook(
+                    args.file, output_dir, settings,
+                    workers=args.workers,
+                    torch_threads=args.torch_threads,
+                    output_format=output_format,
+                    ffmpeg_available=ENGINES.ffmpeg_available
+                )
+                return 0 if failures == 0 else 1
+            except Exception as e:
+                print(f"❌ 有聲書匯出失敗: {e}")
+                return 1
+        
+        output_dir = args.output or os.path.join(
+            "tts_outputs", f"batch_{os.path.basename(os.path.normpath(args.batch))}"
+        )
+        try:
+            failures = run_batch(
+                args.batch, output_dir, settings,
+                workers=args.workers,
+                torch_threads=args.torch_threads,
+                output_format=output_format
+            )
+            return 0 if failures == 0 else 1
+        except Exception as e:
+            print(f"❌ 批次合成失敗: {e}")
+            return 1
+    
+    if args.metrics or args.trace:
+        METRICS.enable(args.trace)
+    
     # 命令行模式
     if args.file or args.text:
         try:
             reader = EnhancedTTSReader()
+            reader.streaming = args.stream
+            reader.use_cache = not args.no_cache
+            reader.speaker = args.speaker
+            reader.speaker_wav = args.speaker_wav
+            reader.use_daemon = not args.no_daemon
+            reader.audio_sink_kind = args.audio_sink
+            reader.batch_size = args.batch_size
+            reader.batch_wait = args.batch_wait / 1000.0
+            reader.precision = args.precision
+            reader.mmap_weights = not args.no_mmap
+            reader.record_playback = not args.no_play
+            if args.part_minutes:
+                reader.part_seconds = args.part_minutes * 60
+            if args.part_mb:
+                reader.part_bytes = int(args.part_mb * 1024 * 1024)
+            reader.write_alignment = not args.no_align
+            reader.post_process = not args.no_post
+            if args.file and args.record and not args.no_project:
+                reader.project_dir = default_project_dir(reader.output_folder, args.file)
             reader.init_engine(args.engine)
             
+            if args.file and args.record and reader.engine_type == 'xtts':
+                # 錄製時逐塊讀檔，長篇稿件不必整份載入記憶體
+                return 0 if reader.record_file(args.file, args.output) else 1
+            
             if args.file:
                 text = reader.read_txt_file(args.file)
                 if not text:
@@ -654,6 +1453,10 @@ def main():
         except Exception as e:
             print(f"❌ 錯誤: {e}")
             return 1
+        finally:
+            if args.metrics:
+                METRICS.print_summary()
+            METRICS.disable()
     
     # 圖形界面模式 (預設)
     try:
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+XTTS v2 相似聲音索引
+把內建說話者的嵌入向量正規化成一個矩陣，以一次矩陣乘法計算餘弦相似度，
+找出與指定說話者或參考音檔最接近的 k 個內建聲音。
+索引可保存為 .npz，以說話者名稱查詢時不必載入模型。
+
+使用範例:
+  python voice_index.py "Tammie Ema"              # 與 Tammie Ema 最相似的聲音
+  python voice_index.py reference.wav -k 3        # 與參考音檔最相似的 3 個內建聲音
+  python voice_index.py --rebuild                 # 重新由模型建立索引
+"""
+
+import os
+import argparse
+
+from speaker_catalog import SpeakerCatalog, normalize_speaker_name, get_speaker_catalog
+
+INDEX_PATH = os.path.join("tts_outputs", "speakers", "voice_index.npz")
+DEFAULT_K = 5
+
+
+def _normalize(matrix):
+    """逐列正規化為單位向量（零向量維持為零）"""
+    import numpy as np
+
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+class VoiceIndex:
+    def __init__(self, names, embeddings, genders=None, ages=None):
+        """建立索引（embeddings: 每列一個說話者的嵌入向量）"""
+        import numpy as np
+
+        self.names = list(names)
+        self.vectors = _normalize(np.asarray(embeddings, dtype=np.float32))
+        self.genders = list(genders) if genders is not None else [""] * len(self.names)
+        self.ages = list(ages) if ages is not None else [""] * len(self.names)
+        self._index = {name: i for i, name in enumerate(self.names)}
+        self._lookup = {normalize_speaker_name(name): name for name in self.names}
+
+    @classmethod
+    def from_catalog(cls, catalog):
+        """由說話者目錄建立索引"""
+        return cls(
+            catalog.names,
+            catalog.embeddings,
+            [catalog.attributes[name]["gender"] or "" for name in catalog.names],
+            [catalog.attributes[name]["age"] or "" for name in catalog.names],
+        )
+
+    @classmethod
+    def load(cls, path=INDEX_PATH):
+        """讀取已保存的索引，不存在或損毀時回傳 None"""
+        import numpy as np
+
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                return cls(data["names"].tolist(), data["vectors"],
+                           data["genders"].tolist(), data["ages"].tolist())
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def save(self, path=INDEX_PATH):
+        """保存索引（先寫暫存檔再替換）"""
+        import numpy as np
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(temp_path, names=np.array(self.names), vectors=self.vectors,
+                 genders=np.array(self.genders), ages=np.array(self.ages))
+        os.replace(temp_path, path)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return self.resolve(name) is not None
+
+    def resolve(self, name):
+        """取得說話者的正式名稱（忽略大小寫/空白），不存在時回傳 None"""
+        if name in self._index:
+            return name
+        return self._lookup.get(normalize_speaker_name(name))
+
+    def matches(self, names):
+        """檢查索引是否與目前模型的說話者一致"""
+        return self.names == list(names)
+
+    def query(self, vector, k=DEFAULT_K, exclude=None):
+        """回傳與向量最相似的 k 個說話者 [(名稱, 餘弦相似度), ...]"""
+        import numpy as np
+
+        vector = _normalize(np.asarray(vector, dtype=np.float32).reshape(-1))
+        scores = self.vectors @ vector
+        if exclude in self._index:
+            scores[self._index[exclude]] = -np.inf
+
+        k = min(k, len(scores) - (exclude in self._index))
+        if k <= 0:
+            return []
+        # argpartition 先取前 k 個，只排序這 k 個
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.names[i], float(scores[i])) for i in top]
+
+    def similar_to(self, name, k=DEFAULT_K):
+        """與內建說話者最相似的 k 個其他說話者"""
+        return self.query(self.vectors[self._index[name]], k, exclude=name)
+
+
+def get_voice_index(tts, path=INDEX_PATH):
+    """取得模型的相似聲音索引：已保存且與模型一致時直接讀取，否則重建並保存"""
+    catalog = get_speaker_catalog(tts)
+    index = VoiceIndex.load(path)
+    if index is None or not index.matches(catalog.names):
+        index = VoiceIndex.from_catalog(catalog)
+        if len(index):
+            index.save(path)
+    return index
+
+
+def reference_embedding(tts, speaker_wav):
+    """計算參考音檔的說話者嵌入（沿用說話者條件向量緩存）"""
+    from speaker_latents import SpeakerLatentStore, get_xtts_core
+
+    xtts_core = get_xtts_core(tts)
+    if xtts_core is None:
+        raise RuntimeError("參考音檔比對需要 XTTS v2 模型")
+    store = SpeakerLatentStore(xtts_core, os.path.dirname(INDEX_PATH))
+    _, speaker_embedding = store.get_latents(speaker_wav=speaker_wav)
+    return SpeakerCatalog._to_vector(speaker_embedding)
+
+
+def find_similar_voices(query, k=DEFAULT_K, tts=None, path=INDEX_PATH):
+    """找出與說話者名稱或參考音檔最相似的內建聲音
+
+    以名稱查詢且索引已保存時不需要模型；參考音檔或索引不存在時才使用（或載入）模型。
+    """
+    if not os.path.isfile(query):
+        index = VoiceIndex.load(path) if tts is None else None
+        if index is None or query not in index:
+            tts = tts or _load_model()
+            index = get_voice_index(tts, path)
+
+        name = index.resolve(query)
+        if name is None:
+            raise ValueError(f"模型中沒有說話者 {query}，也不是存在的音檔")
+        return index.similar_to(name, k)
+
+    tts = tts or _load_model()
+    return get_voice_index(tts, path).query(reference_embedding(tts, query), k)
+
+
+def _load_model():
+    from xtts_reader import create_xtts_reader
+
+    tts = create_xtts_reader()
+    if tts is None:
+        raise RuntimeError("XTTS v2 初始化失敗")
+    return tts
+
+
+def print_similar_voices(query, results):
+    """列出相似聲音"""
+    print(f"🎭 與 {query} 最相似的聲音:")
+    for rank, (name, score) in enumerate(results, 1):
+        print(f"   {rank}. {name:<24} 相似度 {score:.3f}")
+
+
+def main():
+    """主函數"""
+    parser = argparse.ArgumentParser(
+        description="XTTS v2 相似聲音查詢",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__.split("使用範例:")[1]
+    )
+    parser.add_argument("query", nargs='?', help="內建說話者名稱或參考音檔路徑")
+    parser.add_argument("-k", type=int, default=DEFAULT_K, help=f"列出的聲音數量 (預設: {DEFAULT_K})")
+    parser.add_argument("--rebuild", action="store_true", help="重新由模型建立索引")
+    args = parser.parse_args()
+
+    try:
+        tts = None
+        if args.rebuild:
+            tts = _load_model()
+            if os.path.exists(INDEX_PATH):
+                os.remove(INDEX_PATH)
+            index = get_voice_index(tts)
+            print(f"✅ 已建立索引: {len(index)} 個說話者 -> {INDEX_PATH}")
+            if not args.query:
+                return 0
+        elif not args.query:
+            parser.print_help()
+            return 1
+
+        print_similar_voices(args.query, find_similar_voices(args.query, args.k, tts))
+        return 0
+    except KeyboardInterrupt:
+        print("\n\n⏹️  程式被用戶中斷")
+        return 130
+    except Exception as e:
+        print(f"❌ 錯誤: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    exit(main())
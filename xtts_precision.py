@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+XTTS v2 CPU 推理精度與執行緒調整
+- fp32：原始精度，只調整 torch 執行緒數
+- bf16：推理時以 torch.autocast 使用 bfloat16（需 CPU 支援 AVX512-BF16/AMX 才會加速）
+- int8：GPT 的線性層（含 GPT-2 的 Conv1D 投影層）做動態 int8 量化，
+  量化後的 GPT 保存在 ~/.cache/tts，之後直接載入不必重新量化
+內建 A/B 檢查：以同一組句子比較 fp32 與指定精度的即時率與音質差異。
+
+使用範例:
+  python xtts_precision.py --precision int8            # A/B 檢查 int8
+  python xtts_precision.py --precision bf16 --text "測試句子"
+"""
+
+import os
+import math
+import time
+import argparse
+import contextlib
+from pathlib import Path
+
+PRECISIONS = ["fp32", "bf16", "int8"]
+
+# 量化後的 GPT 保存位置（與 Coqui TTS 模型緩存放在一起）
+QUANTIZED_CACHE_DIR = Path.home() / ".cache" / "tts" / "quantized"
+
+# A/B 檢查用句子
+AB_SENTENCES = [
+    "你好，歡迎使用讀稿機。",
+    "今天天氣很好，我們一起去公園散步吧。",
+    "這份報告使用 XTTS v2 模型生成語音，請在星期五前回覆意見。",
+]
+
+
+def physical_core_count():
+    """估計實體核心數（超執行緒對矩陣運算幫助有限）"""
+    try:
+        import psutil
+        cores = psutil.cpu_count(logical=False)
+        if cores:
+            return cores
+    except ImportError:
+        pass
+    logical = os.cpu_count() or 1
+    return max(1, logical // 2) if logical > 1 else 1
+
+
+def configure_threads(intra_op=None, inter_op=None):
+    """依核心數設定 torch 運算內/運算間執行緒數，回傳實際設定值"""
+    import torch
+
+    intra_op = intra_op or physical_core_count()
+    inter_op = inter_op or 1
+    torch.set_num_threads(intra_op)
+    try:
+        # 只能在第一次平行運算前設定
+        torch.set_num_interop_threads(inter_op)
+    except RuntimeError:
+        inter_op = torch.get_num_interop_threads()
+    return intra_op, inter_op
+
+
+def precision_context(precision):
+    """推理時使用的精度環境（bf16 使用 autocast，其餘不變）"""
+    if precision == "bf16":
+        import torch
+        return torch.autocast(device_type="cpu", dtype=torch.bfloat16)
+    return contextlib.nullcontext()
+
+
+def _conv1d_to_linear(module):
+    """將 GPT-2 的 Conv1D 投影層換成等價的 nn.Linear，動態量化才會處理到"""
+    import torch
+
+    for name, child in module.named_children():
+        if type(child).__name__ == "Conv1D" and hasattr(child, "nf"):
+            # Conv1D 權重形狀為 (in, out)，Linear 為 (out, in)
+            in_features, out_features = child.weight.shape
+            linear = torch.nn.Linear(in_features, out_features, bias=child.bias is not None)
+            with torch.no_grad():
+                linear.weight.copy_(child.weight.t())
+                if child.bias is not None:
+                    linear.bias.copy_(child.bias)
+            setattr(module, name, linear)
+        else:
+            _conv1d_to_linear(child)
+
+
+def _quantized_cache_path(checkpoint_dir):
+    """量化結果的保存路徑，模型檔或 torch 版本變動時自動失效"""
+    import torch
+
+    checkpoint = Path(checkpoint_dir) / "model.pth" if checkpoint_dir else None
+    stamp = "unknown"
+    if checkpoint is not None and checkpoint.exists():
+        stat = checkpoint.stat()
+        stamp = f"{stat.st_size}-{int(stat.st_mtime)}"
+    return QUANTIZED_CACHE_DIR / f"xtts_v2_gpt_int8_{stamp}_torch{torch.__version__.split('+')[0]}.pt"
+
+
+def _find_checkpoint_dir(tts):
+    """找出 XTTS v2 模型檔所在資料夾"""
+    model_path = Path.home() / ".cache" / "tts" / "tts_models--multilingual--multi-dataset--xtts_v2"
+    if model_path.exists():
+        return model_path
+    manager = getattr(tts, "manager", None)
+    output_prefix = getattr(manager, "output_prefix", None)
+    if output_prefix:
+        candidate = Path(output_prefix) / "tts_models--multilingual--multi-dataset--xtts_v2"
+        if candidate.exists():
+            return candidate
+    return None
+
+
+def quantize_gpt(xtts_core, checkpoint_dir=None):
+    """將 GPT 動態量化為 int8（優先載入保存的量化結果），回傳是否從緩存載入"""
+    from tts_metrics import instrument_xtts, uninstrument_xtts
+
+    # 量測包裝是實例上的閉包：量化時的複製會沿用原本 fp32 的 generate，保存時也無法序列化
+    instrumented = uninstrument_xtts(xtts_core)
+    try:
+        return _quantize_gpt(xtts_core, checkpoint_dir)
+    finally:
+        if instrumented:
+            instrument_xtts(xtts_core)
+
+
+def _quantize_gpt(xtts_core, checkpoint_dir):
+    import torch
+
+    cache_path = _quantized_cache_path(checkpoint_dir)
+    if cache_path.exists():
+        try:
+            xtts_core.gpt = torch.load(cache_path, map_location="cpu", weights_only=False)
+            xtts_core.gpt.eval()
+            return True
+        except Exception as e:
+            print(f"   ⚠️  量化緩存無法使用，重新量化: {e}")
+
+    gpt = xtts_core.gpt
+    _conv1d_to_linear(gpt)
+    quantized = torch.ao.quantization.quantize_dynamic(gpt, {torch.nn.Linear}, dtype=torch.qint8)
+    quantized.eval()
+    xtts_core.gpt = quantized
+
+    temp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        torch.save(quantized, temp_path)
+        os.replace(temp_path, cache_path)
+    except Exception as e:
+        # 保存只是為了下次省去量化，失敗時本次仍使用量化後的模型
+        print(f"   ⚠️  無法保存量化結果: {e}")
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+    return False
+
+
+def apply_precision(tts, precision, intra_op=None, inter_op=None):
+    """對已載入的 TTS API 物件套用精度與執行緒設定，回傳說明字串"""
+    from speaker_latents import get_xtts_core
+
+    if precision not in PRECISIONS:
+        raise ValueError(f"不支援的精度: {precision}")
+
+    intra_op, inter_op = configure_threads(intra_op, inter_op)
+    summary = f"{precision}，torch 執行緒 {intra_op}/{inter_op}"
+
+    if precision == "int8":
+        xtts_core = get_xtts_core(tts)
+        if xtts_core is None or not hasattr(xtts_core, "gpt"):
+            raise RuntimeError("此模型不支援 int8 量化")
+        from_cache = quantize_gpt(xtts_core, _find_checkpoint_dir(tts))
+        summary += "（載入已保存的量化 GPT）" if from_cache else "（GPT 已量化並保存）"
+    return summary
+
+
+def _long_term_spectrum_db(pcm, frame=1024):
+    """長時平均頻譜 (dB)，不需要兩段音頻逐點對齊"""
+    import numpy as np
+
+    pcm = np.asarray(pcm, dtype=np.float32)
+    if len(pcm) < frame:
+        pcm = np.pad(pcm, (0, frame - len(pcm)))
+    frames = len(pcm) // frame
+    windowed = pcm[:frames * frame].reshape(frames, frame) * np.hanning(frame).astype(np.float32)
+    power = np.mean(np.abs(np.fft.rfft(windowed, axis=1)) ** 2, axis=0)
+    return 10.0 * np.log10(power + 1e-10)
+
+
+def quality_delta(reference, candidate, sample_rate):
+    """比較兩段音頻：時長、音量與長時頻譜距離"""
+    import numpy as np
+
+    def rms_db(pcm):
+        return 20.0 * math.log10(float(np.sqrt(np.mean(np.square(pcm)))) + 1e-10)
+
+    spectrum_distance = np.sqrt(np.mean(np.square(
+        _long_term_spectrum_db(reference) - _long_term_spectrum_db(candidate)
+    )))
+    return {
+        "duration_delta_seconds": round((len(candidate) - len(reference)) / sample_rate, 3),
+        "rms_delta_db": round(rms_db(candidate) - rms_db(reference), 2),
+        "spectral_distance_db": round(float(spectrum_distance), 2)
+    }
+
+
+def _timed_synthesis(reader, sentences):
+    """逐句合成並計時，回傳 (PCM 列表, RTF)"""
+    import torch
+
+    outputs = []
+    elapsed = 0.0
+    for sentence in sentences:
+        # 固定亂數種子，兩種精度的取樣條件相同
+        torch.manual_seed(0)
+        start = time.perf_counter()
+        outputs.append(reader._synthesize_pcm(sentence))
+        elapsed += time.perf_counter() - start
+
+    audio_seconds = sum(len(pcm) for pcm in outputs) / reader.sample_rate
+    return outputs, elapsed / audio_seconds if audio_seconds else None
+
+
+def run_ab_check(precision, sentences=AB_SENTENCES, language="zh"):
+    """以同一模型先跑 fp32 再套用指定精度，回傳 RTF 與音質比較結果"""
+    from tts_enhanced import EnhancedTTSReader
+
+    reader = EnhancedTTSReader()
+    reader.use_daemon = False
+    reader.use_cache = False
+    reader.language = language
+    reader.init_engine("xtts")
+    configure_threads()
+
+    # 第一句先暖機，避免把初次配置記憶體的時間算進去
+    _timed_synthesis(reader, sentences[:1])
+    reference, reference_rtf = _timed_synthesis(reader, sentences)
+
+    print(f"   🔧 套用精度: {apply_precision(reader.xtts_model, precision)}")
+    reader.precision = precision
+    _timed_synthesis(reader, sentences[:1])
+    candidate, candidate_rtf = _timed_synthesis(reader, sentences)
+
+    per_sentence = [
+        dict(quality_delta(ref, cand, reader.sample_rate), text=text)
+        for text, ref, cand in zip(sentences, reference, candidate)
+    ]
+    return {
+        "precision": precision,
+        "fp32_rtf": round(reference_rtf, 4),
+        "rtf": round(candidate_rtf, 4),
+        "speedup": round(reference_rtf / candidate_rtf, 2) if candidate_rtf else None,
+        "sentences": per_sentence
+    }
+
+
+def main():
+    """主函數"""
+    parser = argparse.ArgumentParser(
+        description="XTTS v2 推理精度 A/B 檢查",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__.split("使用範例:")[1]
+    )
+    parser.add_argument("--precision", "-p", choices=["bf16", "int8"], default="int8",
+                        help="與 fp32 比較的精度 (預設: int8)")
+    parser.add_argument("--text", "-t", action="append", help="自訂測試句子 (可重複指定)")
+    parser.add_argument("--language", "-l", default="zh", help="語言 (預設: zh)")
+
+    args = parser.parse_args()
+
+    print(f"🔬 XTTS v2 精度 A/B 檢查: fp32 vs {args.precision}")
+    print("=" * 60)
+
+    try:
+        report = run_ab_check(args.precision, args.text or AB_SENTENCES, args.language)
+    except Exception as e:
+        print(f"❌ A/B 檢查失敗: {e}")
+        return 1
+
+    print(f"\n📊 RTF: fp32 {report['fp32_rtf']} → {args.precision} {report['rtf']} "
+          f"(加速 {report['speedup']}x)")
+    for item in report["sentences"]:
+        print(f"   {item['text'][:20]:<20} 時長差 {item['duration_delta_seconds']:+.2f} 秒  "
+              f"音量差 {item['rms_delta_db']:+.1f} dB  頻譜距離 {item['spectral_distance_db']:.1f} dB")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
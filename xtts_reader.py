@@ -8,9 +8,13 @@ XTTS v2 讀稿機 - 簡化版
 import argparse
 import sys
 import os
-import tempfile
 import subprocess
 
+from speaker_latents import SpeakerLatentStore, get_xtts_core
+from speaker_catalog import YOUNG_SPEAKERS, get_speaker_catalog
+from voice_index import DEFAULT_K, find_similar_voices, print_similar_voices
+from audio_sink import play_pcm
+
 # 設置環境變量自動同意 XTTS v2 條款
 os.environ["COQUI_TOS_AGREED"] = "1"
 
@@ -79,14 +83,10 @@ def create_xtts_reader():
     """創建 XTTS v2 讀稿機實例"""
     try:
         from TTS.api import TTS
-        import pygame
         
         print("🤖 正在初始化 XTTS v2...")
         print("   這可能需要一些時間下載模型...")
         
-        # 初始化 pygame
-        pygame.mixer.init()
-        
         # 初始化 XTTS v2
         tts = TTS("tts_models/multilingual/multi-dataset/xtts_v2")
         
@@ -97,110 +97,59 @@ def create_xtts_reader():
         print(f"❌ XTTS v2 初始化失敗: {e}")
         return None
 
-def speak_with_xtts(tts, text, language="zh"):
+def resolve_speaker(tts, speaker=None):
+    """在推理前解析要使用的說話者（字典查找，不執行任何合成）
+
+    指定的說話者不存在時直接報錯並提供相近名稱；未指定時依序選用
+    偏好的年輕女性聲音、目錄中其他年輕女性/女性聲音，最後是第一個內建聲音。
+    模型沒有內建說話者時回傳 None（由模型使用預設聲音）。
+    """
+    catalog = get_speaker_catalog(tts)
+    if speaker:
+        resolved = catalog.resolve(speaker)
+        if resolved is None:
+            suggestions = catalog.suggest(speaker)
+            hint = f"，是否為: {', '.join(suggestions)}" if suggestions else ""
+            raise ValueError(f"模型中沒有說話者 {speaker}{hint}")
+        return resolved
+
+    if not len(catalog):
+        return None
+    return (
+        catalog.resolve_first(YOUNG_SPEAKERS)
+        or catalog.resolve_first(catalog.filter(gender="female", age="young"))
+        or catalog.resolve_first(catalog.filter(gender="female"))
+        or catalog.names[0]
+    )
+
+def speak_with_xtts(tts, text, language="zh", speaker=None):
     """使用 XTTS v2 進行語音合成和播放"""
     try:
-        import pygame
-        
         print(f"🔊 XTTS v2 正在生成語音: {text}")
         
-        # 創建臨時檔案
-        temp_file = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
-        output_path = temp_file.name
-        temp_file.close()
-        
-        # 生成語音 (多重方法嘗試)
-        success = False
-        
-        # 方法1：使用年輕女性說話者（按優先順序排列）
-        young_female_speakers = [
-            "Tammie Ema",          # 年輕女性，活潑語調
-            "Daisy Studious",      # 年輕女性，學術風格
-            "Gracie Wise",         # 年輕女性，溫和語調
-            "Alison Dietlinde",    # 年輕女性，專業播音
-            "Claribel Dervla"      # 年輕女性，清晰發音
-        ]
-        for speaker in young_female_speakers:
-            try:
-                print(f"   嘗試年輕女性說話者: {speaker}")
-                tts.tts_to_file(
-                    text=text,
-                    file_path=output_path,
-                    language=language,
-                    speaker=speaker
-                )
-                print(f"✅ 使用年輕女性說話者 {speaker} 成功")
-                success = True
-                break
-            except Exception as e1:
-                print(f"   說話者 {speaker} 失敗: {e1}")
-                continue
-        
-        # 方法2：如果方法1失敗，嘗試使用說話者索引
-        if not success:
-            for idx in range(5):
-                try:
-                    print(f"   嘗試說話者索引: {idx}")
-                    tts.tts_to_file(
-                        text=text,
-                        file_path=output_path,
-                        language=language,
-                        speaker_idx=idx
-                    )
-                    print(f"✅ 使用說話者索引 {idx} 成功")
-                    success = True
-                    break
-                except Exception as e2:
-                    print(f"   索引 {idx} 失敗: {e2}")
-                    continue
-        
-        # 方法3：如果前面都失敗，使用直接合成
-        if not success:
-            try:
-                print("   嘗試直接合成方法...")
-                wav = tts.tts(text=text, language=language)
-                
-                # 保存音頻
-                import soundfile as sf
-                sf.write(output_path, wav, 22050)
-                print("✅ 直接合成成功")
-                success = True
-            except Exception as e3:
-                print(f"   直接合成失敗: {e3}")
-        
-        # 方法4：最後嘗試使用年輕女性聲音
-        if not success:
-            try:
-                print("   嘗試預設年輕女性聲音...")
-                tts.tts_to_file(
-                    text=text,
-                    file_path=output_path,
-                    speaker="Tammie Ema"  # 年輕女性，活潑語調
-                )
-                print("✅ 預設年輕女性聲音成功")
-                success = True
-            except Exception as e4:
-                print(f"   預設年輕女性聲音失敗: {e4}")
-                raise Exception("所有語音合成方法都失敗了")
+        # 先解析說話者，只執行一次推理，合成結果直接保存在記憶體
+        sample_rate = getattr(tts.synthesizer, "output_sample_rate", 24000)
+        speaker = resolve_speaker(tts, speaker)
+        
+        xtts_core = get_xtts_core(tts)
+        if speaker is not None and xtts_core is not None:
+            # 說話者條件向量緩存：每個說話者只解析一次
+            print(f"   使用說話者: {speaker}")
+            speaker_store = SpeakerLatentStore(xtts_core, os.path.join("tts_outputs", "speakers"))
+            wav = speaker_store.synthesize(text, language, speaker=speaker)
+        elif speaker is not None:
+            print(f"   使用說話者: {speaker}")
+            wav = tts.tts(text=text, language=language, speaker=speaker)
+        else:
+            print("   模型沒有內建說話者，使用預設聲音")
+            wav = tts.tts(text=text, language=language)
         
         print("🎵 正在播放 XTTS v2 生成的語音...")
         
-        # 播放語音
-        pygame.mixer.music.load(output_path)
-        pygame.mixer.music.play()
-        
-        # 等待播放完成
-        while pygame.mixer.music.get_busy():
-            pygame.time.wait(100)
+        # 播放語音（直接送出PCM，不經暫存檔）
+        play_pcm(wav, sample_rate)
         
         print("✅ XTTS v2 播放完成")
-        
-        # 清理臨時檔案
-        try:
-            os.unlink(output_path)
-        except OSError:
-            pass
-        
         return True
         
     except Exception as e:
@@ -239,6 +188,9 @@ def main():
 使用範例:
   python xtts_reader.py "你好，我是 XTTS v2"
   python xtts_reader.py "Hello World" --language en
+  python xtts_reader.py "你好" --speaker "Daisy Studious"
+  python xtts_reader.py --voice-like "Tammie Ema"  # 列出相似的內建聲音
+  python xtts_reader.py "你好" --voice-like ref.wav # 使用最接近參考音檔的內建聲音
   python xtts_reader.py --check                    # 檢查環境
   python xtts_reader.py --fix                      # 修復依賴問題
         """
@@ -256,6 +208,24 @@ def main():
         help="語言代碼 (預設: zh)"
     )
     
+    parser.add_argument(
+        "--speaker", "-s",
+        help="內建說話者名稱 (預設: 年輕女性聲音 Tammie Ema)"
+    )
+    
+    parser.add_argument(
+        "--voice-like",
+        metavar="SPEAKER|WAV",
+        help="列出與說話者或參考音檔最相似的內建聲音，有文字時使用最相似的聲音朗讀"
+    )
+    
+    parser.add_argument(
+        "-k",
+        type=int,
+        default=DEFAULT_K,
+        help=f"--voice-like 列出的聲音數量 (預設: {DEFAULT_K})"
+    )
+    
     parser.add_argument(
         "--check", "-c",
         action="store_true",
@@ -297,6 +267,11 @@ def main():
                 print("\n❌ 環境不完整，請安裝缺少的套件")
             return 0
         
+        # 相似聲音查詢：以名稱查詢且索引已保存時不需要載入模型
+        if args.voice_like and not args.text:
+            print_similar_voices(args.voice_like, find_similar_voices(args.voice_like, args.k))
+            return 0
+        
         # 檢查是否提供文字
         if not args.text:
             print("❌ 請提供要朗讀的文字")
@@ -324,8 +299,16 @@ def main():
             print("❌ XTTS v2 初始化失敗")
             return 1
         
+        # 以相似度選擇說話者，不必逐一試合成
+        speaker = args.speaker
+        if args.voice_like:
+            similar = find_similar_voices(args.voice_like, args.k, tts)
+            print_similar_voices(args.voice_like, similar)
+            if similar:
+                speaker = similar[0][0]
+        
         # 執行語音合成
-        success = speak_with_xtts(tts, args.text, args.language)
+        success = speak_with_xtts(tts, args.text, args.language, speaker)
         
         if success:
             print("🎉 XTTS v2 朗讀完成！")
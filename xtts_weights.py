@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+XTTS v2 記憶體映射權重載入
+原始 model.pth 是 pickle 格式，每次啟動都要完整反序列化到匿名記憶體。
+第一次使用時轉換為 safetensors（未安裝時改用 torch zip 格式），之後：
+- 權重以 mmap 映射檔案，用到的頁面才從磁碟讀入，冷啟動更快
+- 同一台機器上的多個工作行程共用同一份實體頁面，每個行程的 RSS 大幅降低
+轉換時持有鎖檔，多個工作行程同時首次載入時只有一個進行轉換，其餘等待後直接載入。
+轉換或載入失敗時回傳 None，由呼叫端退回一般的 TTS API 載入方式。
+
+使用範例:
+  python xtts_weights.py            # 轉換模型並顯示狀態
+  python xtts_weights.py --status   # 只顯示狀態
+"""
+
+import os
+import time
+import argparse
+import contextlib
+import importlib.util
+from pathlib import Path
+
+XTTS_MODEL_DIR = Path.home() / ".cache" / "tts" / "tts_models--multilingual--multi-dataset--xtts_v2"
+
+SAFETENSORS_NAME = "model.safetensors"
+TORCH_MMAP_NAME = "model.mmap.pt"
+CONVERT_LOCK_NAME = "model.convert.lock"
+
+# 鎖檔超過此時間仍存在視為轉換行程已中斷（正常轉換只需數分鐘）
+LOCK_STALE_SECONDS = 30 * 60
+
+
+def safetensors_available():
+    """檢查是否已安裝 safetensors（TTS 依賴的 transformers 通常已附帶）"""
+    return importlib.util.find_spec("safetensors") is not None
+
+
+def mmap_weights_path(model_dir=XTTS_MODEL_DIR):
+    """轉換後權重檔的路徑"""
+    name = SAFETENSORS_NAME if safetensors_available() else TORCH_MMAP_NAME
+    return Path(model_dir) / name
+
+
+def is_converted(model_dir=XTTS_MODEL_DIR):
+    """檢查轉換後的權重是否存在且比原始模型檔新"""
+    checkpoint = Path(model_dir) / "model.pth"
+    weights = mmap_weights_path(model_dir)
+    if not weights.exists():
+        return False
+    if checkpoint.exists() and checkpoint.stat().st_mtime > weights.stat().st_mtime:
+        return False
+    return True
+
+
+def _load_config(model_dir):
+    from TTS.tts.configs.xtts_config import XttsConfig
+
+    config = XttsConfig()
+    config.load_json(str(Path(model_dir) / "config.json"))
+    return config
+
+
+def _deduplicate(state_dict):
+    """safetensors 不允許共用儲存空間的張量，重複者複製一份"""
+    seen = set()
+    tensors = {}
+    for name, tensor in state_dict.items():
+        tensor = tensor.detach().contiguous()
+        pointer = (tensor.untyped_storage().data_ptr(), tensor.storage_offset())
+        if pointer in seen:
+            tensor = tensor.clone()
+        seen.add(pointer)
+        tensors[name] = tensor
+    return tensors
+
+
+@contextlib.contextmanager
+def conversion_lock(model_dir, poll_interval=0.5):
+    """跨行程的轉換鎖（以 O_EXCL 建立鎖檔），其他行程持有時等待"""
+    lock_path = Path(model_dir) / CONVERT_LOCK_NAME
+    waiting = False
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            pass
+        try:
+            if time.time() - lock_path.stat().st_mtime > LOCK_STALE_SECONDS:
+                print("   ⚠️  移除過期的轉換鎖檔")
+                os.remove(lock_path)
+                continue
+        except OSError:
+            # 鎖檔剛被釋放，立即重試
+            continue
+        if not waiting:
+            print("   ⏳ 其他行程正在轉換模型，等待完成...")
+            waiting = True
+        time.sleep(poll_interval)
+
+    try:
+        os.write(fd, str(os.getpid()).encode("ascii"))
+        os.close(fd)
+        yield
+    finally:
+        try:
+            os.remove(lock_path)
+        except OSError:
+            pass
+
+
+def convert_checkpoint(model_dir=XTTS_MODEL_DIR):
+    """將 model.pth 轉換為可 mmap 的格式（只需執行一次），回傳輸出路徑"""
+    model_dir = Path(model_dir)
+    checkpoint = model_dir / "model.pth"
+    if not checkpoint.exists():
+        raise FileNotFoundError(f"找不到模型檔: {checkpoint}")
+
+    with conversion_lock(model_dir):
+        # 等待期間其他行程可能已完成轉換
+        if is_converted(model_dir):
+            return mmap_weights_path(model_dir)
+        return _convert(model_dir, checkpoint)
+
+
+def _convert(model_dir, checkpoint):
+    import torch
+    from TTS.tts.models.xtts import Xtts
+
+    print("   🔄 正在將模型轉換為 mmap 格式（只需一次）...")
+    start_time = time.time()
+
+    # 沿用 Xtts 本身的鍵名相容處理（移除前綴、略過訓練用權重）
+    model = Xtts.init_from_config(_load_config(model_dir))
+    state_dict = _deduplicate(model.get_compatible_checkpoint_state_dict(str(checkpoint)))
+    del model
+
+    output_path = mmap_weights_path(model_dir)
+    temp_path = output_path.with_name(f"{output_path.name}.{os.getpid()}.tmp")
+    try:
+        if output_path.name == SAFETENSORS_NAME:
+            from safetensors.torch import save_file
+            save_file(state_dict, str(temp_path))
+        else:
+            torch.save(state_dict, temp_path)
+        os.replace(temp_path, output_path)
+    except BaseException:
+        # 中斷或寫入失敗時不留下半成品
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+    size_mb = output_path.stat().st_size / (1024 * 1024)
+    print(f"   ✅ 轉換完成: {output_path.name} ({size_mb:.0f} MB, {time.time() - start_time:.1f} 秒)")
+    return output_path
+
+
+def _load_state_dict(weights_path):
+    """以 mmap 方式讀取權重（張量直接引用映射的檔案頁面）"""
+    import torch
+
+    if weights_path.name == SAFETENSORS_NAME:
+        from safetensors.torch import load_file
+        return load_file(str(weights_path), device="cpu")
+    return torch.load(weights_path, map_location="cpu", mmap=True, weights_only=True)
+
+
+def load_xtts_mmap(model_dir=XTTS_MODEL_DIR):
+    """以 mmap 權重建立 TTS API 物件，模型未下載或失敗時回傳 None"""
+    model_dir = Path(model_dir)
+    if not (model_dir / "config.json").exists():
+        return None
+
+    try:
+        if not is_converted(model_dir):
+            convert_checkpoint(model_dir)
+
+        from TTS.api import TTS
+        from TTS.tts.models.xtts import Xtts
+        from TTS.utils.synthesizer import Synthesizer
+
+        weights_path = mmap_weights_path(model_dir)
+        state_dict = _load_state_dict(weights_path)
+
+        config = _load_config(model_dir)
+        model = Xtts.init_from_config(config)
+        # 分詞器、說話者、推理用 GPT 照常初始化，權重稍後以 assign 直接引用映射頁面
+        model.get_compatible_checkpoint_state_dict = lambda path: {}
+        model.load_checkpoint(config, checkpoint_dir=str(model_dir), strict=False, eval=True)
+        missing, unexpected = model.load_state_dict(state_dict, strict=False, assign=True)
+        # 推理用 GPT 的參數與 GPT 共用，不在權重檔中
+        missing = [key for key in missing if ".gpt_inference." not in key]
+        if missing or unexpected:
+            raise RuntimeError(f"權重不相符: 缺少 {len(missing)} 項，多出 {len(unexpected)} 項")
+        model.eval()
+
+        # 包裝成與 TTS(XTTS_MODEL_NAME) 相同介面的物件
+        tts = TTS()
+        tts.model_name = "tts_models/multilingual/multi-dataset/xtts_v2"
+        synthesizer = Synthesizer()
+        synthesizer.tts_model = model
+        synthesizer.tts_config = config
+        synthesizer.output_sample_rate = config.audio["output_sample_rate"]
+        synthesizer.seg = synthesizer._get_segmenter("en")
+        tts.synthesizer = synthesizer
+        return tts
+    except Exception as e:
+        print(f"   ⚠️  mmap 權重載入失敗，改用一般載入: {e}")
+        return None
+
+
+def get_weights_info(model_dir=XTTS_MODEL_DIR):
+    """權重轉換狀態"""
+    weights = mmap_weights_path(model_dir)
+    return {
+        "format": "safetensors" if weights.name == SAFETENSORS_NAME else "torch-mmap",
+        "path": str(weights),
+        "converted": is_converted(model_dir),
+        "size_mb": round(weights.stat().st_size / (1024 * 1024), 1) if weights.exists() else 0.0
+    }
+
+
+def main():
+    """主函數"""
+    parser = argparse.ArgumentParser(
+        description="XTTS v2 權重 mmap 格式轉換",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__.split("使用範例:")[1]
+    )
+    parser.add_argument("--model-dir", default=str(XTTS_MODEL_DIR), help="XTTS v2 模型資料夾")
+    parser.add_argument("--status", action="store_true", help="只顯示轉換狀態")
+
+    args = parser.parse_args()
+
+    if not args.status:
+        try:
+            if is_converted(args.model_dir):
+                print("✅ 權重已是 mmap 格式，不需轉換")
+            else:
+                convert_checkpoint(args.model_dir)
+        except Exception as e:
+            print(f"❌ 轉換失敗: {e}")
+            return 1
+
+    info = get_weights_info(args.model_dir)
+    print(f"📦 格式: {info['format']}")
+    print(f"📁 路徑: {info['path']}")
+    print(f"{'✅ 已轉換' if info['converted'] else '❌ 未轉換'} ({info['size_mb']} MB)")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())